@@ -0,0 +1,50 @@
+"""Add created_at to User and keyset pagination indexes
+
+Revision ID: 4b8e1f0c2d6a
+Revises: c7d2e4f9a1b3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e1f0c2d6a'
+down_revision = 'c7d2e4f9a1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.execute(
+        sa.text(
+            'UPDATE "user" SET created_at = NOW() WHERE created_at IS NULL'
+        )
+    )
+    op.alter_column(
+        "user",
+        "created_at",
+        existing_type=sa.DateTime(),
+        nullable=False,
+    )
+
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False)
+    op.create_index('ix_project_created_at_id', 'project', ['created_at', 'id'], unique=False)
+    op.create_index('ix_projectrequest_project_id_created_at_id', 'projectrequest', ['project_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_projectrequest_vendor_profile_id_created_at_id', 'projectrequest', ['vendor_profile_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_platformfeedback_created_at_id', 'platformfeedback', ['created_at', 'id'], unique=False)
+    op.create_index('ix_review_reviewed_user_id_created_at_id', 'review', ['reviewed_user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_review_author_id_created_at_id', 'review', ['author_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_review_author_id_created_at_id', table_name='review')
+    op.drop_index('ix_review_reviewed_user_id_created_at_id', table_name='review')
+    op.drop_index('ix_platformfeedback_created_at_id', table_name='platformfeedback')
+    op.drop_index('ix_projectrequest_vendor_profile_id_created_at_id', table_name='projectrequest')
+    op.drop_index('ix_projectrequest_project_id_created_at_id', table_name='projectrequest')
+    op.drop_index('ix_project_created_at_id', table_name='project')
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_column('user', 'created_at')
@@ -0,0 +1,25 @@
+"""Add user logo_variants
+
+Revision ID: 7b2e9d4c6a31
+Revises: 5c9d2b7e4a10
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9d4c6a31'
+down_revision = '5c9d2b7e4a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('logo_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column('user', 'logo_variants')
@@ -0,0 +1,44 @@
+"""Add full-text search vectors to VendorProfile and User
+
+Revision ID: 9a5c3e7b1f24
+Revises: 4b8e1f0c2d6a
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5c3e7b1f24'
+down_revision = '4b8e1f0c2d6a'
+branch_labels = None
+depends_on = None
+
+
+VENDORPROFILE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(main_goal, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(main_goal, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+USER_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(company_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company_name, '')), 'A')"
+)
+
+
+def upgrade():
+    # Stored generated columns are filled for existing rows on creation
+    op.add_column('vendorprofile', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(VENDORPROFILE_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_vendorprofile_search_vector', 'vendorprofile', ['search_vector'], unique=False, postgresql_using='gin')
+    op.add_column('user', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(USER_SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_user_search_vector', 'user', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_user_search_vector', table_name='user', postgresql_using='gin')
+    op.drop_column('user', 'search_vector')
+    op.drop_index('ix_vendorprofile_search_vector', table_name='vendorprofile', postgresql_using='gin')
+    op.drop_column('vendorprofile', 'search_vector')
@@ -0,0 +1,30 @@
+"""Add updated_at to user, vendorprofile and project
+
+Revision ID: 9d4f1c3a8e52
+Revises: 7b2e9d4c6a31
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f1c3a8e52'
+down_revision = '7b2e9d4c6a31'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'vendorprofile', 'project')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+        # The application sets the value, the default only fills existing rows
+        op.alter_column(table, 'updated_at', server_default=None)
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,41 @@
+"""Add user_rating_summary table
+
+Revision ID: c7d2e4f9a1b3
+Revises: 8fde706fa7de
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e4f9a1b3'
+down_revision = '8fde706fa7de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_rating_summary',
+    sa.Column('reviewed_user_id', sa.Uuid(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_avg', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['reviewed_user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('reviewed_user_id')
+    )
+    op.create_index(op.f('ix_user_rating_summary_rating_avg'), 'user_rating_summary', ['rating_avg'], unique=False)
+
+    # Backfill from existing reviews
+    op.execute("""
+        INSERT INTO user_rating_summary (reviewed_user_id, rating_sum, rating_count, rating_avg)
+        SELECT reviewed_user_id, sum(rating), count(id), avg(rating)::float
+        FROM review
+        GROUP BY reviewed_user_id
+    """)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_rating_summary_rating_avg'), table_name='user_rating_summary')
+    op.drop_table('user_rating_summary')
@@ -0,0 +1,28 @@
+"""Add pg_trgm indexes for User location and company name filters
+
+Revision ID: e3f1a8c5b7d2
+Revises: 9a5c3e7b1f24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f1a8c5b7d2'
+down_revision = '9a5c3e7b1f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Expressions must match lower(...) in the vendor search filters
+    op.create_index('ix_user_location_trgm', 'user', [sa.text('lower(location) gin_trgm_ops')], unique=False, postgresql_using='gin')
+    op.create_index('ix_user_company_name_trgm', 'user', [sa.text('lower(company_name) gin_trgm_ops')], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_user_company_name_trgm', table_name='user', postgresql_using='gin')
+    op.drop_index('ix_user_location_trgm', table_name='user', postgresql_using='gin')
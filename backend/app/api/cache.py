@@ -0,0 +1,116 @@
+import functools
+import inspect
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.serialization import type_adapter
+from app.core.cache import (
+    CATALOG_TAG,
+    VENDORS_TAG,
+    project_tag,
+    response_cache,
+    user_tag,
+    vendor_tag,
+)
+from app.models import (
+    PaginatedVendorProfilesPublic,
+    ProjectPublic,
+    UserPublic,
+    VendorProfilePublic,
+)
+
+
+def normalize_params(params: dict[str, Any]) -> str:
+    """
+    Query string of the parsed endpoint parameters in a canonical form:
+    sorted names, unset parameters and empty lists dropped, list values
+    sorted, so equivalent requests share a cache entry
+    """
+    items = []
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        values = sorted(map(str, value)) if isinstance(value, list | tuple) else [value]
+        for v in values:
+            if isinstance(v, bool):
+                v = "true" if v else "false"
+            items.append((name, str(v)))
+    return urlencode(items)
+
+
+def cache_response(
+    model: Any,
+    *,
+    tags: Callable[[Any], Iterable[str]],
+    exclude: tuple[str, ...] = ("session",),
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Cache the JSON response of a public GET endpoint in app.core.cache.
+
+    The key is the endpoint and its normalized parameters, except the
+    dependencies in exclude. tags() gets the validated response model and
+    returns the tags invalidating the entry, CATALOG_TAG is always added.
+    Exceptions such as 404 are not cached.
+    """
+    adapter = type_adapter(model)
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        endpoint = fn.__name__
+        is_async = inspect.iscoroutinefunction(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(**kwargs: Any) -> Any:
+            params = {k: v for k, v in kwargs.items() if k not in exclude}
+            key = f"{fn.__module__}.{endpoint}?{normalize_params(params)}"
+            cached = await response_cache.get(key, endpoint=endpoint)
+            if cached is not None:
+                return Response(cached, media_type="application/json")
+
+            since = time.time()
+            if is_async:
+                result = await fn(**kwargs)
+            else:
+                result = await run_in_threadpool(fn, **kwargs)
+            value = adapter.validate_python(result, from_attributes=True)
+            body = adapter.dump_json(value)
+            await response_cache.set(
+                key, body, tags=[CATALOG_TAG, *tags(value)], since=since
+            )
+            return Response(body, media_type="application/json")
+
+        return wrapper
+
+    return decorator
+
+
+# Tags of the cached responses, by the entities they render
+
+
+def vendor_list_tags(_page: PaginatedVendorProfilesPublic) -> list[str]:
+    return [VENDORS_TAG]
+
+
+def vendor_profile_tags(vendor: VendorProfilePublic) -> list[str]:
+    tags = [vendor_tag(vendor.id)]
+    if vendor.user:
+        tags.append(user_tag(vendor.user.id))
+    return tags
+
+
+def user_tags(user: UserPublic) -> list[str]:
+    tags = [user_tag(user.id)]
+    if user.vendor_profile:
+        tags.extend(vendor_profile_tags(user.vendor_profile))
+    return tags
+
+
+def project_tags(project: ProjectPublic) -> list[str]:
+    tags = [project_tag(project.id), *user_tags(project.owner)]
+    if project.vendor_profile:
+        tags.extend(vendor_profile_tags(project.vendor_profile))
+    return tags
@@ -1,17 +1,25 @@
-from collections.abc import Generator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Generator
+from typing import Annotated, TypeVar
+from uuid import UUID
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User, UserRole, VendorProfile
+from app.core.db import async_engine, engine
+from app.core.principals import principal_cache, principal_from_claims
+from app.crud import users as users_crud
+from app.crud.aio import users as async_users_crud
+from app.models import Principal, TokenPayload, User, UserRole, VendorProfile
+
+UserT = TypeVar("UserT", User, Principal)
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -23,22 +31,36 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Attributes must stay loaded after commit: lazy refresh is not possible
+    # outside of an await
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_token_payload(token: str) -> tuple[UUID, TokenPayload]:
+    """User ID (the sub claim) and claims of a valid token"""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+        if token_data.sub is None:
+            raise ValueError("No sub claim")
+        return UUID(token_data.sub), token_data
+    except (InvalidTokenError, ValidationError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+
+def check_user(user: UserT | None) -> UserT:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -50,7 +72,60 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    user_id, _ = get_token_payload(token)
+    return check_user(session.get(User, user_id))
+
+
+async def get_current_user_async(session: AsyncSessionDep, token: TokenDep) -> User:
+    user_id, _ = get_token_payload(token)
+    user = await session.get(
+        User,
+        user_id,
+        options=[selectinload(User.vendor_profile)],  # type: ignore
+    )
+    return check_user(user)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+
+
+def cached_principal(user_id: UUID, token_data: TokenPayload) -> Principal | None:
+    """Principal known without a query: cached, or claims of a fresh token"""
+    principal = principal_cache.get(user_id)
+    if principal is None and principal_cache.trusts(token_data):
+        principal = principal_from_claims(token_data)
+    return principal
+
+
+def get_current_principal(session: SessionDep, token: TokenDep) -> Principal:
+    user_id, token_data = get_token_payload(token)
+    principal = cached_principal(user_id, token_data)
+    if principal is None:
+        principal = users_crud.get_principal(session=session, user_id=user_id)
+        if principal:
+            principal_cache.put(principal)
+    return check_user(principal)
+
+
+async def get_current_principal_async(
+    session: AsyncSessionDep, token: TokenDep
+) -> Principal:
+    user_id, token_data = get_token_payload(token)
+    principal = cached_principal(user_id, token_data)
+    if principal is None:
+        principal = await async_users_crud.get_principal(
+            session=session, user_id=user_id
+        )
+        if principal:
+            principal_cache.put(principal)
+    return check_user(principal)
+
+
+# For routes that only need to authorize the user, usually without a query
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+AsyncCurrentPrincipal = Annotated[Principal, Depends(get_current_principal_async)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -66,27 +141,90 @@ RequireSuperUser = Depends(get_current_active_superuser)
 CurrentSuperUser = Annotated[User, RequireSuperUser]
 
 
-def get_current_active_company_account(current_user: CurrentUser) -> User:
-    if current_user.role != UserRole.company:
+def check_company_account(user: UserT) -> UserT:
+    if user.role != UserRole.company:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Company account required to permit this operation",
         )
-    return current_user
+    return user
+
+
+def get_current_active_company_account(current_user: CurrentUser) -> User:
+    return check_company_account(current_user)
+
+
+async def get_current_active_company_account_async(
+    current_user: AsyncCurrentUser,
+) -> User:
+    return check_company_account(current_user)
 
 
 RequireCompanyAccount = Depends(get_current_active_company_account)
 CurrentCompanyAccount = Annotated[User, RequireCompanyAccount]
+AsyncCurrentCompanyAccount = Annotated[
+    User, Depends(get_current_active_company_account_async)
+]
+
+
+async def get_current_company_principal_async(
+    principal: AsyncCurrentPrincipal,
+) -> Principal:
+    return check_company_account(principal)
+
+
+AsyncCurrentCompanyPrincipal = Annotated[
+    Principal, Depends(get_current_company_principal_async)
+]
+
+
+def check_vendor_profile(user: User) -> VendorProfile:
+    if user.role != UserRole.vendor or not user.vendor_profile:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Vendor account required to permit this operation",
+        )
+    return user.vendor_profile
 
 
 def get_current_active_vendor_profile(current_user: CurrentUser) -> VendorProfile:
-    if current_user.role != UserRole.vendor or not current_user.vendor_profile:
+    return check_vendor_profile(current_user)
+
+
+async def get_current_active_vendor_profile_async(
+    current_user: AsyncCurrentUser,
+) -> VendorProfile:
+    # vendor_profile is eagerly loaded by get_current_user_async
+    return check_vendor_profile(current_user)
+
+
+def check_vendor_principal(principal: Principal) -> UUID:
+    if principal.role != UserRole.vendor or not principal.vendor_profile_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Vendor account required to permit this operation",
         )
-    return current_user.vendor_profile
+    return principal.vendor_profile_id
+
+
+async def get_current_vendor_profile_id_async(
+    session: AsyncSessionDep, principal: AsyncCurrentPrincipal
+) -> UUID:
+    if principal.role == UserRole.vendor and not principal.vendor_profile_id:
+        # The profile may have been created after the token was issued
+        loaded = await async_users_crud.get_principal(
+            session=session, user_id=principal.id
+        )
+        principal = check_user(loaded)
+        principal_cache.put(principal)
+    return check_vendor_principal(principal)
 
 
 RequireVendorProfile = Depends(get_current_active_vendor_profile)
 CurrentVendorProfile = Annotated[VendorProfile, RequireVendorProfile]
+AsyncCurrentVendorProfile = Annotated[
+    VendorProfile, Depends(get_current_active_vendor_profile_async)
+]
+AsyncCurrentVendorProfileId = Annotated[
+    UUID, Depends(get_current_vendor_profile_id_async)
+]
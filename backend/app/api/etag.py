@@ -0,0 +1,159 @@
+"""
+Conditional GET: weak ETags computed from row versions.
+
+An endpoint decorated with conditional_get() first asks its etag function
+for the version of the data it renders, one small query over the updated_at
+columns. A request whose If-None-Match matches gets a 304 before the
+endpoint loads, enriches and serializes anything.
+"""
+
+import functools
+import hashlib
+import inspect
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.catalog import service_catalog
+from app.core.pool import WORKER
+from app.crud.aio import projects as projects_crud
+from app.crud.aio import requests as requests_crud
+from app.crud.aio import vendors as vendors_crud
+
+CONDITIONAL_REQUESTS = Counter(
+    "conditional_requests_total",
+    "Conditional GET responses by endpoint and result (not_modified or modified)",
+    ["endpoint", "result", "worker"],
+)
+
+# Names of the parameters added to the endpoint, removed before calling it
+_REQUEST_PARAM = "etag_request"
+_RESPONSE_PARAM = "etag_response"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag of the version parts, e.g. updated_at values"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of If-None-Match with etag, RFC 9110 13.1.2"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def conditional_get(
+    etag: Callable[..., Any], *, cache_control: str = "no-cache"
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Answer If-None-Match of the endpoint with 304 Not Modified.
+
+    etag gets the endpoint parameters it declares by name, and returns the
+    ETag of the response or None when the endpoint should decide, e.g. to
+    return 404. It may be async. Apply above cache_response(), the ETag is
+    checked before the response cache.
+    """
+    etag_params = set(inspect.signature(etag).parameters)
+    etag_is_async = inspect.iscoroutinefunction(etag)
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        endpoint = fn.__name__
+        is_async = inspect.iscoroutinefunction(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(**kwargs: Any) -> Any:
+            request: Request = kwargs.pop(_REQUEST_PARAM)
+            response: Response = kwargs.pop(_RESPONSE_PARAM)
+            args = {k: v for k, v in kwargs.items() if k in etag_params}
+            if etag_is_async:
+                value = await etag(**args)
+            else:
+                value = await run_in_threadpool(etag, **args)
+
+            headers = {}
+            if value is not None:
+                headers = {"ETag": value, "Cache-Control": cache_control}
+                if etag_matches(request.headers.get("if-none-match"), value):
+                    CONDITIONAL_REQUESTS.labels(endpoint, "not_modified", WORKER).inc()
+                    return Response(status_code=304, headers=headers)
+                CONDITIONAL_REQUESTS.labels(endpoint, "modified", WORKER).inc()
+
+            if is_async:
+                result = await fn(**kwargs)
+            else:
+                result = await run_in_threadpool(fn, **kwargs)
+            # Returned responses skip the injected one, set the headers on both
+            target = result if isinstance(result, Response) else response
+            target.headers.update(headers)
+            return result
+
+        signature = inspect.signature(fn)
+        wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    _REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                ),
+                inspect.Parameter(
+                    _RESPONSE_PARAM,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Response,
+                ),
+            ]
+        )
+        return wrapper
+
+    return decorator
+
+
+# ETags of the responses, by the versions of the rows they render. Services
+# are rendered with their category, the catalog version covers both.
+
+
+def catalog_etag() -> str:
+    return make_etag(service_catalog.get().version)
+
+
+async def vendor_profile_etag(
+    *, session: AsyncSession, vendor_profile_id: UUID
+) -> str | None:
+    version = await vendors_crud.get_vendor_profile_version(
+        session=session, vendor_profile_id=vendor_profile_id
+    )
+    if version is None:
+        return None
+    return make_etag(*version, service_catalog.get().version)
+
+
+async def project_etag(*, session: AsyncSession, project_id: UUID) -> str | None:
+    version = await projects_crud.get_project_version(
+        session=session, project_id=project_id
+    )
+    if version is None:
+        return None
+    return make_etag(*version, service_catalog.get().version)
+
+
+async def proposal_etag(
+    *, session: AsyncSession, request_id: UUID, current_vendor_profile_id: UUID
+) -> str | None:
+    version = await requests_crud.get_proposal_version(
+        session=session,
+        request_id=request_id,
+        vendor_profile_id=current_vendor_profile_id,
+    )
+    if version is None:
+        return None
+    return make_etag(*version, service_catalog.get().version)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
 from app.crud import feedback as feedback_crud
+from app.crud.pagination import next_cursor
 from app.models import (
     Message,
     PaginatedPlatformFeedbackPublic,
@@ -32,9 +33,12 @@ def get_feedback(
     session: SessionDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     feedback, total = feedback_crud.list_feedback(
-        session=session, skip=skip, limit=limit
+        session=session, skip=skip, limit=limit, cursor=cursor
     )
     result = [PlatformFeedbackPublic.model_validate(fb) for fb in feedback]
-    return PaginatedPlatformFeedbackPublic(result=result, total=total)
+    return PaginatedPlatformFeedbackPublic(
+        result=result, total=total, next_cursor=next_cursor(feedback, limit=limit)
+    )
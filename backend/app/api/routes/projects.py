@@ -2,14 +2,20 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status
 
+from app.api.cache import cache_response, project_tags
 from app.api.deps import (
-    CurrentCompanyAccount,
-    CurrentVendorProfile,
-    SessionDep,
+    AsyncCurrentCompanyAccount,
+    AsyncCurrentCompanyPrincipal,
+    AsyncCurrentVendorProfile,
+    AsyncSessionDep,
 )
-from app.crud import projects as crud
-from app.crud import requests as requests_crud
-from app.crud import vendors as vendors_crud
+from app.api.etag import conditional_get, project_etag
+from app.api.serialization import model_response, page
+from app.crud.aio import projects as crud
+from app.crud.aio import requests as requests_crud
+from app.crud.aio import vendors as vendors_crud
+from app.crud.loaders import PROJECT_PUBLIC_OPTIONS
+from app.crud.pagination import next_cursor
 from app.models import (
     PaginatedProjectRequestsPublicVendorFull,
     PaginatedVendorProfilesPublic,
@@ -26,26 +32,34 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.get("/", response_model=list[ProjectWithIncomingCount])
-def list_my_projects(
-    session: SessionDep,
-    company_account: CurrentCompanyAccount,
+async def list_my_projects(
+    session: AsyncSessionDep,
+    company_account: AsyncCurrentCompanyPrincipal,
     is_archived: bool = False,
 ):
-    return crud.get_projects_for_owner(
+    return await crud.get_projects_for_owner(
         session=session, owner_id=company_account.id, is_archived=is_archived
     )
 
 
 @router.post("/", response_model=ProjectPublic)
-def create_new_project(
-    session: SessionDep, company_account: CurrentCompanyAccount, data: ProjectCreate
+async def create_new_project(
+    session: AsyncSessionDep,
+    company_account: AsyncCurrentCompanyAccount,
+    data: ProjectCreate,
 ):
-    return crud.create_project(session=session, owner_id=company_account.id, data=data)
+    return await crud.create_project(
+        session=session, owner_id=company_account.id, data=data
+    )
 
 
 @router.get("/{project_id}", response_model=ProjectPublic)
-def get_project_detail(project_id: UUID, session: SessionDep):
-    project = crud.get_project(session=session, project_id=project_id)
+@conditional_get(project_etag)
+@cache_response(ProjectPublic, tags=project_tags)
+async def get_project_detail(project_id: UUID, session: AsyncSessionDep):
+    project = await crud.get_project(
+        session=session, project_id=project_id, options=PROJECT_PUBLIC_OPTIONS
+    )
     if not project:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Project not found")
 
@@ -55,60 +69,60 @@ def get_project_detail(project_id: UUID, session: SessionDep):
 @router.get(
     "/{project_id}/vendors/matching", response_model=PaginatedVendorProfilesPublic
 )
-def get_matching_vendors(
+async def get_matching_vendors(
     project_id: UUID,
-    session: SessionDep,
+    session: AsyncSessionDep,
     skip: int = 0,
     limit: int = 100,
 ):
-    project = crud.get_project(session=session, project_id=project_id)
+    project = await crud.get_project(session=session, project_id=project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    ranked, total = vendors_crud.get_ranked_vendors_for_project(
+    ranked, total = await vendors_crud.get_ranked_vendors_for_project(
         session=session, project=project, skip=skip, limit=limit
     )
 
-    vendors = [
-        vendors_crud.enrich_vendor_profile_with_reviews(
-            session=session, vendor_profile=vendor
-        )
-        for vendor, score in ranked
-    ]
+    vendors = await vendors_crud.enrich_vendor_profiles_with_reviews(
+        session=session, vendor_profiles=[vendor for vendor, _ in ranked]
+    )
 
-    return {"result": vendors, "total": total}
+    return model_response(
+        PaginatedVendorProfilesPublic,
+        page(PaginatedVendorProfilesPublic, vendors, total=total),
+    )
 
 
 @router.post(
     "/{project_id}/request/company/{vendor_profile_id}",
     response_model=ProjectRequestPublic,
 )
-def send_project_request_company(
+async def send_project_request_company(
     project_id: UUID,
     vendor_profile_id: UUID,
-    session: SessionDep,
-    company_account: CurrentCompanyAccount,
+    session: AsyncSessionDep,
+    company_account: AsyncCurrentCompanyAccount,
 ):
-    project = crud.get_project(session=session, project_id=project_id)
+    project = await crud.get_project(session=session, project_id=project_id)
     if not project or project.owner_id != company_account.id:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Project not found or not owned")
 
-    vendor_profile = vendors_crud.get_vendor_profile(
+    vendor_profile = await vendors_crud.get_vendor_profile(
         session=session, vendor_profile_id=vendor_profile_id
     )
     if not vendor_profile:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Vendor profile not found")
 
-    existing = requests_crud.get_request(
+    existing = await requests_crud.get_request(
         session=session, project_id=project_id, vendor_profile_id=vendor_profile_id
     )
 
     if existing:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Request already sent")
 
-    req = requests_crud.create_request(
+    req = await requests_crud.create_request(
         session=session,
         project_id=project_id,
         vendor_profile_id=vendor_profile.id,
@@ -121,17 +135,17 @@ def send_project_request_company(
     "/{project_id}/request/vendor",
     response_model=ProjectRequestPublic,
 )
-def send_project_request_vendor(
+async def send_project_request_vendor(
     project_id: UUID,
-    session: SessionDep,
-    current_vendor_profile: CurrentVendorProfile,
+    session: AsyncSessionDep,
+    current_vendor_profile: AsyncCurrentVendorProfile,
     body: VendorProposalBody,
 ):
-    project = crud.get_project(session=session, project_id=project_id)
+    project = await crud.get_project(session=session, project_id=project_id)
     if not project:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Project not found")
 
-    existing = requests_crud.get_request(
+    existing = await requests_crud.get_request(
         session=session,
         project_id=project_id,
         vendor_profile_id=current_vendor_profile.id,
@@ -159,7 +173,7 @@ def send_project_request_vendor(
                 "All project requirements must have a feasibility score",
             )
 
-    req = requests_crud.create_request(
+    req = await requests_crud.create_request(
         session=session,
         project_id=project_id,
         vendor_profile_id=current_vendor_profile.id,
@@ -177,45 +191,51 @@ def send_project_request_vendor(
     "/{project_id}/requests",
     response_model=PaginatedProjectRequestsPublicVendorFull,
 )
-def get_project_requests(
+async def get_project_requests(
     project_id: UUID,
-    session: SessionDep,
-    company_account: CurrentCompanyAccount,
+    session: AsyncSessionDep,
+    company_account: AsyncCurrentCompanyPrincipal,
     initiator: RequestInitiator | None = None,
     request_status: RequestStatus | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
-    project = crud.get_project(session=session, project_id=project_id)
+    project = await crud.get_project(session=session, project_id=project_id)
     if not project:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Project not found")
 
     if project.owner_id != company_account.id:
         raise HTTPException(status.HTTP_403_FORBIDDEN)
 
-    result, total = requests_crud.get_requests_for_project(
+    result, total = await requests_crud.get_requests_for_project(
         session=session,
         project_id=project_id,
         initiator=initiator,
         status=request_status,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
 
-    return {"result": result, "total": total}
+    return {
+        "result": result,
+        "total": total,
+        "next_cursor": next_cursor(result, limit=limit),
+    }
 
 
 @router.post("/{project_id}/archive", response_model=ProjectPublic)
-def archive_project(
+async def archive_project(
     project_id: UUID,
-    session: SessionDep,
-    company_account: CurrentCompanyAccount,
+    session: AsyncSessionDep,
+    company_account: AsyncCurrentCompanyAccount,
 ):
-    project = crud.get_project(session=session, project_id=project_id)
+    project = await crud.get_project(session=session, project_id=project_id)
     if not project or project.owner_id != company_account.id:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Project not found or not owned")
 
     if project.is_archived:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Project is already archived")
 
-    return crud.archive_project(session=session, project=project)
+    return await crud.archive_project(session=session, project=project)
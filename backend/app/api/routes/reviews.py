@@ -2,8 +2,9 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentPrincipal, CurrentUser, SessionDep
 from app.crud import reviews as crud
+from app.crud.pagination import next_cursor
 from app.models import (
     PaginatedReviewsPublic,
     ReviewCreate,
@@ -42,6 +43,7 @@ def get_reviews_for_user(
     session: SessionDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get reviews for a user (vendor or company)"""
     reviews, total = crud.get_reviews_for_user(
@@ -49,8 +51,13 @@ def get_reviews_for_user(
         user_id=user_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
-    return {"result": reviews, "total": total}
+    return {
+        "result": reviews,
+        "total": total,
+        "next_cursor": next_cursor(reviews, limit=limit),
+    }
 
 
 @router.get(
@@ -62,6 +69,7 @@ def get_reviews_for_vendor(
     session: SessionDep,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get reviews for a vendor by vendor_profile_id"""
     reviews, total = crud.get_reviews_for_vendor(
@@ -69,8 +77,13 @@ def get_reviews_for_vendor(
         vendor_profile_id=vendor_profile_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
-    return {"result": reviews, "total": total}
+    return {
+        "result": reviews,
+        "total": total,
+        "next_cursor": next_cursor(reviews, limit=limit),
+    }
 
 
 @router.get(
@@ -79,9 +92,10 @@ def get_reviews_for_vendor(
 )
 def get_my_reviews(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get reviews written by the current user"""
     reviews, total = crud.get_reviews_by_author(
@@ -89,8 +103,13 @@ def get_my_reviews(
         author_id=current_user.id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
-    return {"result": reviews, "total": total}
+    return {
+        "result": reviews,
+        "total": total,
+        "next_cursor": next_cursor(reviews, limit=limit),
+    }
 
 
 @router.get(
@@ -99,9 +118,10 @@ def get_my_reviews(
 )
 def get_reviews_received_by_me(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get reviews received by the current user"""
     reviews, total = crud.get_reviews_for_user(
@@ -109,8 +129,13 @@ def get_reviews_received_by_me(
         user_id=current_user.id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
-    return {"result": reviews, "total": total}
+    return {
+        "result": reviews,
+        "total": total,
+        "next_cursor": next_cursor(reviews, limit=limit),
+    }
 
 
 @router.get(
@@ -119,7 +144,7 @@ def get_reviews_received_by_me(
 )
 def get_users_to_review(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
 ):
     """Get users that the current user can leave a review for (from completed projects)"""
     return crud.get_users_to_review(session=session, current_user_id=current_user.id)
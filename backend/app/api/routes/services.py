@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, status
 
 from app.api.deps import RequireSuperUser, SessionDep
+from app.api.etag import catalog_etag, conditional_get
 from app.api.exceptions import AlreadyExistsError
 from app.crud import services as crud
 from app.models import (
@@ -20,8 +21,9 @@ router = APIRouter(prefix="/catalog", tags=["catalog"])
 
 # ---------- PUBLIC ----------
 @router.get("/categories", response_model=list[CategoryPublic])
-def list_categories(session: SessionDep):
-    return crud.get_categories_with_services(session=session)
+@conditional_get(catalog_etag)
+def list_categories():
+    return crud.get_categories_with_services()
 
 
 # ---------- ADMIN ----------
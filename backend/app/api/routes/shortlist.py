@@ -101,9 +101,6 @@ def get_shortlisted_vendors(
     vendors = crud.get_shortlisted_vendors_for_project(
         session=session, project_id=project_id
     )
-    return [
-        vendors_crud.enrich_vendor_profile_with_reviews(
-            session=session, vendor_profile=vendor
-        )
-        for vendor in vendors
-    ]
+    return vendors_crud.enrich_vendor_profiles_with_reviews(
+        session=session, vendor_profiles=vendors
+    )
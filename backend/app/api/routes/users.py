@@ -2,26 +2,41 @@ import os
 import uuid
 from typing import Any
 
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
 from sqlmodel import col, delete, func, select
 
+from app.api.cache import cache_response, user_tags
 from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
 )
+from app.core.cache import VENDORS_TAG, response_cache, user_tag
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.principals import principal_cache
+from app.core.security import get_password_hash_async, verify_password_async
+from app.crud import emails as emails_crud
 from app.crud import reviews as reviews_crud
 from app.crud import users
+from app.crud.pagination import (
+    estimated_total,
+    keyset_order,
+    next_cursor,
+    paginate,
+)
 from app.file_utils import (
-    avatar_url_to_path,
+    content_filename,
     delete_file_if_exists,
     ensure_dir,
-    generate_avatar_filename,
-    save_file,
+    move_file,
+    receive_image,
+    touch_files,
     validate_image,
 )
+from app.images import make_thumbnails_async, thumbnail_names
 from app.models import (
     Item,
     Message,
@@ -35,7 +50,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -45,18 +60,26 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> Any:
     """
     Retrieve users.
     """
 
+    # Planner estimate instead of a full count once the users table is large
     count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    count = estimated_total(session=session, model=User, total_stmt=count_statement)
 
-    statement = select(User).offset(skip).limit(limit)
+    statement = select(User).order_by(*keyset_order(User))
+    statement = paginate(statement, model=User, cursor=cursor, skip=skip, limit=limit)
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)  # type: ignore
+    return UsersPublic(
+        data=users,  # type: ignore
+        count=count,
+        next_cursor=next_cursor(users, limit=limit),
+    )
 
 
 @router.post(
@@ -73,16 +96,20 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
             detail="The user with this email already exists in the system.",
         )
 
-    user = users.create_user(session=session, user_create=user_in)
+    # The user and its welcome email are committed together
+    user = users.add_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        emails_crud.create_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
         )
+    session.commit()
+    session.refresh(user)
     return user
 
 
@@ -94,63 +121,81 @@ def update_user_me(
     Update own user.
     """
     user_data = user_in.model_dump(exclude_unset=True)
+    if user_data.get("logo_url", current_user.logo_url) != current_user.logo_url:
+        current_user.logo_variants = None
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    response_cache.invalidate(VENDORS_TAG, user_tag(current_user.id))
     session.refresh(current_user)
     return current_user
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
-    *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePassword, current_user: AsyncCurrentUser
 ) -> Any:
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = await get_password_hash_async(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
-    session.commit()
+    await session.commit()
     return Message(message="Password updated successfully")
 
 
 @router.post("/me/avatar", response_model=UserPublic)
 async def upload_avatar(
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
     file: UploadFile,
 ):
     validate_image(file)
 
-    ext = (file.filename or "jpg").split(".")[-1].lower()
-    filename = generate_avatar_filename(
-        current_user.full_name, current_user.company_name, ext
-    )
-
     save_dir = os.path.join(settings.MEDIA_ROOT, "avatar")
-    ensure_dir(save_dir)
-
-    file_path = os.path.join(save_dir, filename)
-
-    old_avatar_path = avatar_url_to_path(current_user.logo_url, settings.MEDIA_ROOT)
-    delete_file_if_exists(old_avatar_path)
-
-    await save_file(file_path, file)
-
-    avatar_url = f"{settings.MEDIA_HOST}/media/avatar/{filename}"
-
-    current_user.logo_url = avatar_url
+    await anyio.to_thread.run_sync(ensure_dir, save_dir)
+
+    tmp_path, ext, digest = await receive_image(file, save_dir)
+    filename = content_filename(digest, ext)
+    variants = thumbnail_names(digest)
+    stored = [filename, *(n for names in variants.values() for n in names.values())]
+    # The same image was uploaded before, its files are shared
+    if await anyio.to_thread.run_sync(
+        touch_files, [os.path.join(save_dir, name) for name in stored]
+    ):
+        await anyio.to_thread.run_sync(delete_file_if_exists, tmp_path)
+    else:
+        try:
+            await make_thumbnails_async(tmp_path, save_dir, digest)
+        except ValueError:
+            await anyio.to_thread.run_sync(delete_file_if_exists, tmp_path)
+            raise HTTPException(400, "Invalid image file")
+        await move_file(tmp_path, os.path.join(save_dir, filename))
+
+    # The previous files are removed by app.media_gc once unreferenced
+    current_user.logo_url = f"{settings.MEDIA_HOST}/media/avatar/{filename}"
+    current_user.logo_variants = {
+        fmt: {
+            size: f"{settings.MEDIA_HOST}/media/avatar/{name}"
+            for size, name in names.items()
+        }
+        for fmt, names in variants.items()
+    }
     session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
-
+    await session.commit()
+    await response_cache.ainvalidate(VENDORS_TAG, user_tag(current_user.id))
+    if current_user.vendor_profile:
+        # UserPublic includes the services of the profile
+        await session.refresh(current_user.vendor_profile, ["services"])
     return current_user
 
 
@@ -171,8 +216,15 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
+    reviewed_user_ids = reviews_crud.get_reviewed_user_ids_by_author(
+        session=session, author_id=current_user.id
+    )
     session.delete(current_user)
     session.commit()
+    principal_cache.invalidate(current_user.id)
+    response_cache.invalidate(VENDORS_TAG, user_tag(current_user.id))
+    # Reviews written by the user are removed by FK cascade
+    reviews_crud.rebuild_rating_summaries(session=session, user_ids=reviewed_user_ids)
     return Message(message="User deleted successfully")
 
 
@@ -193,6 +245,7 @@ def register_user(session: SessionDep, user_in: UserRegister) -> Any:
 
 
 @router.get("/{user_id}", response_model=UserPublic)
+@cache_response(UserPublic, tags=user_tags)
 def read_user_by_id(user_id: uuid.UUID, session: SessionDep) -> UserPublic:
     """
     Get a specific user by id.
@@ -260,8 +313,15 @@ def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
+    reviewed_user_ids = reviews_crud.get_reviewed_user_ids_by_author(
+        session=session, author_id=user_id
+    )
     statement = delete(Item).where(col(Item.owner_id) == user_id)
     session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    principal_cache.invalidate(user_id)
+    response_cache.invalidate(VENDORS_TAG, user_tag(user_id))
+    # Reviews written by the user are removed by FK cascade
+    reviews_crud.rebuild_rating_summaries(session=session, user_ids=reviewed_user_ids)
     return Message(message="User deleted successfully")
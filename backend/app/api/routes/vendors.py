@@ -2,19 +2,31 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.api.deps import CurrentUser, CurrentVendorProfile, SessionDep
-from app.crud import projects as projects_crud
-from app.crud import requests as requests_crud
-from app.crud import reviews as reviews_crud
-from app.crud import vendors as crud
+from app.api.cache import cache_response, vendor_list_tags, vendor_profile_tags
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncCurrentVendorProfileId,
+    AsyncSessionDep,
+)
+from app.api.etag import conditional_get, proposal_etag, vendor_profile_etag
+from app.api.serialization import model_response, page
+from app.crud.aio import projects as projects_crud
+from app.crud.aio import requests as requests_crud
+from app.crud.aio import reviews as reviews_crud
+from app.crud.aio import vendors as crud
+from app.crud.loaders import (
+    REQUEST_PROJECT_FULL_OPTIONS,
+    VENDOR_PROFILE_PUBLIC_OPTIONS,
+)
+from app.crud.pagination import next_cursor
 from app.models import (
     PaginatedProjectRequestsPublicProjectFull,
     PaginatedProjectsPublic,
     PaginatedVendorProfilesPublic,
+    Project,
     ProjectPublic,
     ProjectRequestPublicProjectFull,
     RequestStatus,
-    UserPublic,
     UserRole,
     VendorProfileCreate,
     VendorProfilePublic,
@@ -23,44 +35,71 @@ from app.models import (
 router = APIRouter(prefix="/vendors", tags=["vendors"])
 
 
+def set_owner_rating(
+    *,
+    project_public: ProjectPublic,
+    project: Project,
+    stats: dict[UUID, tuple[float | None, int]],
+) -> None:
+    """Set the rating of the project owner from preloaded stats"""
+    if not project.owner:
+        return
+    # The owner was validated with project_public, no need to build it again
+    owner = project_public.owner
+    owner.rating, owner.ratingCount = stats[project.owner.id]
+
+
 @router.get("/", response_model=PaginatedVendorProfilesPublic)
-def search_vendors(
-    session: SessionDep,
+@cache_response(PaginatedVendorProfilesPublic, tags=vendor_list_tags)
+async def search_vendors(
+    session: AsyncSessionDep,
     service_ids: list[UUID] | None = Query(None),
     location: str | None = None,
+    location_fuzzy: bool = False,
+    company_name: str | None = None,
+    q: str | None = Query(None, max_length=200),
     skip: int = 0,
     limit: int = 100,
 ):
     """
-    Search for vendors by services and location.
+    Search for vendors by services, keywords, location and company name.
+    With location_fuzzy, the location may contain typos.
     Public endpoint - no authentication required.
     """
-    vendors, total = crud.search_vendors(
+    vendors, total = await crud.search_vendors(
         session=session,
         service_ids=service_ids,
         location=location,
+        location_fuzzy=location_fuzzy,
+        company_name=company_name,
+        q=q.strip() if q else None,
         skip=skip,
         limit=limit,
     )
 
     # Enrich with reviews
-    result = [
-        crud.enrich_vendor_profile_with_reviews(session=session, vendor_profile=vendor)
-        for vendor in vendors
-    ]
+    result = await crud.enrich_vendor_profiles_with_reviews(
+        session=session, vendor_profiles=vendors
+    )
 
     return {"result": result, "total": total}
 
 
 @router.get("/me", response_model=VendorProfilePublic)
-def get_my_vendor_profile(current_vendor_profile: CurrentVendorProfile):
-    return current_vendor_profile
+async def get_my_vendor_profile(
+    session: AsyncSessionDep, current_vendor_profile_id: AsyncCurrentVendorProfileId
+):
+    return await crud.get_vendor_profile(
+        session=session,
+        vendor_profile_id=current_vendor_profile_id,
+        options=VENDOR_PROFILE_PUBLIC_OPTIONS,
+    )
 
 
 @router.post("/me", response_model=VendorProfilePublic)
-def create_vendor_profile(
-    session: SessionDep,
-    current_user: CurrentUser,
+async def create_vendor_profile(
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
     data: VendorProfileCreate,
 ):
     if current_user.role != UserRole.vendor:
@@ -71,7 +110,7 @@ def create_vendor_profile(
     if current_user.vendor_profile:
         raise HTTPException(status.HTTP_409_CONFLICT, "Profile already exists")
 
-    return crud.create_vendor_profile(
+    return await crud.create_vendor_profile(
         session=session, user_id=current_user.id, data=data
     )
 
@@ -80,49 +119,50 @@ def create_vendor_profile(
     "/available-projects",
     response_model=PaginatedProjectsPublic,
 )
-def get_available_projects_for_vendor(
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+async def get_available_projects_for_vendor(
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
     skip: int = 0,
     limit: int = 50,
 ):
-    rows, total = crud.get_available_ranked_projects_for_vendor(
+    rows, total = await crud.get_available_ranked_projects_for_vendor(
         session=session,
-        vendor_profile_id=current_vendor.id,
+        vendor_profile_id=current_vendor_profile_id,
         skip=skip,
         limit=limit,
     )
 
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session, user_ids=[p.owner_id for p, _ in rows if p.owner_id]
+    )
+
     # Convert to ProjectPublic and enrich with owner rating
     result = []
     for project, _ in rows:
         project_public = ProjectPublic.model_validate(project)
-        if project.owner:
-            rating, count = reviews_crud.get_user_rating_stats(
-                session=session, user_id=project.owner.id
-            )
-            owner_public = UserPublic.model_validate(project.owner)
-            owner_public.rating = rating
-            owner_public.ratingCount = count
-            project_public.owner = owner_public
+        set_owner_rating(project_public=project_public, project=project, stats=stats)
         result.append(project_public)
 
-    return {"result": result, "total": total}
+    return model_response(
+        PaginatedProjectsPublic, page(PaginatedProjectsPublic, result, total=total)
+    )
 
 
 @router.get("/{vendor_profile_id}", response_model=VendorProfilePublic)
-def get_vendor_profile(
-    session: SessionDep, vendor_profile_id: UUID
+@conditional_get(vendor_profile_etag)
+@cache_response(VendorProfilePublic, tags=vendor_profile_tags)
+async def get_vendor_profile(
+    session: AsyncSessionDep, vendor_profile_id: UUID
 ) -> VendorProfilePublic:
     """Get vendor profile by ID (public endpoint)"""
-    vendor_profile = crud.get_vendor_profile(
+    vendor_profile = await crud.get_vendor_profile(
         session=session, vendor_profile_id=vendor_profile_id
     )
     if not vendor_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Vendor profile not found"
         )
-    return crud.enrich_vendor_profile_with_reviews(
+    return await crud.enrich_vendor_profile_with_reviews(
         session=session, vendor_profile=vendor_profile
     )
 
@@ -131,158 +171,201 @@ def get_vendor_profile(
     "/me/requests/incoming",
     response_model=PaginatedProjectRequestsPublicProjectFull,
 )
-def get_incoming_requests_for_vendor(
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+async def get_incoming_requests_for_vendor(
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
-    vendor_profile_id = current_vendor.id
-    requests, total = requests_crud.get_incoming_requests_for_vendor(
+    requests, total = await requests_crud.get_incoming_requests_for_vendor(
         session=session,
-        vendor_profile_id=vendor_profile_id,
+        vendor_profile_id=current_vendor_profile_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+    )
+
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session,
+        user_ids=[
+            r.project.owner_id for r in requests if r.project and r.project.owner_id
+        ],
     )
 
     # Convert to ProjectRequestPublicProjectFull and enrich with owner rating
     result = []
     for request in requests:
         request_public = ProjectRequestPublicProjectFull.model_validate(request)
-        if request.project and request.project.owner:
-            rating, count = reviews_crud.get_user_rating_stats(
-                session=session, user_id=request.project.owner.id
+        if request.project and request_public.project:
+            set_owner_rating(
+                project_public=request_public.project,
+                project=request.project,
+                stats=stats,
             )
-            owner_public = UserPublic.model_validate(request.project.owner)
-            owner_public.rating = rating
-            owner_public.ratingCount = count
-            request_public.project.owner = owner_public
         result.append(request_public)
 
-    return {"result": result, "total": total}
+    return model_response(
+        PaginatedProjectRequestsPublicProjectFull,
+        page(
+            PaginatedProjectRequestsPublicProjectFull,
+            result,
+            total=total,
+            next_cursor=next_cursor(requests, limit=limit),
+        ),
+    )
 
 
 @router.get(
     "/me/proposals/{request_id}",
     response_model=ProjectRequestPublicProjectFull,
 )
-def get_my_proposal(
+@conditional_get(proposal_etag, cache_control="private, no-cache")
+async def get_my_proposal(
     request_id: UUID,
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
 ):
-    req = requests_crud.get_request_by_id(session=session, request_id=request_id)
-    if not req or req.vendor_profile_id != current_vendor.id or req.initiator.value != 'vendor':
+    req = await requests_crud.get_request_by_id(
+        session=session, request_id=request_id, options=REQUEST_PROJECT_FULL_OPTIONS
+    )
+    if not req or req.vendor_profile_id != current_vendor_profile_id or req.initiator.value != 'vendor':
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Proposal not found")
 
     req_public = ProjectRequestPublicProjectFull.model_validate(req)
-    if req.project and req.project.owner:
-        rating, count = reviews_crud.get_user_rating_stats(
-            session=session, user_id=req.project.owner.id
+    if req.project and req.project.owner_id and req_public.project:
+        stats = await reviews_crud.get_rating_stats_for_users(
+            session=session, user_ids=[req.project.owner_id]
+        )
+        set_owner_rating(
+            project_public=req_public.project, project=req.project, stats=stats
         )
-        owner_public = UserPublic.model_validate(req.project.owner)
-        owner_public.rating = rating
-        owner_public.ratingCount = count
-        req_public.project.owner = owner_public
-    return req_public
+    return model_response(ProjectRequestPublicProjectFull, req_public)
 
 
 @router.get(
     "/me/proposals",
     response_model=PaginatedProjectRequestsPublicProjectFull,
 )
-def get_my_proposals(
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+async def get_my_proposals(
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
     request_status: RequestStatus | None = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
 ):
-    requests, total = requests_crud.get_vendor_proposals(
+    requests, total = await requests_crud.get_vendor_proposals(
         session=session,
-        vendor_profile_id=current_vendor.id,
+        vendor_profile_id=current_vendor_profile_id,
         status=request_status,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+    )
+
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session,
+        user_ids=[
+            r.project.owner_id for r in requests if r.project and r.project.owner_id
+        ],
     )
 
     result = []
     for req in requests:
         req_public = ProjectRequestPublicProjectFull.model_validate(req)
-        if req.project and req.project.owner:
-            rating, count = reviews_crud.get_user_rating_stats(
-                session=session, user_id=req.project.owner.id
+        if req.project and req_public.project:
+            set_owner_rating(
+                project_public=req_public.project, project=req.project, stats=stats
             )
-            owner_public = UserPublic.model_validate(req.project.owner)
-            owner_public.rating = rating
-            owner_public.ratingCount = count
-            req_public.project.owner = owner_public
         result.append(req_public)
 
-    return {"result": result, "total": total}
+    return model_response(
+        PaginatedProjectRequestsPublicProjectFull,
+        page(
+            PaginatedProjectRequestsPublicProjectFull,
+            result,
+            total=total,
+            next_cursor=next_cursor(requests, limit=limit),
+        ),
+    )
 
 
 @router.get(
     "/me/accepted-projects",
     response_model=PaginatedProjectsPublic,
 )
-def get_my_accepted_projects(
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+async def get_my_accepted_projects(
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
 ):
-    projects, total = projects_crud.get_accepted_projects_for_vendor(
+    projects, total = await projects_crud.get_accepted_projects_for_vendor(
         session=session,
-        vendor_profile_id=current_vendor.id,
+        vendor_profile_id=current_vendor_profile_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+    )
+
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session, user_ids=[p.owner_id for p in projects if p.owner_id]
     )
 
     result = []
     for project in projects:
         project_public = ProjectPublic.model_validate(project)
-        if project.owner:
-            rating, count = reviews_crud.get_user_rating_stats(
-                session=session, user_id=project.owner.id
-            )
-            owner_public = UserPublic.model_validate(project.owner)
-            owner_public.rating = rating
-            owner_public.ratingCount = count
-            project_public.owner = owner_public
+        set_owner_rating(project_public=project_public, project=project, stats=stats)
         result.append(project_public)
 
-    return {"result": result, "total": total}
+    return model_response(
+        PaginatedProjectsPublic,
+        page(
+            PaginatedProjectsPublic,
+            result,
+            total=total,
+            next_cursor=next_cursor(projects, limit=limit),
+        ),
+    )
 
 
 @router.get(
     "/me/archived-projects",
     response_model=PaginatedProjectsPublic,
 )
-def get_my_archived_projects(
-    session: SessionDep,
-    current_vendor: CurrentVendorProfile,
+async def get_my_archived_projects(
+    session: AsyncSessionDep,
+    current_vendor_profile_id: AsyncCurrentVendorProfileId,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
 ):
-    projects, total = projects_crud.get_archived_projects_for_vendor(
+    projects, total = await projects_crud.get_archived_projects_for_vendor(
         session=session,
-        vendor_profile_id=current_vendor.id,
+        vendor_profile_id=current_vendor_profile_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+    )
+
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session, user_ids=[p.owner_id for p in projects if p.owner_id]
     )
 
     result = []
     for project in projects:
         project_public = ProjectPublic.model_validate(project)
-        if project.owner:
-            rating, count = reviews_crud.get_user_rating_stats(
-                session=session, user_id=project.owner.id
-            )
-            owner_public = UserPublic.model_validate(project.owner)
-            owner_public.rating = rating
-            owner_public.ratingCount = count
-            project_public.owner = owner_public
+        set_owner_rating(project_public=project_public, project=project, stats=stats)
         result.append(project_public)
 
-    return {"result": result, "total": total}
+    return model_response(
+        PaginatedProjectsPublic,
+        page(
+            PaginatedProjectsPublic,
+            result,
+            total=total,
+            next_cursor=next_cursor(projects, limit=limit),
+        ),
+    )
@@ -0,0 +1,43 @@
+"""
+Responses serialized once.
+
+A handler returning models lets FastAPI validate them again against
+response_model, dump them to Python objects and encode those with the json
+module. Handlers building their public models from loaded rows return
+model_response() instead: pydantic-core writes the JSON straight from the
+models, and FastAPI passes returned Response objects through untouched.
+response_model stays on the route for the OpenAPI schema.
+"""
+
+import functools
+from typing import Any, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.models import PaginatedResponse
+
+P = TypeVar("P", bound=PaginatedResponse)
+
+
+@functools.cache
+def type_adapter(tp: Any) -> TypeAdapter[Any]:
+    """Adapters are costly to build, one per type for the process"""
+    return TypeAdapter(tp)
+
+
+def model_response(tp: Any, value: Any, *, status_code: int = 200) -> Response:
+    """
+    JSON response of value, trusted to be of type tp (e.g. list[ProjectPublic])
+    and not validated again
+    """
+    return Response(
+        type_adapter(tp).dump_json(value),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def page(model: type[P], result: list[Any], **fields: Any) -> P:
+    """A page of already validated items, built without validation"""
+    return model.model_construct(result=result, **fields)
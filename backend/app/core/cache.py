@@ -0,0 +1,264 @@
+"""
+Cache of serialized responses of public read endpoints, see app.api.cache.
+
+Entries are tagged with the entities they render (vendor:<id>, user:<id>,
+project:<id>, or a collection such as "vendors") and dropped when one of
+these entities changes. The default backend is an LRU in every worker
+process: invalidation reaches the worker making the change, the other
+workers see it after RESPONSE_CACHE_TTL_SECONDS at most. With
+RESPONSE_CACHE_URL set, a Redis-compatible server is shared by all workers
+and invalidation reaches all of them.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, cast
+
+import anyio
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.core.pool import WORKER
+
+if TYPE_CHECKING:
+    from redis.client import Pipeline
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by endpoint and result (hit or miss)",
+    ["endpoint", "result", "worker"],
+)
+RESPONSE_CACHE_INVALIDATIONS = Counter(
+    "response_cache_invalidated_total",
+    "Response cache entries dropped by tag invalidation",
+    ["worker"],
+)
+
+# Collections, and entities rendered by many responses
+VENDORS_TAG = "vendors"
+CATALOG_TAG = "catalog"
+
+
+def vendor_tag(vendor_profile_id: uuid.UUID) -> str:
+    return f"vendor:{vendor_profile_id}"
+
+
+def user_tag(user_id: uuid.UUID) -> str:
+    return f"user:{user_id}"
+
+
+def project_tag(project_id: uuid.UUID) -> str:
+    return f"project:{project_id}"
+
+
+class LocalCache:
+    """LRU of one worker process with per-entry expiry"""
+
+    # Calls are cheap enough for the event loop
+    blocking = False
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        # Sync routes run in the threadpool
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self._tags: dict[str, set[str]] = {}
+        # Wall-clock time of the last invalidation of a tag
+        self._invalidated: dict[str, float] = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self, key: str, value: bytes, *, ttl: int, tags: Iterable[str], since: float
+    ) -> None:
+        with self._lock:
+            tags = tuple(tags)
+            if any(self._invalidated.get(tag, 0) >= since for tag in tags):
+                return
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str], *, ttl: int) -> int:
+        now = time.time()
+        with self._lock:
+            # Responses are not rendered for longer than the TTL
+            self._invalidated = {
+                k: v for k, v in self._invalidated.items() if v > now - ttl
+            }
+            keys: set[str] = set()
+            for tag in tags:
+                self._invalidated[tag] = now
+                keys.update(self._tags.pop(tag, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._invalidated.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisCache:
+    """
+    Backend shared by all workers. A tag is a set of the keys tagged with
+    it, kept as long as the entries.
+    """
+
+    blocking = True
+    prefix = "response-cache:"
+
+    def __init__(self, url: str) -> None:
+        # Optional dependency, only needed with RESPONSE_CACHE_URL
+        import redis
+
+        self.redis = redis.Redis.from_url(url, socket_timeout=0.5)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}key:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _invalidated(self, tag: str) -> str:
+        return f"{self.prefix}invalidated:{tag}"
+
+    def get(self, key: str) -> bytes | None:
+        return self.redis.get(self._key(key))  # type: ignore[return-value]
+
+    def set(
+        self, key: str, value: bytes, *, ttl: int, tags: Iterable[str], since: float
+    ) -> None:
+        tags = tuple(tags)
+        markers = [self._invalidated(tag) for tag in tags]
+
+        def store(pipe: "Pipeline") -> None:
+            # Runs immediately while the markers are watched
+            invalidated = cast(list[bytes | None], pipe.mget(markers) if tags else [])
+            if any(t is not None and float(t) >= since for t in invalidated):
+                return
+            pipe.multi()
+            pipe.set(self._key(key), value, ex=ttl)
+            for tag in tags:
+                pipe.sadd(self._tag(tag), self._key(key))
+                pipe.expire(self._tag(tag), ttl)
+
+        # Retried when a tag is invalidated before EXEC, the retry skips it
+        self.redis.transaction(store, *markers)
+
+    def invalidate(self, tags: Iterable[str], *, ttl: int) -> int:
+        tags = tuple(tags)
+        if not tags:
+            return 0
+        now = time.time()
+        with self.redis.pipeline() as pipe:
+            for tag in tags:
+                pipe.set(self._invalidated(tag), now, ex=ttl)
+            pipe.execute()  # type: ignore[no-untyped-call]
+        tag_keys = [self._tag(tag) for tag in tags]
+        keys = cast(set[bytes], self.redis.sunion(tag_keys))
+        self.redis.delete(*keys, *tag_keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        keys = list(self.redis.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.redis.delete(*keys)
+
+
+class ResponseCache:
+    def __init__(self, backend: LocalCache | RedisCache, *, ttl: int) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    async def _call(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        if self.backend.blocking:
+            return await anyio.to_thread.run_sync(lambda: fn(*args, **kwargs))
+        return fn(*args, **kwargs)
+
+    async def get(self, key: str, *, endpoint: str) -> bytes | None:
+        value: bytes | None
+        try:
+            value = await self._call(self.backend.get, key)
+        except Exception:
+            logger.warning("Response cache lookup failed", exc_info=True)
+            value = None
+        result = "miss" if value is None else "hit"
+        RESPONSE_CACHE_REQUESTS.labels(endpoint, result, WORKER).inc()
+        return value
+
+    async def set(
+        self, key: str, value: bytes, *, tags: Iterable[str], since: float
+    ) -> None:
+        """
+        Store a response rendered from data read at since (time.time()),
+        unless one of its tags was invalidated since then
+        """
+        try:
+            await self._call(
+                self.backend.set, key, value, ttl=self.ttl, tags=tags, since=since
+            )
+        except Exception:
+            logger.warning("Response cache store failed", exc_info=True)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop the entries tagged with any of tags, call after the commit"""
+        try:
+            dropped = self.backend.invalidate(tags, ttl=self.ttl)
+        except Exception:
+            # Entries still expire after the TTL
+            logger.exception("Response cache invalidation failed")
+            return
+        RESPONSE_CACHE_INVALIDATIONS.labels(WORKER).inc(dropped)
+
+    async def ainvalidate(self, *tags: str) -> None:
+        await self._call(self.invalidate, *tags)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+def create_response_cache() -> ResponseCache:
+    backend: LocalCache | RedisCache
+    if settings.RESPONSE_CACHE_URL:
+        backend = RedisCache(settings.RESPONSE_CACHE_URL)
+    else:
+        backend = LocalCache(maxsize=settings.RESPONSE_CACHE_MAXSIZE)
+    return ResponseCache(backend, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = create_response_cache()
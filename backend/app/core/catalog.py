@@ -0,0 +1,181 @@
+"""
+Per-worker snapshot of the service catalog: categories and their services.
+
+The catalog changes rarely and is read by almost every list response, so
+each worker keeps it in memory. /catalog/categories is served from the
+snapshot, and Service.category is set from it whenever a Service is loaded,
+so reading it needs no query. The response loader plans still select it
+in one query per page, for categories the snapshot does not know yet: an
+AsyncSession cannot lazy-load them while the response is serialized.
+
+Changes go through app.crud.services, which sends a NOTIFY on the
+CATALOG_CHANNEL in the same transaction and reloads the snapshot of its own
+worker after the commit. Every worker listens to the channel in a thread
+and reloads its snapshot when another worker changes the catalog, or when
+a Service was loaded with a category missing from it. A worker loads its
+snapshot on startup and keeps the last one while the listener reconnects.
+"""
+
+import hashlib
+import logging
+import threading
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import psycopg
+from sqlalchemy import event, func
+from sqlalchemy.orm import QueryContext, attributes, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.models import Category, CategoryPublic, Service, ServicePublicShort
+
+logger = logging.getLogger(__name__)
+
+# Untyped in SQLAlchemy
+set_committed_value: Callable[[Any, str, Any], None] = attributes.set_committed_value
+
+CATALOG_CHANNEL = "service_catalog"
+# Seconds between checks of the stop flag, and before a reconnect
+LISTEN_TIMEOUT = 5.0
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    categories: list[CategoryPublic]
+    # Hash of the content, the same in every worker with the same catalog
+    version: str
+    # Detached copies without services, merged into sessions loading services
+    by_id: dict[uuid.UUID, Category]
+
+
+class ServiceCatalog:
+    def __init__(self) -> None:
+        # Sent as the NOTIFY payload, a worker ignores its own notifications
+        self.instance_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._snapshot: CatalogSnapshot | None = None
+        # A Service was loaded with a category missing from the snapshot
+        self._stale = False
+        # Set to stop the running listener thread
+        self._stop: threading.Event | None = None
+
+    def get(self) -> CatalogSnapshot:
+        # Reloaded by the listener when stale, loading it here would block
+        # the event loop of async routes
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.reload()
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        # Under the lock, so an older snapshot never replaces a newer one
+        with self._lock:
+            # A miss while reading is reloaded again
+            self._stale = False
+            # Plain rows, loading Service entities would call attach_category()
+            with Session(engine) as session:
+                categories = session.exec(select(Category.id, Category.label)).all()
+                services = session.exec(
+                    select(Service.id, Service.label, Service.category_id)
+                ).all()
+
+            by_category: dict[uuid.UUID, list[ServicePublicShort]] = {}
+            for id, label, category_id in services:
+                service = ServicePublicShort(id=id, label=label)
+                by_category.setdefault(category_id, []).append(service)
+            by_id = {}
+            for id, label in categories:
+                category = Category(id=id, label=label)
+                make_transient_to_detached(category)
+                by_id[id] = category
+            content = repr((sorted(categories), sorted(services)))
+            self._snapshot = CatalogSnapshot(
+                categories=[
+                    CategoryPublic(id=id, label=label, services=by_category.get(id, []))
+                    for id, label in categories
+                ],
+                by_id=by_id,
+                version=hashlib.sha1(content.encode()).hexdigest(),
+            )
+            return self._snapshot
+
+    def notify(self, *, session: Session) -> None:
+        """Notify the other workers once the session transaction commits"""
+        session.exec(select(func.pg_notify(CATALOG_CHANNEL, self.instance_id)))
+
+    def attach_category(self, service: Service, context: QueryContext) -> None:
+        # Runs while rows are loaded, possibly under an AsyncSession, so it
+        # must not query: on a miss the category is left to the loader plan
+        snapshot = self._snapshot
+        if service.category_id is None or snapshot is None:
+            return
+        category = snapshot.by_id.get(service.category_id)
+        if category is None:
+            # Created without app.crud.services, or by another worker
+            # before its notification arrived
+            self._stale = True
+            return
+        session = context.session
+        # Keep the instance the session already has, it may have changes
+        existing = session.identity_map.get(identity_key(Category, category.id))
+        if existing is None:
+            # A session-local copy, no SQL is emitted
+            existing = session.merge(category, load=False)
+        set_committed_value(service, "category", existing)
+
+    def start_listener(self) -> None:
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self._listen,
+            args=(self._stop,),
+            name="catalog-listener",
+            daemon=True,
+        ).start()
+
+    def stop_listener(self) -> None:
+        """The listener thread exits within LISTEN_TIMEOUT"""
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def _listen(self, stop: threading.Event) -> None:
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while not stop.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CATALOG_CHANNEL}")
+                    # Notifications may have been missed while disconnected
+                    self.reload()
+                    while not stop.is_set():
+                        for notify in conn.notifies(timeout=LISTEN_TIMEOUT):
+                            if notify.payload != self.instance_id:
+                                self.reload()
+                        if self._stale:
+                            self.reload()
+            except Exception:
+                # The last snapshot is served until the listener reconnects
+                logger.exception("Service catalog listener failed")
+                stop.wait(LISTEN_TIMEOUT)
+
+
+service_catalog = ServiceCatalog()
+
+
+@event.listens_for(Service, "load")
+def _attach_category(service: Service, context: Any) -> None:
+    service_catalog.attach_category(service, context)
+
+
+# Refreshed by populate_existing or Session.refresh()
+@event.listens_for(Service, "refresh")
+def _reattach_category(service: Service, context: Any, attrs: Any) -> None:
+    if attrs is None or "category_id" in attrs:
+        service_catalog.attach_category(service, context)
@@ -34,11 +34,30 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Seconds a principal (role, vendor profile, is_active) is reused without
+    # a user query: cached per worker, or taken from the claims of a fresh token
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # bcrypt cost, hashes with another cost are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Threads hashing passwords in every worker process, bcrypt releases the GIL
+    PASSWORD_HASH_WORKERS: int = 2
+    # Processes resizing uploaded avatars in every worker process
+    IMAGE_PROCESS_WORKERS: int = 1
     FRONTEND_HOST: str = "http://localhost:3000"
     STATIC_PATH: str = "/static"
     STATIC_ROOT: str = "app/static"
     MEDIA_ROOT: str
     MEDIA_HOST: str = "http://localhost:8088"
+    # Response cache of public read endpoints, see app.core.cache. Without
+    # RESPONSE_CACHE_URL (redis://...) every worker keeps its own LRU
+    RESPONSE_CACHE_URL: str | None = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAXSIZE: int = 2048
+    # app.media_gc: files unreferenced by users are deleted after the grace
+    # period, in batches, every interval
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600
+    MEDIA_GC_GRACE_SECONDS: int = 3600
+    MEDIA_GC_BATCH_SIZE: int = 500
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
     BACKEND_CORS_ORIGINS: Annotated[
@@ -72,6 +91,19 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool, applied per engine in every worker process:
+    # each worker may hold up to 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before raising TimeoutError
+    DB_POOL_TIMEOUT: float = 30
+    # Seconds after which a connection is replaced on checkout, -1 disables
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # app.core.queries: a statement run this many times by one request is
+    # reported as a suspected N+1
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -88,6 +120,12 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Outbox sender (app.email_sender): emails per SMTP connection, seconds
+    # between polls when idle, delivery attempts, first retry delay (doubles)
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_SECONDS: float = 30
 
     @computed_field  # type: ignore[prop-decorator]
     @property
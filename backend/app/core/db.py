@@ -1,13 +1,36 @@
 import logging
 
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app.core.config import settings
+from app.core.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+    register_pool_gauges,
+)
+from app.core.queries import instrument_engine
 from app.crud import users
 from app.models import User, UserCreate, UserRole
 
 logger = logging.getLogger(__name__)
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **pool_options(),
+)
+# Same psycopg driver in async mode, used by async API routes.
+# Scripts and migrations keep using the sync engine above.
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options(),
+)
+register_pool_gauges(engine, InstrumentedQueuePool.engine_label)
+register_pool_gauges(async_engine, InstrumentedAsyncQueuePool.engine_label)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
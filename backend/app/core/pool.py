@@ -0,0 +1,124 @@
+"""
+Connection pools instrumented with Prometheus metrics.
+
+Metrics go to the default registry and are exposed on /metrics together
+with the prometheus_fastapi_instrumentator ones. Every worker process keeps
+its own pools, so all series are labelled with the worker pid.
+"""
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+WORKER = str(os.getpid())
+LABELS = ("engine", "worker")
+
+# Checkouts are usually sub-millisecond, waits under load go up to the pool timeout
+_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size", LABELS)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", LABELS
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections currently open above the pool size", LABELS
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent obtaining a connection from the pool queue or opening a new one",
+    LABELS,
+    buckets=_BUCKETS,
+)
+POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Full checkout latency, including pre-ping and connection recycling",
+    LABELS,
+    buckets=_BUCKETS,
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts", "Checkouts that failed after waiting DB_POOL_TIMEOUT", LABELS
+)
+
+
+class _InstrumentedPoolMixin:
+    # Label is a class attribute: pools are re-created on engine.dispose()
+    # from their class and constructor arguments only
+    engine_label: str
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        finally:
+            POOL_CHECKOUT.labels(self.engine_label, WORKER).observe(
+                time.perf_counter() - start
+            )
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.labels(self.engine_label, WORKER).inc()
+            raise
+        finally:
+            POOL_WAIT.labels(self.engine_label, WORKER).observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def pool_options() -> dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def register_pool_gauges(engine: Engine | AsyncEngine, label: str) -> None:
+    """Report pool state on scrape; engine.pool is looked up every time"""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+    POOL_SIZE.labels(label, WORKER).set(settings.DB_POOL_SIZE)
+    POOL_CHECKED_OUT.labels(label, WORKER).set_function(
+        lambda: sync_engine.pool.checkedout()  # type: ignore[attr-defined]
+    )
+    # QueuePool.overflow() is negative while the pool is not filled up
+    POOL_OVERFLOW.labels(label, WORKER).set_function(
+        lambda: max(sync_engine.pool.overflow(), 0)  # type: ignore[attr-defined]
+    )
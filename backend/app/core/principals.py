@@ -0,0 +1,100 @@
+"""
+Per-worker cache of principals, so that authorization does not need a user
+query on every request.
+
+A principal is cached for PRINCIPAL_CACHE_TTL_SECONDS after it was loaded
+from the database. Access tokens carry the same facts as claims; they are
+trusted while the token is younger than the TTL, so a principal is never
+staler than the TTL whichever source it comes from. Changes made by this
+worker invalidate the user at once, changes made by other workers are seen
+after the TTL at most.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any
+
+from app.core.config import settings
+from app.models import Principal, TokenPayload, User
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float, maxsize: int = 10_000) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Sync routes run in the threadpool
+        self._lock = threading.Lock()
+        self._principals: dict[uuid.UUID, tuple[float, Principal]] = {}
+        # Wall-clock time of the last invalidation, compared with token iat
+        self._invalidated: dict[uuid.UUID, float] = {}
+
+    def get(self, user_id: uuid.UUID) -> Principal | None:
+        with self._lock:
+            entry = self._principals.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._principals[user_id]
+                return None
+            return principal
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            if len(self._principals) >= self.maxsize:
+                self._principals.clear()
+            self._principals[principal.id] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        now = time.time()
+        with self._lock:
+            self._principals.pop(user_id, None)
+            # Tombstones are only needed while tokens are fresh enough to trust
+            self._invalidated = {
+                k: v for k, v in self._invalidated.items() if v > now - self.ttl
+            }
+            self._invalidated[user_id] = now
+
+    def trusts(self, token_data: TokenPayload) -> bool:
+        """Whether the token claims are fresh enough to be used as is"""
+        if token_data.iat is None or token_data.sub is None:
+            return False
+        if token_data.role is None or token_data.is_active is None:
+            return False
+        with self._lock:
+            invalidated_at = self._invalidated.get(uuid.UUID(token_data.sub))
+        # iat has a one-second resolution: same-second tokens are not trusted
+        if invalidated_at is not None and token_data.iat <= invalidated_at:
+            return False
+        return token_data.iat > time.time() - self.ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._principals.clear()
+            self._invalidated.clear()
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def principal_claims(user: User) -> dict[str, Any]:
+    """Access token claims describing the user principal"""
+    return {
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "vendor_profile_id": (
+            str(user.vendor_profile.id) if user.vendor_profile else None
+        ),
+    }
+
+
+def principal_from_claims(token_data: TokenPayload) -> Principal:
+    return Principal(
+        id=token_data.sub,
+        role=token_data.role,
+        is_active=token_data.is_active,
+        is_superuser=bool(token_data.is_superuser),
+        vendor_profile_id=token_data.vendor_profile_id,
+    )
@@ -0,0 +1,187 @@
+"""
+SQL statements attributed to the HTTP request running them.
+
+QueryStatsMiddleware opens a QueryStats for every request, the cursor events
+of both engines (instrument_engine() in app.core.db) add each statement to
+it. The stats live in a context variable: the async engine runs statements
+in greenlets and sync routes run in the threadpool, both with a copy of the
+request context pointing to the same QueryStats.
+
+At the end of the request the query count, the DB time and the slowest
+statement are observed per route. A statement text repeated
+DB_N_PLUS_ONE_THRESHOLD times or more is reported as a suspected N+1: bound
+parameters are not part of the text, so the repetitions are the same query
+run for different rows. The Server-Timing header is added in local and
+staging only, in production it would reveal the query counts.
+"""
+
+import logging
+import time
+from collections import Counter as StatementCounter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.pool import WORKER
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("method", "route", "worker")
+
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    LABELS,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_SLOWEST = Histogram(
+    "http_request_db_slowest_seconds",
+    "Slowest SQL statement of a request",
+    LABELS,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+N_PLUS_ONE = Counter(
+    "db_n_plus_one_suspected_total",
+    "Requests running one statement DB_N_PLUS_ONE_THRESHOLD times or more",
+    LABELS,
+)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    slowest: float = 0.0
+    slowest_statement: str | None = None
+    statements: StatementCounter[str] = field(default_factory=StatementCounter)
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+        if duration >= self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run threshold times or more, suspected N+1"""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest * 1000:.1f}"
+        )
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Attribute the statements run in this context to a new QueryStats"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(
+    _conn: Any, _cursor: Any, _statement: str, _params: Any, context: Any, *_: Any
+) -> None:
+    if context is not None and _current.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    _conn: Any, _cursor: Any, statement: str, _params: Any, context: Any, *_: Any
+) -> None:
+    stats = _current.get()
+    start = getattr(context, "_query_start", None)
+    if stats is not None and start is not None:
+        stats.add(statement, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count the statements of engine, async_engine.sync_engine for async ones"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the matched route, bounded for metric labels"""
+    route = scope.get("route")
+    return getattr(route, "path", "other")
+
+
+def record(stats: QueryStats, *, method: str, route: str) -> None:
+    labels = (method, route, WORKER)
+    DB_QUERIES.labels(*labels).observe(stats.count)
+    DB_TIME.labels(*labels).observe(stats.duration)
+    DB_SLOWEST.labels(*labels).observe(stats.slowest)
+
+    repeated = stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        N_PLUS_ONE.labels(*labels).inc()
+    for statement, count in repeated:
+        logger.warning(
+            "Suspected N+1 in %s %s, statement run %d times: %s",
+            method,
+            route,
+            count,
+            statement,
+        )
+    if stats.count:
+        logger.debug(
+            "%s %s: %d queries in %.1f ms, slowest %.1f ms: %s",
+            method,
+            route,
+            stats.count,
+            stats.duration * 1000,
+            stats.slowest * 1000,
+            stats.slowest_statement,
+        )
+
+
+class QueryStatsMiddleware:
+    """Tracks the statements of every HTTP request, see the module docstring"""
+
+    def __init__(self, app: ASGIApp, *, server_timing: bool = False) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(
+                    scope, receive, send_with_timing if self.server_timing else send
+                )
+            finally:
+                record(stats, method=scope["method"], route=route_label(scope))
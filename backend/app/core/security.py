@@ -1,27 +1,110 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
+from prometheus_client import Gauge
 
 from app.core.config import settings
+from app.core.pool import WORKER
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+T = TypeVar("T")
 
 ALGORITHM = "HS256"
 
+# Lowest cost bcrypt accepts, for tests only
+BCRYPT_MIN_ROUNDS = 4
+
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth",
+    "Password hashing and verification calls submitted and not finished yet",
+    ["worker"],
+)
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification in a bounded thread pool.
+
+    bcrypt is CPU-bound and takes a few hundred milliseconds per call, so at
+    most `workers` calls run at a time in a worker process and the rest wait
+    in the queue instead of competing with request handling for the CPU.
+    """
+
+    def __init__(self, *, rounds: int, workers: int) -> None:
+        self.configure(rounds=rounds)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._queue = PASSWORD_HASH_QUEUE.labels(WORKER)
+
+    def configure(self, *, rounds: int) -> None:
+        self.context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds
+        )
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        self._queue.inc()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._queue.dec())
+        return future
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Verify password, the new hash is set when the cost has changed"""
+        return self._submit(
+            self.context.verify_and_update, password, hashed_password
+        ).result()
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
-    expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update_async(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await asyncio.wrap_future(
+            self._submit(self.context.verify_and_update, password, hashed_password)
+        )
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS, workers=settings.PASSWORD_HASH_WORKERS
+)
+
+
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta,
+    claims: dict[str, Any] | None = None,
+) -> str:
+    now = datetime.now(timezone.utc)
+    to_encode = {**(claims or {}), "iat": now, "exp": now + expires_delta}
+    to_encode["sub"] = str(subject)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    verified, _ = await password_hasher.verify_and_update_async(
+        plain_password, hashed_password
+    )
+    return verified
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
@@ -0,0 +1,36 @@
+from typing import Any
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.crud.loaders import loader_plan
+from app.crud.pagination import split_total, with_total
+
+
+async def fetch_page(
+    *,
+    session: AsyncSession,
+    stmt: Any,
+    total_stmt: Any,
+    model: Any,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    response_model: Any = None,
+) -> tuple[list[Any], int]:
+    """
+    Page items and total, in a single query for the usual requests.
+    With response_model, loads everything the model renders (loader_plan()).
+    """
+    if response_model is not None:
+        stmt = stmt.options(*loader_plan(response_model))
+    page_stmt = with_total(stmt, model=model, cursor=cursor, skip=skip, limit=limit)
+    # exec() would return only the entity column of select(Model).add_columns()
+    rows = (await session.execute(page_stmt)).all()
+
+    items, total = split_total(
+        rows, columns=len(stmt.column_descriptions), cursor=cursor, skip=skip
+    )
+    if total is None:
+        total = (await session.exec(total_stmt)).one()
+
+    return items, total
@@ -0,0 +1,140 @@
+from collections.abc import Sequence
+from typing import Any, cast
+from uuid import UUID
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import project_tag, response_cache
+from app.crud import projects as sync_crud
+from app.crud.aio.pagination import fetch_page
+from app.crud.loaders import PROJECT_PUBLIC_OPTIONS
+from app.models import Project, ProjectCreate, ProjectPublic, RequirementItem, Service
+
+
+async def get_project(
+    *, session: AsyncSession, project_id: UUID, options: Sequence[Any] = ()
+) -> Project | None:
+    # populate_existing: apply loader options to an already loaded instance too
+    return await session.get(
+        Project, project_id, options=options, populate_existing=bool(options)
+    )
+
+
+async def get_project_version(
+    *, session: AsyncSession, project_id: UUID
+) -> tuple[Any, ...] | None:
+    """None if the project does not exist"""
+    row = (
+        await session.exec(sync_crud.project_version_stmt(project_id=project_id))
+    ).first()
+    return tuple(row) if row else None
+
+
+async def get_projects_for_owner(
+    *, session: AsyncSession, owner_id: UUID, is_archived: bool = False
+) -> Sequence[Project]:
+    projects = (
+        await session.exec(
+            select(Project)
+            .where(Project.owner_id == owner_id)
+            .where(Project.is_archived == is_archived)
+            .order_by(col(Project.created_at).desc())
+            .options(*PROJECT_PUBLIC_OPTIONS)
+        )
+    ).all()
+
+    if not projects:
+        return []
+
+    counts = (
+        await session.exec(
+            sync_crud.incoming_counts_stmt(project_ids=[p.id for p in projects])
+        )
+    ).all()
+    sync_crud.set_incoming_counts(projects=projects, counts=counts)
+
+    return projects
+
+
+async def create_project(
+    *, session: AsyncSession, owner_id: UUID, data: ProjectCreate
+) -> Project:
+    project = Project.model_validate(data, update={"owner_id": owner_id})
+
+    if project.requirements:
+        requirements = [
+            r if isinstance(r, dict) else r.model_dump() for r in project.requirements
+        ]
+        # The JSONB column is written with plain dicts
+        project.requirements = cast(list[RequirementItem], requirements)
+
+    if data.service_ids:
+        stmt = select(Service).where(col(Service.id).in_(data.service_ids))
+        project.services = list((await session.exec(stmt)).all())
+
+    session.add(project)
+    await session.commit()
+
+    return await get_project(  # type: ignore[return-value]
+        session=session, project_id=project.id, options=PROJECT_PUBLIC_OPTIONS
+    )
+
+
+async def archive_project(*, session: AsyncSession, project: Project) -> Project:
+    project.is_archived = True
+    session.add(project)
+    await session.commit()
+    await response_cache.ainvalidate(project_tag(project.id))
+
+    return await get_project(  # type: ignore[return-value]
+        session=session, project_id=project.id, options=PROJECT_PUBLIC_OPTIONS
+    )
+
+
+async def get_archived_projects_for_vendor(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[Sequence[Project], int]:
+    stmt, total_stmt = sync_crud.archived_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_accepted_projects_for_vendor(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[Sequence[Project], int]:
+    stmt, total_stmt = sync_crud.accepted_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
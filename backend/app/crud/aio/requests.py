@@ -0,0 +1,218 @@
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import project_tag, response_cache
+from app.crud import requests as sync_crud
+from app.crud.aio.pagination import fetch_page
+from app.models import (
+    FeasibilityItem,
+    ProjectRequest,
+    ProjectRequestPublicProjectFull,
+    ProjectRequestPublicVendorFull,
+    RequestInitiator,
+    RequestStatus,
+)
+
+
+async def get_request(
+    *, session: AsyncSession, project_id: UUID, vendor_profile_id: UUID
+) -> ProjectRequest | None:
+    return (
+        await session.exec(
+            select(ProjectRequest).where(
+                ProjectRequest.project_id == project_id,
+                ProjectRequest.vendor_profile_id == vendor_profile_id,
+            )
+        )
+    ).first()
+
+
+async def get_request_by_id(
+    *, session: AsyncSession, request_id: UUID, options: Sequence[Any] = ()
+) -> ProjectRequest | None:
+    # populate_existing: apply loader options to an already loaded instance too
+    return await session.get(
+        ProjectRequest,
+        request_id,
+        options=options,
+        populate_existing=bool(options),
+    )
+
+
+async def get_proposal_version(
+    *, session: AsyncSession, request_id: UUID, vendor_profile_id: UUID
+) -> tuple[Any, ...] | None:
+    """None if the vendor has no such proposal"""
+    row = (
+        await session.exec(
+            sync_crud.proposal_version_stmt(
+                request_id=request_id, vendor_profile_id=vendor_profile_id
+            )
+        )
+    ).first()
+    return tuple(row) if row else None
+
+
+async def create_request(
+    *,
+    session: AsyncSession,
+    project_id: UUID,
+    vendor_profile_id: UUID,
+    initiator: RequestInitiator,
+    question_answers: list[str] | None = None,
+    feasibility_scores: list[FeasibilityItem] | None = None,
+    days_to_start: int | None = None,
+    duration_days: int | None = None,
+    proposed_cost: float | None = None,
+) -> ProjectRequest:
+    request = ProjectRequest(
+        project_id=project_id,
+        vendor_profile_id=vendor_profile_id,
+        status=RequestStatus.sent,
+        initiator=initiator,
+        question_answers=question_answers,
+        feasibility_scores=[
+            s if isinstance(s, dict) else s.model_dump() for s in feasibility_scores
+        ]
+        if feasibility_scores
+        else None,
+        days_to_start=days_to_start,
+        duration_days=duration_days,
+        proposed_cost=proposed_cost,
+    )
+
+    session.add(request)
+    await session.commit()
+    await session.refresh(request)
+
+    return request
+
+
+async def update_request_status(
+    *,
+    session: AsyncSession,
+    request_id: UUID,
+    request: ProjectRequest | None,
+    new_status: RequestStatus,
+) -> ProjectRequest:
+    request = request or await session.get(ProjectRequest, request_id)
+    if not request:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Request not found")
+    await session.refresh(request, ["project"])
+    request.status = new_status
+
+    if new_status == RequestStatus.accepted:
+        if not request.project:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "Request has no project assigned and is probably deleted",
+            )
+
+        if request.project.vendor_profile_id is not None:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, "Project already has an assigned vendor"
+            )
+
+        request.project.vendor_profile_id = request.vendor_profile_id
+
+        other_requests = (
+            await session.exec(
+                select(ProjectRequest).where(
+                    ProjectRequest.project_id == request.project_id,
+                    ProjectRequest.id != request.id,
+                    ProjectRequest.status == RequestStatus.sent,
+                )
+            )
+        ).all()
+        for other in other_requests:
+            other.status = RequestStatus.declined
+            session.add(other)
+
+    session.add(request)
+    await session.commit()
+    if new_status == RequestStatus.accepted and request.project_id is not None:
+        # The project now renders its vendor
+        await response_cache.ainvalidate(project_tag(request.project_id))
+    await session.refresh(request)
+
+    return request
+
+
+async def get_requests_for_project(
+    *,
+    session: AsyncSession,
+    project_id: UUID,
+    initiator: RequestInitiator | None = None,
+    status: RequestStatus | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = sync_crud.requests_for_project_stmt(
+        project_id=project_id, initiator=initiator, status=status
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicVendorFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_vendor_proposals(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    status: RequestStatus | None = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = sync_crud.vendor_proposals_stmt(
+        vendor_profile_id=vendor_profile_id, status=status
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicProjectFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_incoming_requests_for_vendor(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = sync_crud.incoming_requests_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicProjectFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
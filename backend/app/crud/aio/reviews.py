@@ -0,0 +1,196 @@
+from collections.abc import Iterable, Sequence
+from uuid import UUID
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import VENDORS_TAG, response_cache, user_tag
+from app.crud import reviews as sync_crud
+from app.crud.aio import vendors as vendors_crud
+from app.crud.aio.pagination import fetch_page
+from app.crud.loaders import REVIEW_PUBLIC_OPTIONS
+from app.models import (
+    Project,
+    Review,
+    ReviewCreate,
+    ReviewPublic,
+    User,
+    UserRatingSummary,
+    UserRole,
+    VendorProfile,
+)
+
+
+async def has_shared_project(
+    *, session: AsyncSession, author_id: UUID, reviewed_user_id: UUID
+) -> bool:
+    """Check if two users have worked together on a project"""
+    author = await session.get(User, author_id)
+    reviewed = await session.get(User, reviewed_user_id)
+
+    if not author or not reviewed:
+        return False
+
+    # Case 1: author is company, reviewed is vendor
+    if author.role == UserRole.company and reviewed.role == UserRole.vendor:
+        stmt = (
+            select(Project.id)
+            .join(VendorProfile, col(Project.vendor_profile_id) == VendorProfile.id)
+            .where(
+                col(Project.owner_id) == author_id,
+                col(VendorProfile.user_id) == reviewed_user_id,
+            )
+        )
+        return (await session.exec(stmt)).first() is not None
+
+    # Case 2: author is vendor, reviewed is company
+    if author.role == UserRole.vendor and reviewed.role == UserRole.company:
+        stmt = (
+            select(Project.id)
+            .join(VendorProfile, col(Project.vendor_profile_id) == VendorProfile.id)
+            .where(
+                col(Project.owner_id) == reviewed_user_id,
+                col(VendorProfile.user_id) == author_id,
+            )
+        )
+        return (await session.exec(stmt)).first() is not None
+
+    # Both are same role - no shared projects possible
+    return False
+
+
+async def create_review(
+    *, session: AsyncSession, author_id: UUID, data: ReviewCreate
+) -> Review:
+    # Prevent self-review
+    if author_id == data.reviewed_user_id:
+        raise ValueError("Cannot review yourself")
+
+    # Check if users have worked together
+    if not await has_shared_project(
+        session=session, author_id=author_id, reviewed_user_id=data.reviewed_user_id
+    ):
+        raise ValueError("You can only review users you have worked with on a project")
+
+    review = Review.model_validate(data, update={"author_id": author_id})
+    session.add(review)
+    await add_rating_to_summary(
+        session=session, user_id=data.reviewed_user_id, rating=data.rating
+    )
+    await session.commit()
+    # Ratings are rendered with users and vendor profiles
+    await response_cache.ainvalidate(VENDORS_TAG, user_tag(data.reviewed_user_id))
+
+    return await session.get(  # type: ignore[return-value]
+        Review, review.id, options=REVIEW_PUBLIC_OPTIONS, populate_existing=True
+    )
+
+
+async def get_reviews_for_user(
+    *,
+    session: AsyncSession,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[Review], int]:
+    stmt, total_stmt = sync_crud.reviews_for_user_stmt(user_id=user_id)
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Review,
+        response_model=ReviewPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_reviews_for_vendor(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[Review], int]:
+    """Get reviews for a vendor by vendor_profile_id"""
+
+    vendor_profile = await vendors_crud.get_vendor_profile(
+        session=session, vendor_profile_id=vendor_profile_id
+    )
+    if not vendor_profile or not vendor_profile.user_id:
+        return [], 0
+
+    return await get_reviews_for_user(
+        session=session,
+        user_id=vendor_profile.user_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+async def get_reviews_by_author(
+    *,
+    session: AsyncSession,
+    author_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[Review], int]:
+    stmt, total_stmt = sync_crud.reviews_by_author_stmt(author_id=author_id)
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Review,
+        response_model=ReviewPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_user_rating_stats(
+    *, session: AsyncSession, user_id: UUID
+) -> tuple[float | None, int]:
+    """Returns (average_rating, reviews_count) for a user (vendor or company)"""
+
+    summary = await session.get(UserRatingSummary, user_id)
+    if not summary:
+        return None, 0
+    return summary.rating_avg, summary.rating_count
+
+
+async def get_rating_stats_for_users(
+    *, session: AsyncSession, user_ids: Iterable[UUID]
+) -> dict[UUID, tuple[float | None, int]]:
+    """Returns {user_id: (average_rating, reviews_count)} in a single query"""
+
+    ids = set(user_ids)
+    stats: dict[UUID, tuple[float | None, int]] = dict.fromkeys(ids, (None, 0))
+    if not ids:
+        return stats
+
+    stmt = select(UserRatingSummary).where(
+        col(UserRatingSummary.reviewed_user_id).in_(ids)
+    )
+    for summary in (await session.exec(stmt)).all():
+        stats[summary.reviewed_user_id] = (summary.rating_avg, summary.rating_count)
+    return stats
+
+
+async def add_rating_to_summary(
+    *, session: AsyncSession, user_id: UUID, rating: int
+) -> None:
+    """
+    Upsert the rating summary row for a reviewed user.
+    Does not commit: runs in the same transaction as the review insert.
+    """
+    await session.exec(
+        sync_crud.rating_summary_upsert_stmt(user_id=user_id, rating=rating)
+    )
@@ -0,0 +1,43 @@
+from uuid import UUID
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import password_hasher
+from app.crud import users as sync_crud
+from app.models import Principal, User
+
+
+async def get_principal(*, session: AsyncSession, user_id: UUID) -> Principal | None:
+    row = (await session.exec(sync_crud.principal_stmt(user_id=user_id))).first()
+    return Principal.model_validate(row._mapping) if row else None
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    # vendor_profile is needed for the access token claims
+    statement = (
+        select(User)
+        .where(User.email == email)
+        .options(selectinload(User.vendor_profile))  # type: ignore
+    )
+    return (await session.exec(statement)).first()
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await password_hasher.verify_and_update_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        # Hashed with another cost than BCRYPT_ROUNDS
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+    return db_user
@@ -0,0 +1,192 @@
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import VENDORS_TAG, response_cache, user_tag, vendor_tag
+from app.core.principals import principal_cache
+from app.crud import vendors as sync_crud
+from app.crud.aio import reviews as reviews_crud
+from app.crud.aio.pagination import fetch_page
+from app.crud.loaders import VENDOR_PROFILE_PUBLIC_OPTIONS
+from app.models import (
+    Project,
+    ProjectPublic,
+    Service,
+    VendorProfile,
+    VendorProfileCreate,
+    VendorProfilePublic,
+)
+
+
+async def get_vendor_profile(
+    *, session: AsyncSession, vendor_profile_id: UUID, options: Sequence[Any] = ()
+) -> VendorProfile | None:
+    # populate_existing: apply loader options to an already loaded instance too
+    return await session.get(
+        VendorProfile,
+        vendor_profile_id,
+        options=options,
+        populate_existing=bool(options),
+    )
+
+
+async def get_vendor_profile_by_user_id(
+    *, session: AsyncSession, user_id: UUID
+) -> VendorProfile | None:
+    return (
+        await session.exec(
+            select(VendorProfile).where(VendorProfile.user_id == user_id)
+        )
+    ).first()
+
+
+async def create_vendor_profile(
+    *, session: AsyncSession, user_id: UUID, data: VendorProfileCreate
+) -> VendorProfile:
+    profile = VendorProfile.model_validate(data, update={"user_id": user_id})
+
+    if data.service_ids:
+        stmt = select(Service).where(col(Service.id).in_(data.service_ids))
+        profile.services = list((await session.exec(stmt)).all())
+
+    session.add(profile)
+    await session.commit()
+    principal_cache.invalidate(user_id)
+    await response_cache.ainvalidate(
+        VENDORS_TAG, vendor_tag(profile.id), user_tag(user_id)
+    )
+
+    return await get_vendor_profile(  # type: ignore[return-value]
+        session=session,
+        vendor_profile_id=profile.id,
+        options=VENDOR_PROFILE_PUBLIC_OPTIONS,
+    )
+
+
+async def get_vendor_profile_version(
+    *, session: AsyncSession, vendor_profile_id: UUID
+) -> tuple[Any, ...] | None:
+    """None if the profile does not exist"""
+    row = (
+        await session.exec(
+            sync_crud.vendor_profile_version_stmt(vendor_profile_id=vendor_profile_id)
+        )
+    ).first()
+    return tuple(row) if row else None
+
+
+async def get_ranked_vendors_for_project(
+    session: AsyncSession, project: Project, skip: int, limit: int
+) -> tuple[list[tuple[VendorProfile, float]], int]:
+    """
+    Rank vendors for a project in a single query.
+    Order: shortlisted first, then by share of matched project services,
+    then by total number of vendor services.
+    """
+    stmt, total_stmt = sync_crud.ranked_vendors_for_project_stmt(project_id=project.id)
+
+    rows, total = await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=VendorProfile,
+        skip=skip,
+        limit=limit,
+    )
+
+    return [(vendor, float(vendor_score)) for vendor, vendor_score in rows], total
+
+
+async def get_available_ranked_projects_for_vendor(
+    *,
+    session: AsyncSession,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+) -> tuple[Sequence[tuple[Project, int]], int]:
+    stmt, total_stmt = sync_crud.available_ranked_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def search_vendors(
+    *,
+    session: AsyncSession,
+    service_ids: list[UUID] | None = None,
+    location: str | None = None,
+    location_fuzzy: bool = False,
+    company_name: str | None = None,
+    q: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> tuple[list[VendorProfile], int]:
+    """
+    Search for vendors by services, keywords, location and company name.
+    Returns vendors sorted by relevance.
+    """
+    stmt, total_stmt = sync_crud.search_vendors_stmt(
+        service_ids=service_ids,
+        location=location,
+        location_fuzzy=location_fuzzy,
+        company_name=company_name,
+        q=q,
+    )
+
+    return await fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=VendorProfile,
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def enrich_vendor_profiles_with_reviews(
+    *, session: AsyncSession, vendor_profiles: Sequence[VendorProfile]
+) -> list[VendorProfilePublic]:
+    """Enrich VendorProfiles with rating and reviews count"""
+    if not vendor_profiles:
+        return []
+
+    # Load user and services (with categories) for the whole page at once
+    (
+        await session.exec(
+            select(VendorProfile)
+            .where(col(VendorProfile.id).in_([v.id for v in vendor_profiles]))
+            .options(*VENDOR_PROFILE_PUBLIC_OPTIONS)
+            .execution_options(populate_existing=True)
+        )
+    ).all()
+
+    stats = await reviews_crud.get_rating_stats_for_users(
+        session=session,
+        user_ids=[v.user_id for v in vendor_profiles if v.user_id],
+    )
+
+    return sync_crud.build_vendor_profiles_public(
+        vendor_profiles=vendor_profiles, stats=stats
+    )
+
+
+async def enrich_vendor_profile_with_reviews(
+    *, session: AsyncSession, vendor_profile: VendorProfile
+) -> VendorProfilePublic:
+    """Enrich VendorProfile with rating and reviews count"""
+    (result,) = await enrich_vendor_profiles_with_reviews(
+        session=session, vendor_profiles=[vendor_profile]
+    )
+    return result
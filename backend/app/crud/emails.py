@@ -0,0 +1,64 @@
+import datetime as dt
+
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models import EmailOutbox, EmailStatus
+
+# Longest wait between two delivery attempts
+MAX_RETRY_DELAY = dt.timedelta(hours=1)
+
+
+def create_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """
+    Queue an email in the session transaction, it is sent by app.email_sender
+    once the caller commits: with the changes it notifies about, or not at all.
+    """
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    return email
+
+
+def claim_due_emails(*, session: Session, limit: int) -> list[EmailOutbox]:
+    """
+    Lock pending emails due for delivery until the transaction ends.
+    Rows locked by another sender are skipped.
+    """
+    stmt = (
+        select(EmailOutbox)
+        .where(
+            col(EmailOutbox.status) == EmailStatus.pending,
+            col(EmailOutbox.next_attempt_at) <= dt.datetime.now(dt.UTC),
+        )
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return list(session.exec(stmt).all())
+
+
+def retry_delay(attempts: int) -> dt.timedelta:
+    delay = dt.timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_SECONDS)
+    delay *= 2 ** (attempts - 1)
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def mark_sent(*, session: Session, email: EmailOutbox) -> None:
+    email.attempts += 1
+    email.status = EmailStatus.sent
+    email.sent_at = dt.datetime.now(dt.UTC)
+    email.last_error = None
+    session.add(email)
+
+
+def mark_failed(*, session: Session, email: EmailOutbox, error: str) -> None:
+    """Schedule a retry with exponential backoff, give up after max attempts"""
+    email.attempts += 1
+    email.last_error = error
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = EmailStatus.failed
+    else:
+        email.next_attempt_at = dt.datetime.now(dt.UTC) + retry_delay(email.attempts)
+    session.add(email)
@@ -1,8 +1,9 @@
 from collections.abc import Sequence
 from uuid import UUID
 
-from sqlmodel import Session, col, func, select
+from sqlmodel import Session, func, select
 
+from app.crud.pagination import fetch_page, keyset_order
 from app.models import PlatformFeedback, PlatformFeedbackCreate
 
 
@@ -17,14 +18,17 @@ def create_feedback(
 
 
 def list_feedback(
-    *, session: Session, skip: int = 0, limit: int = 100
+    *, session: Session, skip: int = 0, limit: int = 100, cursor: str | None = None
 ) -> tuple[Sequence[PlatformFeedback], int]:
-    total = session.exec(select(func.count()).select_from(PlatformFeedback)).one()
+    total_stmt = select(func.count()).select_from(PlatformFeedback)
+    stmt = select(PlatformFeedback).order_by(*keyset_order(PlatformFeedback))
 
-    stmt = (
-        select(PlatformFeedback)
-        .order_by(col(PlatformFeedback.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=PlatformFeedback,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
     )
-    return session.exec(stmt).all(), total
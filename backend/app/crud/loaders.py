@@ -0,0 +1,96 @@
+"""
+Eager-loading plans of public response models.
+
+Async sessions cannot lazy-load during serialization, and sync sessions
+would load relationships row by row, so every relationship a response model
+touches must be loaded up front. loader_plan() derives the options from the
+model: each field named after a relationship of the entity is loaded with
+selectinload, then the nested model of the field is planned against the
+related entity. A page then renders in one query per relationship whatever
+its size.
+
+List functions pass response_model to fetch_page(), which applies the plan.
+"""
+
+import functools
+import types
+import typing
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import selectinload
+
+# Registers the Service load hook setting Service.category from the catalog
+import app.core.catalog  # noqa: F401
+from app.models import (
+    Project,
+    ProjectPublic,
+    ProjectRequest,
+    ProjectRequestPublicProjectFull,
+    ProjectRequestPublicVendorFull,
+    Review,
+    ReviewPublic,
+    User,
+    UserPublic,
+    VendorProfile,
+    VendorProfilePublic,
+)
+
+# Entity each response model is built from
+RESPONSE_ENTITIES: dict[type[BaseModel], type[Any]] = {
+    VendorProfilePublic: VendorProfile,
+    UserPublic: User,
+    ProjectPublic: Project,
+    ProjectRequestPublicProjectFull: ProjectRequest,
+    ProjectRequestPublicVendorFull: ProjectRequest,
+    ReviewPublic: Review,
+}
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    """Model of list[Model], Model | None, ... fields"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if typing.get_origin(annotation) in (list, typing.Union, types.UnionType):
+        for arg in typing.get_args(annotation):
+            model = _nested_model(arg)
+            if model is not None:
+                return model
+    return None
+
+
+def _plan(model: type[BaseModel], entity: type[Any], path: frozenset[Any]) -> Any:
+    relationships = inspect(entity).relationships
+    # Resolves the forward references pydantic keeps in model_fields
+    annotations = typing.get_type_hints(model)
+    options = []
+    for name in model.model_fields:
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        option = selectinload(getattr(entity, name))
+        nested = _nested_model(annotations[name])
+        target = relationship.mapper.class_
+        # Models referring back to an outer one render ids only, stop there
+        if nested is not None and (nested, target) not in path:
+            nested_options = _plan(nested, target, path | {(nested, target)})
+            if nested_options:
+                option = option.options(*nested_options)
+        options.append(option)
+    return tuple(options)
+
+
+@functools.cache
+def loader_plan(model: type[BaseModel], entity: type[Any] | None = None) -> Any:
+    """Loader options rendering model, built from entity or RESPONSE_ENTITIES"""
+    entity = entity or RESPONSE_ENTITIES[model]
+    return _plan(model, entity, frozenset({(model, entity)}))
+
+
+VENDOR_PROFILE_PUBLIC_OPTIONS = loader_plan(VendorProfilePublic)
+USER_PUBLIC_OPTIONS = loader_plan(UserPublic)
+PROJECT_PUBLIC_OPTIONS = loader_plan(ProjectPublic)
+REQUEST_PROJECT_FULL_OPTIONS = loader_plan(ProjectRequestPublicProjectFull)
+REQUEST_VENDOR_FULL_OPTIONS = loader_plan(ProjectRequestPublicVendorFull)
+REVIEW_PUBLIC_OPTIONS = loader_plan(ReviewPublic)
@@ -0,0 +1,165 @@
+"""
+Pagination helpers for list endpoints.
+
+Lists are ordered by (created_at, id) descending. A cursor is an opaque
+token holding the key of the last row of a page; the next page continues
+strictly after it, so the database walks the composite index instead of
+scanning and discarding `skip` rows. `skip` keeps working when no cursor
+is passed.
+
+Totals come from `count(*) OVER ()` in the page query itself, a separate
+COUNT query is only run when the page cannot provide it.
+"""
+
+import base64
+import binascii
+import datetime as dt
+from collections.abc import Sequence
+from typing import Any, Protocol
+from uuid import UUID
+
+import sqlalchemy as sa
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlmodel import Session, col, func, select
+
+from app.crud.loaders import loader_plan
+
+# Below this many rows an exact count is cheap enough
+ESTIMATED_TOTAL_MIN_ROWS = 100_000
+
+
+class _Keyed(Protocol):
+    created_at: dt.datetime
+    id: UUID
+
+
+def encode_cursor(created_at: dt.datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return dt.datetime.fromisoformat(created_at), UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+
+
+def keyset_order(model: Any) -> tuple[Any, Any]:
+    """ORDER BY clauses matching the (created_at, id) composite indexes"""
+    return col(model.created_at).desc(), col(model.id).desc()
+
+
+def paginate(
+    stmt: Any, *, model: Any, cursor: str | None, skip: int, limit: int
+) -> Any:
+    """Apply cursor (or skip, for backward compatibility) and limit to stmt"""
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(col(model.created_at), col(model.id)) < (created_at, id)
+        )
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def next_cursor(items: Sequence[_Keyed], *, limit: int) -> str | None:
+    """Cursor for the page after items, None when items is the last page"""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(items[-1].created_at, items[-1].id)
+
+
+def with_total(
+    stmt: Any, *, model: Any, cursor: str | None, skip: int, limit: int
+) -> Any:
+    """
+    Paginated stmt with the total number of matching rows as last column.
+    Cursor pages get no total column: the window would only count the
+    remaining rows, and computing it would scan all of them past the limit.
+    """
+    stmt = paginate(stmt, model=model, cursor=cursor, skip=skip, limit=limit)
+    if cursor:
+        return stmt
+    return stmt.add_columns(func.count().over().label("total"))
+
+
+def split_total(
+    rows: Sequence[Any], *, columns: int, cursor: str | None, skip: int
+) -> tuple[list[Any], int | None]:
+    """
+    Split rows of a with_total() statement selecting columns expressions into
+    items and total. Items are the first column alone when columns is 1.
+    Total is None when it has to be counted separately: cursor pages have no
+    total column, and past the last page there are no rows.
+    """
+    if columns == 1:
+        items = [row[0] for row in rows]
+    else:
+        items = [tuple(row[:columns]) for row in rows]
+
+    if cursor:
+        return items, None
+    if rows:
+        return items, int(rows[0][columns])
+    return items, None if skip > 0 else 0
+
+
+def fetch_page(
+    *,
+    session: Session,
+    stmt: Any,
+    total_stmt: Any,
+    model: Any,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    response_model: Any = None,
+) -> tuple[list[Any], int]:
+    """
+    Page items and total, in a single query for the usual requests.
+    With response_model, loads everything the model renders (loader_plan()).
+    """
+    if response_model is not None:
+        stmt = stmt.options(*loader_plan(response_model))
+    page_stmt = with_total(stmt, model=model, cursor=cursor, skip=skip, limit=limit)
+    # exec() would return only the entity column of select(Model).add_columns()
+    rows = session.execute(page_stmt).all()
+
+    items, total = split_total(
+        rows, columns=len(stmt.column_descriptions), cursor=cursor, skip=skip
+    )
+    if total is None:
+        total = session.exec(total_stmt).one()
+
+    return items, total
+
+
+def estimated_total_stmt(model: Any) -> Any:
+    """Row count of the model table estimated by the planner statistics"""
+    # reltuples is -1 for a table that was never analyzed
+    return (
+        select(sa.cast(sa.column("reltuples"), sa.BigInteger))
+        .where(
+            sa.column("oid") == func.to_regclass(func.quote_ident(model.__tablename__))
+        )
+        .select_from(sa.table("pg_class"))
+    )
+
+
+def estimated_total(
+    *,
+    session: Session,
+    model: Any,
+    total_stmt: Any,
+    min_rows: int = ESTIMATED_TOTAL_MIN_ROWS,
+) -> int:
+    """Planner estimate for large tables, exact count otherwise"""
+    estimate = session.exec(estimated_total_stmt(model)).first()
+    if estimate is not None and estimate >= min_rows:
+        return int(estimate)
+    return int(session.exec(total_stmt).one())
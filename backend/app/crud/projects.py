@@ -1,15 +1,23 @@
+import datetime as dt
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy.orm import selectinload
+import sqlalchemy as sa
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, col, func, select
 
+from app.core.cache import project_tag, response_cache
+from app.crud.pagination import fetch_page, keyset_order
 from app.models import (
     Project,
     ProjectCreate,
+    ProjectPublic,
     ProjectRequest,
     RequestStatus,
     Service,
+    User,
+    VendorProfile,
 )
 
 
@@ -30,24 +38,33 @@ def get_projects_for_owner(
     if not projects:
         return []
 
-    project_ids = [p.id for p in projects]
-
     counts = session.exec(
+        incoming_counts_stmt(project_ids=[p.id for p in projects])
+    ).all()
+    set_incoming_counts(projects=projects, counts=counts)
+
+    return projects
+
+
+def incoming_counts_stmt(*, project_ids: list[UUID]) -> Any:
+    return (
         select(ProjectRequest.project_id, func.count())
         .where(col(ProjectRequest.project_id).in_(project_ids))
         .where(ProjectRequest.initiator == "vendor")
         .where(ProjectRequest.status == "sent")
         .group_by(col(ProjectRequest.project_id))
-    ).all()
+    )
+
 
+def set_incoming_counts(
+    *, projects: Sequence[Project], counts: Sequence[tuple[UUID | None, int]]
+) -> None:
     incoming_map = dict(counts)
 
     for p in projects:
         object.__setattr__(p, "incoming_count", incoming_map.get(p.id, 0))
         # p.incoming_count = incoming_map.get(p.id, 0) # TODO: make that work
 
-    return projects
-
 
 def create_project(*, session: Session, owner_id: UUID, data: ProjectCreate) -> Project:
     project = Project.model_validate(data, update={"owner_id": owner_id})
@@ -71,25 +88,55 @@ def create_project(*, session: Session, owner_id: UUID, data: ProjectCreate) ->
 def set_services(session: Session, project: Project, service_ids: list[UUID]):
     stmt = select(Service).where(col(Service.id).in_(service_ids))
     project.services.extend(session.exec(stmt).all())
+    # Link rows only, the project row is not updated by itself
+    project.updated_at = dt.datetime.now(dt.UTC)
     session.add(project)
     session.commit()
+    response_cache.invalidate(project_tag(project.id))
+
+
+def with_project_version(stmt: Any) -> Any:
+    """
+    Add updated_at of the rows rendered by ProjectPublic to stmt selecting
+    from Project: the project, its owner and vendor profiles, for ETags
+    """
+    owner = aliased(User)
+    owner_profile = aliased(VendorProfile)
+    vendor_profile = aliased(VendorProfile)
+    vendor_user = aliased(User)
+    return (
+        stmt.add_columns(
+            Project.updated_at,
+            owner.updated_at,
+            owner_profile.updated_at,
+            vendor_profile.updated_at,
+            vendor_user.updated_at,
+        )
+        .outerjoin(owner, owner.id == Project.owner_id)
+        .outerjoin(owner_profile, owner_profile.user_id == Project.owner_id)
+        .outerjoin(vendor_profile, vendor_profile.id == Project.vendor_profile_id)
+        .outerjoin(vendor_user, vendor_user.id == vendor_profile.user_id)
+    )
+
+
+def project_version_stmt(*, project_id: UUID) -> Any:
+    # sqlalchemy select, sqlmodel would return scalars of a one column select
+    return with_project_version(
+        sa.select(col(Project.id)).where(col(Project.id) == project_id)
+    )
 
 
 def archive_project(*, session: Session, project: Project) -> Project:
     project.is_archived = True
     session.add(project)
     session.commit()
+    response_cache.invalidate(project_tag(project.id))
     session.refresh(project)
     return project
 
 
-def get_archived_projects_for_vendor(
-    *,
-    session: Session,
-    vendor_profile_id: UUID,
-    skip: int,
-    limit: int,
-) -> tuple[Sequence[Project], int]:
+def archived_projects_for_vendor_stmt(*, vendor_profile_id: UUID) -> tuple[Any, Any]:
+    """Returns (projects statement without pagination, total statement)"""
     P = Project
     R = ProjectRequest
 
@@ -100,17 +147,9 @@ def get_archived_projects_for_vendor(
             R.vendor_profile_id == vendor_profile_id,
             P.is_archived == True,
         )
-        .order_by(col(P.created_at).desc())
-        .offset(skip)
-        .limit(limit)
-        .options(
-            selectinload(P.services),  # type: ignore
-            selectinload(P.owner),  # type: ignore
-        )
+        .order_by(*keyset_order(P))
     )
 
-    projects = session.exec(stmt).all()
-
     total_stmt = (
         select(func.count())
         .select_from(R)
@@ -120,18 +159,36 @@ def get_archived_projects_for_vendor(
             P.is_archived == True,
         )
     )
-    total = session.exec(total_stmt).one()
 
-    return projects, total
+    return stmt, total_stmt
 
 
-def get_accepted_projects_for_vendor(
+def get_archived_projects_for_vendor(
     *,
     session: Session,
     vendor_profile_id: UUID,
     skip: int,
     limit: int,
+    cursor: str | None = None,
 ) -> tuple[Sequence[Project], int]:
+    stmt, total_stmt = archived_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def accepted_projects_for_vendor_stmt(*, vendor_profile_id: UUID) -> tuple[Any, Any]:
+    """Returns (projects statement without pagination, total statement)"""
     P = Project
     R = ProjectRequest
 
@@ -142,17 +199,9 @@ def get_accepted_projects_for_vendor(
             R.vendor_profile_id == vendor_profile_id,
             R.status == RequestStatus.accepted,
         )
-        .order_by(col(P.created_at).desc())
-        .offset(skip)
-        .limit(limit)
-        .options(
-            selectinload(P.services),  # type: ignore
-            selectinload(P.owner),  # type: ignore
-        )
+        .order_by(*keyset_order(P))
     )
 
-    projects = session.exec(stmt).all()
-
     total_stmt = (
         select(func.count())
         .select_from(R)
@@ -161,6 +210,29 @@ def get_accepted_projects_for_vendor(
             R.status == RequestStatus.accepted,
         )
     )
-    total = session.exec(total_stmt).one()
 
-    return projects, total
+    return stmt, total_stmt
+
+
+def get_accepted_projects_for_vendor(
+    *,
+    session: Session,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[Sequence[Project], int]:
+    stmt, total_stmt = accepted_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
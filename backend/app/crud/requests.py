@@ -1,10 +1,23 @@
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException, status
 from sqlmodel import Session, col, func, select
 
-from app.models import FeasibilityItem, Project, ProjectRequest, RequestInitiator, RequestStatus
+from app.core.cache import project_tag, response_cache
+from app.crud.pagination import fetch_page, keyset_order
+from app.crud.projects import with_project_version
+from app.models import (
+    FeasibilityItem,
+    Project,
+    ProjectRequest,
+    ProjectRequestPublicProjectFull,
+    ProjectRequestPublicVendorFull,
+    RequestInitiator,
+    RequestStatus,
+    UserRatingSummary,
+)
 
 
 def get_request(
@@ -22,6 +35,32 @@ def get_request_by_id(*, session: Session, request_id: UUID) -> ProjectRequest |
     return session.get(ProjectRequest, request_id)
 
 
+def proposal_version_stmt(*, request_id: UUID, vendor_profile_id: UUID) -> Any:
+    """
+    Versions of the rows rendered by ProjectRequestPublicProjectFull with the
+    project owner rating, for ETags. Only matches proposals of the vendor.
+    """
+    stmt = (
+        select(
+            ProjectRequest.updated_at,
+            UserRatingSummary.rating_sum,
+            UserRatingSummary.rating_count,
+        )
+        .select_from(ProjectRequest)
+        .outerjoin(Project, col(Project.id) == ProjectRequest.project_id)
+        .outerjoin(
+            UserRatingSummary,
+            col(UserRatingSummary.reviewed_user_id) == Project.owner_id,
+        )
+        .where(
+            ProjectRequest.id == request_id,
+            ProjectRequest.vendor_profile_id == vendor_profile_id,
+            ProjectRequest.initiator == RequestInitiator.vendor,
+        )
+    )
+    return with_project_version(stmt)
+
+
 def create_request(
     *,
     session: Session,
@@ -95,20 +134,21 @@ def update_request_status(
 
     session.add(request)
     session.commit()
+    if new_status == RequestStatus.accepted and request.project_id is not None:
+        # The project now renders its vendor
+        response_cache.invalidate(project_tag(request.project_id))
     session.refresh(request)
 
     return request
 
 
-def get_requests_for_project(
+def requests_for_project_stmt(
     *,
-    session: Session,
     project_id: UUID,
     initiator: RequestInitiator | None = None,
     status: RequestStatus | None = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> tuple[Sequence[ProjectRequest], int]:
+) -> tuple[Any, Any]:
+    """Returns (requests statement without pagination, total statement)"""
     filters = [ProjectRequest.project_id == project_id]
 
     if initiator is not None:
@@ -116,19 +156,39 @@ def get_requests_for_project(
     if status is not None:
         filters.append(ProjectRequest.status == status)
 
-    total = session.exec(
-        select(func.count()).select_from(ProjectRequest).where(*filters)
-    ).one()
+    total_stmt = select(func.count()).select_from(ProjectRequest).where(*filters)
 
     stmt = (
-        select(ProjectRequest)
-        .where(*filters)
-        .order_by(col(ProjectRequest.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+        select(ProjectRequest).where(*filters).order_by(*keyset_order(ProjectRequest))
     )
 
-    return session.exec(stmt).all(), total
+    return stmt, total_stmt
+
+
+def get_requests_for_project(
+    *,
+    session: Session,
+    project_id: UUID,
+    initiator: RequestInitiator | None = None,
+    status: RequestStatus | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = requests_for_project_stmt(
+        project_id=project_id, initiator=initiator, status=status
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicVendorFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
 
 
 def get_vendor_ids_from_project_requests(
@@ -141,14 +201,10 @@ def get_vendor_ids_from_project_requests(
     return session.exec(stmt).all()
 
 
-def get_vendor_proposals(
-    *,
-    session: Session,
-    vendor_profile_id: UUID,
-    status: RequestStatus | None = None,
-    skip: int = 0,
-    limit: int = 50,
-) -> tuple[Sequence[ProjectRequest], int]:
+def vendor_proposals_stmt(
+    *, vendor_profile_id: UUID, status: RequestStatus | None = None
+) -> tuple[Any, Any]:
+    """Returns (proposals statement without pagination, total statement)"""
     filters = [
         ProjectRequest.vendor_profile_id == vendor_profile_id,
         ProjectRequest.initiator == RequestInitiator.vendor,
@@ -163,18 +219,40 @@ def get_vendor_proposals(
         .where(*filters)  # type: ignore
     )
 
-    total = session.exec(
-        select(func.count()).select_from(base.subquery())
-    ).one()
+    total_stmt = select(func.count()).select_from(base.subquery())
 
-    stmt = base.order_by(col(ProjectRequest.created_at).desc()).offset(skip).limit(limit)
+    stmt = base.order_by(*keyset_order(ProjectRequest))
 
-    return session.exec(stmt).all(), total
+    return stmt, total_stmt
 
 
-def get_incoming_requests_for_vendor(
-    *, session: Session, vendor_profile_id: UUID, skip: int, limit: int
+def get_vendor_proposals(
+    *,
+    session: Session,
+    vendor_profile_id: UUID,
+    status: RequestStatus | None = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
 ) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = vendor_proposals_stmt(
+        vendor_profile_id=vendor_profile_id, status=status
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicProjectFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def incoming_requests_for_vendor_stmt(*, vendor_profile_id: UUID) -> tuple[Any, Any]:
+    """Returns (incoming requests statement without pagination, total statement)"""
     filters = [
         ProjectRequest.vendor_profile_id == vendor_profile_id,
         ProjectRequest.initiator == RequestInitiator.company,
@@ -182,20 +260,42 @@ def get_incoming_requests_for_vendor(
         col(Project.vendor_profile_id).is_(None),
     ]
 
-    total = session.exec(
+    total_stmt = (
         select(func.count())
         .select_from(ProjectRequest)
         .join(Project, col(ProjectRequest.project_id) == Project.id)
         .where(*filters)  # type: ignore
-    ).one()
+    )
 
     stmt = (
         select(ProjectRequest)
         .join(Project, col(ProjectRequest.project_id) == Project.id)
         .where(*filters)  # type: ignore
-        .order_by(col(ProjectRequest.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+        .order_by(*keyset_order(ProjectRequest))
     )
 
-    return session.exec(stmt).all(), total
+    return stmt, total_stmt
+
+
+def get_incoming_requests_for_vendor(
+    *,
+    session: Session,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[Sequence[ProjectRequest], int]:
+    stmt, total_stmt = incoming_requests_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=ProjectRequest,
+        response_model=ProjectRequestPublicProjectFull,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
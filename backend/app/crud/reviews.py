@@ -1,11 +1,24 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy.orm import selectinload
-from sqlmodel import Session, col, func, select
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, delete, func, select
 
+from app.core.cache import VENDORS_TAG, response_cache, user_tag
 from app.crud import vendors as vendors_crud
-from app.models import Project, Review, ReviewCreate, User, VendorProfile
+from app.crud.loaders import USER_PUBLIC_OPTIONS
+from app.crud.pagination import fetch_page, keyset_order
+from app.models import (
+    Project,
+    Review,
+    ReviewCreate,
+    ReviewPublic,
+    User,
+    UserRatingSummary,
+    VendorProfile,
+)
 
 
 def has_shared_project(
@@ -68,33 +81,51 @@ def create_review(*, session: Session, author_id: UUID, data: ReviewCreate) -> R
 
     review = Review.model_validate(data, update={"author_id": author_id})
     session.add(review)
+    add_rating_to_summary(
+        session=session, user_id=data.reviewed_user_id, rating=data.rating
+    )
     session.commit()
+    # Ratings are rendered with users and vendor profiles
+    response_cache.invalidate(VENDORS_TAG, user_tag(data.reviewed_user_id))
     session.refresh(review)
     return review
 
 
-def get_reviews_for_user(
-    *,
-    session: Session,
-    user_id: UUID,
-    skip: int = 0,
-    limit: int = 100,
-) -> tuple[Sequence[Review], int]:
+def reviews_for_user_stmt(*, user_id: UUID) -> tuple[Any, Any]:
+    """Returns (reviews statement without pagination, total statement)"""
     total_stmt = select(func.count(col(Review.id))).where(
         col(Review.reviewed_user_id) == user_id
     )
-    total = session.exec(total_stmt).one()
 
     stmt = (
         select(Review)
         .where(col(Review.reviewed_user_id) == user_id)
-        .options(selectinload(Review.author), selectinload(Review.reviewed_user))  # type: ignore
-        .order_by(col(Review.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+        .order_by(*keyset_order(Review))
     )
 
-    return session.exec(stmt).all(), total
+    return stmt, total_stmt
+
+
+def get_reviews_for_user(
+    *,
+    session: Session,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[Review], int]:
+    stmt, total_stmt = reviews_for_user_stmt(user_id=user_id)
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Review,
+        response_model=ReviewPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
 
 
 def get_reviews_for_vendor(
@@ -103,6 +134,7 @@ def get_reviews_for_vendor(
     vendor_profile_id: UUID,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> tuple[Sequence[Review], int]:
     """Get reviews for a vendor by vendor_profile_id"""
 
@@ -117,33 +149,47 @@ def get_reviews_for_vendor(
         user_id=vendor_profile.user_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
 
 
-def get_reviews_by_author(
-    *,
-    session: Session,
-    author_id: UUID,
-    skip: int = 0,
-    limit: int = 100,
-) -> tuple[Sequence[Review], int]:
+def reviews_by_author_stmt(*, author_id: UUID) -> tuple[Any, Any]:
+    """Returns (reviews statement without pagination, total statement)"""
     total_stmt = (
         select(func.count())
         .select_from(Review)
         .where(col(Review.author_id) == author_id)
     )
-    total = session.exec(total_stmt).one()
 
     stmt = (
         select(Review)
         .where(col(Review.author_id) == author_id)
-        .options(selectinload(Review.author), selectinload(Review.reviewed_user))  # type: ignore
-        .order_by(col(Review.created_at).desc())
-        .offset(skip)
-        .limit(limit)
+        .order_by(*keyset_order(Review))
     )
 
-    return session.exec(stmt).all(), total
+    return stmt, total_stmt
+
+
+def get_reviews_by_author(
+    *,
+    session: Session,
+    author_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[Sequence[Review], int]:
+    stmt, total_stmt = reviews_by_author_stmt(author_id=author_id)
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Review,
+        response_model=ReviewPublic,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
 
 
 def get_user_rating_stats(
@@ -151,11 +197,107 @@ def get_user_rating_stats(
 ) -> tuple[float | None, int]:
     """Returns (average_rating, reviews_count) for a user (vendor or company)"""
 
-    stmt = select(func.avg(col(Review.rating)), func.count(col(Review.id))).where(
-        col(Review.reviewed_user_id) == user_id
+    summary = session.get(UserRatingSummary, user_id)
+    if not summary:
+        return None, 0
+    return summary.rating_avg, summary.rating_count
+
+
+def get_rating_stats_for_users(
+    *, session: Session, user_ids: Iterable[UUID]
+) -> dict[UUID, tuple[float | None, int]]:
+    """Returns {user_id: (average_rating, reviews_count)} in a single query"""
+
+    ids = set(user_ids)
+    stats: dict[UUID, tuple[float | None, int]] = dict.fromkeys(ids, (None, 0))
+    if not ids:
+        return stats
+
+    stmt = select(UserRatingSummary).where(
+        col(UserRatingSummary.reviewed_user_id).in_(ids)
+    )
+    for summary in session.exec(stmt).all():
+        stats[summary.reviewed_user_id] = (summary.rating_avg, summary.rating_count)
+    return stats
+
+
+def rating_summary_upsert_stmt(*, user_id: UUID, rating: int) -> Any:
+    summary = UserRatingSummary.__table__.c  # type: ignore[attr-defined]
+    stmt = insert(UserRatingSummary).values(
+        reviewed_user_id=user_id,
+        rating_sum=rating,
+        rating_count=1,
+        rating_avg=float(rating),
     )
-    avg_rating, count = session.exec(stmt).one()
-    return float(avg_rating) if avg_rating else None, count or 0
+    return stmt.on_conflict_do_update(
+        index_elements=[summary.reviewed_user_id],
+        set_={
+            "rating_sum": summary.rating_sum + rating,
+            "rating_count": summary.rating_count + 1,
+            "rating_avg": sa.cast(summary.rating_sum + rating, sa.Float)
+            / (summary.rating_count + 1),
+        },
+    )
+
+
+def add_rating_to_summary(*, session: Session, user_id: UUID, rating: int) -> None:
+    """
+    Upsert the rating summary row for a reviewed user.
+    Does not commit: runs in the same transaction as the review insert.
+    """
+    session.exec(rating_summary_upsert_stmt(user_id=user_id, rating=rating))
+
+
+def rebuild_rating_summaries(
+    *, session: Session, user_ids: Iterable[UUID] | None = None
+) -> int:
+    """
+    Recompute rating summaries from the Review table.
+    Rebuilds all rows when user_ids is None. Returns number of summary rows written.
+    """
+    ids = set(user_ids) if user_ids is not None else None
+    if ids is not None and not ids:
+        return 0
+
+    delete_stmt = delete(UserRatingSummary)
+    aggregate = select(
+        col(Review.reviewed_user_id),
+        func.sum(col(Review.rating)),
+        func.count(col(Review.id)),
+        sa.cast(func.avg(col(Review.rating)), sa.Float),
+    ).group_by(col(Review.reviewed_user_id))
+    if ids is not None:
+        delete_stmt = delete_stmt.where(
+            col(UserRatingSummary.reviewed_user_id).in_(ids)
+        )
+        aggregate = aggregate.where(col(Review.reviewed_user_id).in_(ids))
+
+    insert_stmt = (
+        insert(UserRatingSummary)
+        .from_select(
+            ["reviewed_user_id", "rating_sum", "rating_count", "rating_avg"],
+            aggregate,
+        )
+        .returning(col(UserRatingSummary.reviewed_user_id))
+    )
+
+    session.exec(delete_stmt)
+    rebuilt = session.exec(insert_stmt).all()
+    session.commit()
+    if ids is None:
+        response_cache.clear()
+    else:
+        response_cache.invalidate(VENDORS_TAG, *(user_tag(id) for id in ids))
+    return len(rebuilt)
+
+
+def get_reviewed_user_ids_by_author(
+    *, session: Session, author_id: UUID
+) -> Sequence[UUID]:
+    stmt = select(col(Review.reviewed_user_id)).where(
+        col(Review.author_id) == author_id
+    )
+    return session.exec(stmt).all()
 
 
 def get_vendor_rating_stats(
@@ -219,4 +361,4 @@ def get_users_to_review(*, session: Session, current_user_id: UUID) -> Sequence[
             .distinct()
         )
 
-    return session.exec(stmt).all()
+    return session.exec(stmt.options(*USER_PUBLIC_OPTIONS)).all()
@@ -3,7 +3,17 @@ from uuid import UUID
 from sqlmodel import Session, select
 
 from app.api.exceptions import AlreadyExistsError
-from app.models import Category, Service, ServiceUpdate
+from app.core.cache import CATALOG_TAG, response_cache
+from app.core.catalog import service_catalog
+from app.models import Category, CategoryPublic, Service, ServiceUpdate
+
+
+def commit_catalog(*, session: Session) -> None:
+    """Commit a catalog change and reload the catalog of every worker"""
+    service_catalog.notify(session=session)
+    session.commit()
+    service_catalog.reload()
+    response_cache.invalidate(CATALOG_TAG)
 
 
 # CATEGORY CRUD
@@ -13,7 +23,7 @@ def create_category(*, session: Session, label: str) -> Category:
         raise AlreadyExistsError("Category already exists")
     category = Category(label=label)
     session.add(category)
-    session.commit()
+    commit_catalog(session=session)
     session.refresh(category)
     return category
 
@@ -22,7 +32,7 @@ def update_category(*, session: Session, category: Category, label: str | None):
     if label:
         category.label = label
         session.add(category)
-        session.commit()
+        commit_catalog(session=session)
         session.refresh(category)
     return category
 
@@ -31,9 +41,8 @@ def get_category(*, session: Session, category_id: UUID) -> Category | None:
     return session.get(Category, category_id)
 
 
-def get_categories_with_services(*, session: Session):
-    stmt = select(Category)
-    return session.exec(stmt).all()
+def get_categories_with_services() -> list[CategoryPublic]:
+    return service_catalog.get().categories
 
 
 # SERVICE CRUD
@@ -43,7 +52,7 @@ def create_service(*, session: Session, label: str, category_id: UUID):
         raise AlreadyExistsError("Service already exists")
     service = Service(label=label, category_id=category_id)
     session.add(service)
-    session.commit()
+    commit_catalog(session=session)
     session.refresh(service)
     return service
 
@@ -52,7 +61,7 @@ def update_service(*, session: Session, service: Service, data: ServiceUpdate):
     service_data = data.model_dump(exclude_unset=True)
     service.sqlmodel_update(service_data)
     session.add(service)
-    session.commit()
+    commit_catalog(session=session)
     session.refresh(service)
     return service
 
@@ -63,4 +72,4 @@ def get_service(*, session: Session, service_id: UUID) -> Service | None:
 
 def delete_service(*, session: Session, service: Service):
     session.delete(service)
-    session.commit()
+    commit_catalog(session=session)
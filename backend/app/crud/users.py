@@ -1,17 +1,37 @@
 import uuid
+from collections.abc import Iterator
 from typing import Any
 
-from sqlmodel import Session, select
+import sqlalchemy as sa
+from sqlmodel import Session, col, or_, select
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.cache import VENDORS_TAG, response_cache, user_tag
+from app.core.principals import principal_cache
+from app.core.security import get_password_hash, password_hasher
+from app.file_utils import avatar_urls
+from app.models import (
+    Item,
+    ItemCreate,
+    Principal,
+    User,
+    UserCreate,
+    UserUpdate,
+    VendorProfile,
+)
 
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+def add_user(*, session: Session, user_create: UserCreate) -> User:
+    """Insert the user without committing, with other rows of the transaction"""
     db_obj = User.model_validate(
         user_create, update={"hashed_password": get_password_hash(user_create.password)}
     )
     session.add(db_obj)
+    session.flush()
+    return db_obj
+
+
+def create_user(*, session: Session, user_create: UserCreate) -> User:
+    db_obj = add_user(session=session, user_create=user_create)
     session.commit()
     session.refresh(db_obj)
     return db_obj
@@ -19,14 +39,19 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
 
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
+    extra_data: dict[str, Any] = {}
     if "password" in user_data:
         password = user_data["password"]
         hashed_password = get_password_hash(password)
         extra_data["hashed_password"] = hashed_password
+    if user_data.get("logo_url", db_user.logo_url) != db_user.logo_url:
+        # Thumbnails belong to the previous logo
+        extra_data["logo_variants"] = None
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    principal_cache.invalidate(db_user.id)
+    response_cache.invalidate(VENDORS_TAG, user_tag(db_user.id))
     session.refresh(db_user)
     return db_user
 
@@ -37,12 +62,55 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
     return session_user
 
 
+def principal_stmt(*, user_id: uuid.UUID) -> Any:
+    """Principal columns of the user and its vendor profile, in one query"""
+    # sqlmodel's select() is typed for four columns at most
+    return (
+        sa.select(
+            col(User.id),
+            col(User.role),
+            col(User.is_active),
+            col(User.is_superuser),
+            col(VendorProfile.id).label("vendor_profile_id"),
+        )
+        .outerjoin(VendorProfile, col(VendorProfile.user_id) == col(User.id))
+        .where(col(User.id) == user_id)
+    )
+
+
+def get_principal(*, session: Session, user_id: uuid.UUID) -> Principal | None:
+    row = session.exec(principal_stmt(user_id=user_id)).first()
+    return Principal.model_validate(row._mapping) if row else None
+
+
+def get_media_urls(*, session: Session) -> Iterator[str]:
+    """URLs of all avatars and thumbnails referenced by users"""
+    stmt = (
+        select(User.logo_url, User.logo_variants)
+        .where(
+            or_(col(User.logo_url).is_not(None), col(User.logo_variants).is_not(None))
+        )
+        .execution_options(yield_per=1000)
+    )
+    for logo_url, logo_variants in session.exec(stmt):
+        yield from avatar_urls(logo_url, logo_variants)
+
+
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = password_hasher.verify_and_update(
+        password, db_user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash:
+        # Hashed with another cost than BCRYPT_ROUNDS
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
     return db_user
 
 
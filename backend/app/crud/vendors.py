@@ -1,18 +1,28 @@
+import datetime as dt
+import functools
 from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import and_, not_
-from sqlalchemy.orm import selectinload
+import sqlalchemy as sa
+from sqlalchemy import ColumnElement, and_, not_
 from sqlmodel import Session, col, func, select
 
-from app.crud import requests as requests_crud
+from app.core.cache import VENDORS_TAG, response_cache, user_tag, vendor_tag
+from app.core.principals import principal_cache
 from app.crud import reviews as reviews_crud
-from app.crud import shortlist as shortlist_crud
+from app.crud.loaders import VENDOR_PROFILE_PUBLIC_OPTIONS
+from app.crud.pagination import fetch_page
+from app.m2m_models import ProjectShortlist
 from app.models import (
+    SEARCH_CONFIGS,
     Project,
+    ProjectPublic,
     ProjectRequest,
     ProjectServiceLink,
     Service,
+    User,
+    UserRatingSummary,
     VendorProfile,
     VendorProfileCreate,
     VendorProfilePublic,
@@ -41,6 +51,8 @@ def create_vendor_profile(
 
     session.add(profile)
     session.commit()
+    principal_cache.invalidate(user_id)
+    response_cache.invalidate(VENDORS_TAG, vendor_tag(profile.id), user_tag(user_id))
     session.refresh(profile)
 
     if data.service_ids:
@@ -51,64 +63,134 @@ def create_vendor_profile(
 def set_services(*, session: Session, profile: VendorProfile, service_ids: list[UUID]):
     stmt = select(Service).where(col(Service.id).in_(service_ids))
     profile.services.extend(session.exec(stmt).all())
+    # Link rows only, the profile row is not updated by itself
+    profile.updated_at = dt.datetime.now(dt.UTC)
     session.add(profile)
     session.commit()
+    response_cache.invalidate(
+        VENDORS_TAG, vendor_tag(profile.id), user_tag(profile.user_id)
+    )
 
 
-def get_ranked_vendors_for_project(
-    session: Session, project: Project, skip: int, limit: int
-) -> tuple[list[tuple[VendorProfile, float]], int]:
-    required_services = {s.id for s in project.services}
-    required_services_count = len(required_services)
+def vendor_profile_version_stmt(*, vendor_profile_id: UUID) -> Any:
+    """Versions of the rows rendered by VendorProfilePublic, for ETags"""
+    return (
+        select(
+            VendorProfile.updated_at,
+            User.updated_at,
+            UserRatingSummary.rating_sum,
+            UserRatingSummary.rating_count,
+        )
+        .select_from(VendorProfile)
+        .outerjoin(User, col(User.id) == VendorProfile.user_id)
+        .outerjoin(
+            UserRatingSummary,
+            col(UserRatingSummary.reviewed_user_id) == VendorProfile.user_id,
+        )
+        .where(VendorProfile.id == vendor_profile_id)
+    )
+
+
+def ranked_vendors_for_project_stmt(*, project_id: UUID) -> tuple[Any, Any]:
+    """
+    Statements for ranking vendors for a project, shared by sync and async CRUD.
+    Returns (rows statement without pagination, fallback total statement).
+    Rows are (VendorProfile, score) ordered by: shortlisted first,
+    share of matched project services, total number of vendor services.
+    """
+    VP = VendorProfile
+    PSL = ProjectServiceLink
+    VSL = VendorServiceLink
+    PS = ProjectShortlist
+    R = ProjectRequest
 
-    existing_vendor_ids = requests_crud.get_vendor_ids_from_project_requests(
-        session=session, project_id=project.id
+    # Вендоры, с которыми по проекту уже есть заявка, исключаются (anti-join)
+    subq_requested = (
+        select(R.id)
+        .where(
+            R.project_id == project_id,
+            R.vendor_profile_id == VP.id,
+        )
+        .exists()
     )
-    existing_vendor_ids = {vid for vid in existing_vendor_ids if vid is not None}  # type: ignore
 
-    # Get shortlisted vendor IDs for this project
-    shortlisted_vendor_ids = shortlist_crud.get_shortlisted_vendor_ids(
-        session=session, project_id=project.id
+    required_count = (
+        select(func.count())
+        .select_from(PSL)
+        .where(PSL.project_id == project_id)
+        .scalar_subquery()
     )
 
-    vendors = session.exec(
-        select(VendorProfile).where(col(VendorProfile.id).not_in(existing_vendor_ids))
-    ).all()
+    match_count = func.count(col(PSL.service_id))
+    services_count = func.count(col(VSL.service_id))
+    is_shortlisted = func.bool_or(col(PS.vendor_profile_id).is_not(None))
+    score = func.coalesce(
+        sa.cast(match_count, sa.Float) / func.nullif(required_count, 0), 0.0
+    ).label("score")
 
-    ranked: list[tuple[VendorProfile, float]] = []
+    stmt = (
+        select(VP, score)
+        .join(VSL, col(VSL.vendor_profile_id) == VP.id, isouter=True)
+        .join(
+            PSL,
+            and_(
+                col(PSL.service_id) == VSL.service_id,
+                col(PSL.project_id) == project_id,
+            ),
+            isouter=True,
+        )
+        .join(
+            PS,
+            and_(
+                col(PS.vendor_profile_id) == VP.id,
+                col(PS.project_id) == project_id,
+            ),
+            isouter=True,
+        )
+        .where(not_(subq_requested))
+        .group_by(col(VP.id))
+        .order_by(
+            is_shortlisted.desc(),
+            match_count.desc(),
+            services_count.desc(),
+            col(VP.id),
+        )
+    )
 
-    if required_services_count == 0:
-        # Even with no services, shortlisted vendors go first
-        ranked = [(vendor, 0.0) for vendor in vendors]
-        ranked.sort(key=lambda x: (x[0].id not in shortlisted_vendor_ids,))
-        return ranked[skip : skip + limit], len(vendors)
+    total_stmt = select(func.count()).select_from(VP).where(not_(subq_requested))
 
-    for vendor in vendors:
-        vendor_services = {s.id for s in vendor.services}
-        match_count = len(required_services & vendor_services)
+    return stmt, total_stmt
 
-        score = match_count / required_services_count
-        ranked.append((vendor, score))
 
-    # Sort: shortlisted first, then by score, then by number of services
-    ranked.sort(
-        key=lambda x: (
-            x[0].id not in shortlisted_vendor_ids,  # False (shortlisted) first
-            -x[1],  # Higher score first
-            -len({s.id for s in x[0].services}),  # More services first
-        )
+def get_ranked_vendors_for_project(
+    session: Session, project: Project, skip: int, limit: int
+) -> tuple[list[tuple[VendorProfile, float]], int]:
+    """
+    Rank vendors for a project in a single query.
+    Order: shortlisted first, then by share of matched project services,
+    then by total number of vendor services.
+    """
+    stmt, total_stmt = ranked_vendors_for_project_stmt(project_id=project.id)
+
+    rows, total = fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=VendorProfile,
+        skip=skip,
+        limit=limit,
     )
 
-    return ranked[skip : skip + limit], len(ranked)
+    return [(vendor, float(vendor_score)) for vendor, vendor_score in rows], total
 
 
-def get_available_ranked_projects_for_vendor(
-    *,
-    session: Session,
-    vendor_profile_id: UUID,
-    skip: int,
-    limit: int,
-) -> tuple[Sequence[tuple[Project, int]], int]:
+def available_ranked_projects_for_vendor_stmt(
+    *, vendor_profile_id: UUID
+) -> tuple[Any, Any]:
+    """
+    Statements for projects available to a vendor, shared by sync and async CRUD.
+    Returns (rows statement without pagination, total statement).
+    """
     # Алиасы для удобства
     P = Project
     PSL = ProjectServiceLink
@@ -125,9 +207,11 @@ def get_available_ranked_projects_for_vendor(
         .exists()
     )
 
-    total = session.exec(
-        select(func.count()).select_from(P).where(not_(subq_exists), P.is_archived == False)
-    ).one()
+    total_stmt = (
+        select(func.count())
+        .select_from(P)
+        .where(not_(subq_exists), P.is_archived == False)
+    )
 
     # Счётчик пересечений сервисов
     similarity_count = func.count(col(VSL.service_id)).label("similarity_score")
@@ -152,96 +236,159 @@ def get_available_ranked_projects_for_vendor(
             similarity_count.desc(),
             col(P.created_at).desc(),
         )
-        .offset(skip)
-        .limit(limit)
-        .options(
-            selectinload(P.services),  # type: ignore
-            selectinload(P.owner),  # type: ignore
-        )
     )
 
-    rows = session.exec(stmt).all()
-
-    return rows, total
+    return stmt, total_stmt
 
 
-def search_vendors(
+def get_available_ranked_projects_for_vendor(
     *,
     session: Session,
+    vendor_profile_id: UUID,
+    skip: int,
+    limit: int,
+) -> tuple[Sequence[tuple[Project, int]], int]:
+    stmt, total_stmt = available_ranked_projects_for_vendor_stmt(
+        vendor_profile_id=vendor_profile_id
+    )
+
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=Project,
+        response_model=ProjectPublic,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def search_query(q: str) -> Any:
+    """tsquery matching q in any of the search configurations"""
+    queries: list[ColumnElement[Any]] = [
+        func.websearch_to_tsquery(config, q) for config in SEARCH_CONFIGS
+    ]
+    return functools.reduce(lambda a, b: a.op("||")(b), queries)
+
+
+def search_vendors_stmt(
+    *,
     service_ids: list[UUID] | None = None,
     location: str | None = None,
-    skip: int = 0,
-    limit: int = 100,
-) -> tuple[list[VendorProfile], int]:
+    location_fuzzy: bool = False,
+    company_name: str | None = None,
+    q: str | None = None,
+) -> tuple[Any, Any]:
     """
-    Search for vendors by services and optionally by location.
-    Returns vendors sorted by relevance (number of matching services).
+    Statements for vendor search, shared by sync and async CRUD.
+    Returns (vendors statement without pagination, total statement).
+    With service IDs, vendors having at least one of them are returned.
+    With q, vendors whose main goal, description or company name match it.
+    Location and company name are substring filters; a fuzzy location
+    matches similar words instead, tolerating typos.
+    Sorted by relevance: share of matching services, full-text rank and
+    location similarity, then by id so that pages are stable.
     """
-    from app.models import User
-
-    # If service IDs are provided, filter vendors with matching services
-    if service_ids and len(service_ids) > 0:
-        # Get all vendors that have at least one of the requested services
-        vendors_query = (
-            select(VendorProfile)
-            .join(
-                VendorServiceLink,
-                col(VendorServiceLink.vendor_profile_id) == col(VendorProfile.id),
+    VP = VendorProfile
+    VSL = VendorServiceLink
+    vp_vector = VP.__table__.c.search_vector  # type: ignore[attr-defined]
+    user_vector = User.__table__.c.search_vector  # type: ignore[attr-defined]
+
+    stmt = select(VP)
+    relevance: list[Any] = []
+    group_by = [col(VP.id)]
+
+    if location or company_name or q:
+        stmt = stmt.join(
+            User,
+            col(VP.user_id) == col(User.id),
+            isouter=not (location or company_name),
+        )
+        group_by.append(col(User.id))
+
+    # lower(...) matches the pg_trgm indexes on user, see trigram_index()
+    user_location = func.lower(col(User.location))
+    if location and location_fuzzy:
+        needle = location.lower()
+        # <% is true for a word with word_similarity() above the threshold
+        stmt = stmt.where(sa.literal(needle).op("<%")(user_location))
+        relevance.append(func.word_similarity(needle, user_location))
+    elif location:
+        stmt = stmt.where(user_location.contains(location.lower(), autoescape=True))
+
+    if company_name:
+        stmt = stmt.where(
+            func.lower(col(User.company_name)).contains(
+                company_name.lower(), autoescape=True
             )
-            .where(col(VendorServiceLink.service_id).in_(service_ids))
-            .distinct()
         )
 
-        # Apply location filter if provided
-        if location:
-            vendors_query = vendors_query.join(
-                User, col(VendorProfile.user_id) == col(User.id)
-            ).where(func.lower(col(User.location)).contains(location.lower()))
-
-        # Get all matching vendors for sorting
-        all_vendors = session.exec(vendors_query).all()
-
-        # Sort by number of matching services
-        required_services = set(service_ids)
-        vendors_with_score = []
-
-        for vendor in all_vendors:
-            # Load services relationship
-            session.refresh(vendor, ["services"])
-            vendor_services = {s.id for s in vendor.services}
-            match_count = len(required_services & vendor_services)
-            vendors_with_score.append((vendor, match_count))
-
-        # Sort by match count descending
-        vendors_with_score.sort(key=lambda x: -x[1])
-
-        # Get total and apply pagination
-        total = len(vendors_with_score)
-        paginated_vendors = [v for v, _ in vendors_with_score[skip : skip + limit]]
+    if q:
+        tsquery = search_query(q)
+        # Union of two lookups, each served by its own GIN index
+        matched = sa.union(
+            select(VP.id).where(vp_vector.op("@@")(tsquery)),
+            select(VP.id)
+            .join(User, col(VP.user_id) == col(User.id))
+            .where(user_vector.op("@@")(tsquery)),
+        )
+        stmt = stmt.where(col(VP.id).in_(matched))
+        relevance.append(
+            func.ts_rank(vp_vector, tsquery)
+            + func.coalesce(func.ts_rank(user_vector, tsquery), 0)
+        )
 
-        return paginated_vendors, total
+    if service_ids:
+        match_count = func.count(col(VSL.service_id))
+        stmt = stmt.join(
+            VSL,
+            and_(
+                col(VSL.vendor_profile_id) == col(VP.id),
+                col(VSL.service_id).in_(service_ids),
+            ),
+        ).group_by(*group_by)
+        relevance.append(sa.cast(match_count, sa.Float) / len(set(service_ids)))
 
-    # No service filter - just get all vendors (optionally filtered by location)
-    query = select(VendorProfile)
+    if relevance:
+        stmt = stmt.order_by(sum(relevance[1:], relevance[0]).desc())
+    stmt = stmt.order_by(col(VP.id))
 
-    if location:
-        query = query.join(User, col(VendorProfile.user_id) == col(User.id)).where(
-            func.lower(col(User.location)).contains(location.lower())
-        )
+    total_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
 
-    # Get total count
-    count_query = select(func.count()).select_from(VendorProfile)
-    if location:
-        count_query = count_query.join(
-            User, col(VendorProfile.user_id) == col(User.id)
-        ).where(func.lower(col(User.location)).contains(location.lower()))
+    return stmt, total_stmt
 
-    total = session.exec(count_query).one()
 
-    # Apply pagination
-    vendors = session.exec(query.offset(skip).limit(limit)).all()
+def search_vendors(
+    *,
+    session: Session,
+    service_ids: list[UUID] | None = None,
+    location: str | None = None,
+    location_fuzzy: bool = False,
+    company_name: str | None = None,
+    q: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> tuple[list[VendorProfile], int]:
+    """
+    Search for vendors by services, keywords, location and company name.
+    Returns vendors sorted by relevance.
+    """
+    stmt, total_stmt = search_vendors_stmt(
+        service_ids=service_ids,
+        location=location,
+        location_fuzzy=location_fuzzy,
+        company_name=company_name,
+        q=q,
+    )
 
-    return list(vendors), total
+    return fetch_page(
+        session=session,
+        stmt=stmt,
+        total_stmt=total_stmt,
+        model=VendorProfile,
+        skip=skip,
+        limit=limit,
+    )
 
 
 def enrich_vendor_profile_with_reviews(
@@ -267,3 +414,43 @@ def enrich_vendor_profile_with_reviews(
     vendor_public.reviewsCount = reviews_count
 
     return vendor_public
+
+
+def build_vendor_profiles_public(
+    *,
+    vendor_profiles: Sequence[VendorProfile],
+    stats: dict[UUID, tuple[float | None, int]],
+) -> list[VendorProfilePublic]:
+    """Convert loaded vendor profiles to VendorProfilePublic with preloaded rating stats"""
+    result = []
+    for vendor_profile in vendor_profiles:
+        vendor_public = VendorProfilePublic.model_validate(vendor_profile)
+        if vendor_profile.user_id:
+            vendor_public.rating, vendor_public.reviewsCount = stats[
+                vendor_profile.user_id
+            ]
+        result.append(vendor_public)
+    return result
+
+
+def enrich_vendor_profiles_with_reviews(
+    *, session: Session, vendor_profiles: Sequence[VendorProfile]
+) -> list[VendorProfilePublic]:
+    """Batched variant of enrich_vendor_profile_with_reviews for list endpoints"""
+    if not vendor_profiles:
+        return []
+
+    # Load user and services (with categories) for the whole page at once
+    session.exec(
+        select(VendorProfile)
+        .where(col(VendorProfile.id).in_([v.id for v in vendor_profiles]))
+        .options(*VENDOR_PROFILE_PUBLIC_OPTIONS)
+        .execution_options(populate_existing=True)
+    ).all()
+
+    stats = reviews_crud.get_rating_stats_for_users(
+        session=session,
+        user_ids=[v.user_id for v in vendor_profiles if v.user_id],
+    )
+
+    return build_vendor_profiles_public(vendor_profiles=vendor_profiles, stats=stats)
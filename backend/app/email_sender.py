@@ -0,0 +1,128 @@
+"""
+Background sender of the email outbox, run with `python -m app.email_sender`.
+
+The API only writes emails to the email_outbox table. The sender claims due
+emails in batches with FOR UPDATE SKIP LOCKED, so several senders may run at
+once, and delivers a batch over a single SMTP connection. Failed emails are
+retried with exponential backoff. Delivery is at least once: a sender killed
+mid-batch leaves the whole batch pending.
+"""
+
+import logging
+import smtplib
+import threading
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.crud import emails as emails_crud
+from app.models import EmailOutbox
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SMTP_TIMEOUT = 30
+
+
+def smtp_connect() -> smtplib.SMTP:
+    assert settings.SMTP_HOST, "no provided configuration for email variables"
+    smtp: smtplib.SMTP
+    if settings.SMTP_SSL:
+        smtp = smtplib.SMTP_SSL(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=SMTP_TIMEOUT
+        )
+    else:
+        smtp = smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=SMTP_TIMEOUT
+        )
+        if settings.SMTP_TLS:
+            smtp.starttls()
+    if settings.SMTP_USER and settings.SMTP_PASSWORD:
+        smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    return smtp
+
+
+def build_message(email: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = email.subject
+    message["From"] = formataddr(
+        (settings.EMAILS_FROM_NAME or "", settings.EMAILS_FROM_EMAIL or "")
+    )
+    message["To"] = email.email_to
+    message.set_content(email.html_content, subtype="html")
+    return message
+
+
+def send_batch(*, session: Session) -> int:
+    """Deliver one batch of due emails, returns the number of claimed emails"""
+    emails = emails_crud.claim_due_emails(
+        session=session, limit=settings.EMAIL_OUTBOX_BATCH_SIZE
+    )
+    if not emails:
+        session.commit()
+        return 0
+
+    try:
+        smtp = smtp_connect()
+    except (OSError, smtplib.SMTPException) as e:
+        logger.warning("SMTP connection failed: %r", e)
+        for email in emails:
+            emails_crud.mark_failed(session=session, email=email, error=repr(e))
+        session.commit()
+        return len(emails)
+
+    try:
+        for email in emails:
+            try:
+                smtp.send_message(build_message(email))
+            except (OSError, smtplib.SMTPException) as e:
+                logger.warning("Email %s to %s failed: %r", email.id, email.email_to, e)
+                emails_crud.mark_failed(session=session, email=email, error=repr(e))
+            else:
+                emails_crud.mark_sent(session=session, email=email)
+        session.commit()
+    finally:
+        smtp_quit(smtp)
+    return len(emails)
+
+
+def smtp_quit(smtp: smtplib.SMTP) -> None:
+    """
+    Close the connection once the batch is recorded. Unlike `with smtp`, an
+    error on QUIT is only logged: the emails were delivered and must not be
+    sent again.
+    """
+    try:
+        smtp.quit()
+    except (OSError, smtplib.SMTPException) as e:
+        logger.warning("SMTP QUIT failed: %r", e)
+        smtp.close()
+
+
+def run(stop: threading.Event | None = None) -> None:
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                claimed = send_batch(session=session)
+        except Exception:
+            logger.exception("Email outbox batch failed")
+            claimed = 0
+        # A full batch means more emails are probably due
+        if claimed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            stop.wait(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+def main() -> None:
+    if not settings.emails_enabled:
+        logger.warning("Emails are disabled, SMTP_HOST and EMAILS_FROM_EMAIL unset")
+        return
+    logger.info("Starting email outbox sender")
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,24 @@
+import hashlib
 import os
-import uuid
+import tempfile
+from collections.abc import Mapping
 
+import anyio
 from fastapi import HTTPException, UploadFile
-from pathvalidate import sanitize_filename
 
 MAX_FILE_SIZE = 2 * 1024 * 1024
 ALLOWED_MIME = {"image/png", "image/jpeg"}
+CHUNK_SIZE = 64 * 1024
+
+# Magic bytes of allowed images and the extension they are saved with
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpg",
+}
 
 
 def validate_image(file: UploadFile):
-    """Check MIME and size."""
+    """Early check of the declared MIME and size, receive_image() enforces both."""
     if file.content_type not in ALLOWED_MIME:
         raise HTTPException(400, "Only PNG or JPEG files are allowed")
 
@@ -18,20 +27,72 @@ def validate_image(file: UploadFile):
         raise HTTPException(413, "File too large (max 2MB)")
 
 
-def generate_avatar_filename(full_name: str, company: str, ext: str) -> str:
-    raw = f"{full_name}-{company}"
-    safe = sanitize_filename(raw).replace(" ", "_")
-    return f"{safe}_{uuid.uuid4()}.{ext}"
+def content_filename(digest: str, ext: str) -> str:
+    """Name of a stored file by the hash of its content, it never changes"""
+    return f"{digest}.{ext}"
 
 
 def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
 
-async def save_file(path: str, file: UploadFile):
-    contents = await file.read()
-    with open(path, "wb") as f:
-        f.write(contents)
+def sniff_image(head: bytes) -> str | None:
+    """Extension of the image by its magic bytes, None for other files"""
+    for signature, ext in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+async def receive_image(file: UploadFile, directory: str) -> tuple[str, str, str]:
+    """
+    Stream an uploaded image into a temporary file in directory, chunk by
+    chunk, enforcing MAX_FILE_SIZE on the received bytes.
+    Returns the temporary file path, the extension of the real image type
+    and the sha256 hex digest of the content.
+    """
+    fd, tmp_path = await anyio.to_thread.run_sync(
+        lambda: tempfile.mkstemp(dir=directory, prefix=".upload-")
+    )
+    try:
+        async with await anyio.open_file(fd, "wb") as out:
+            ext = None
+            size = 0
+            digest = hashlib.sha256()
+            while chunk := await file.read(CHUNK_SIZE):
+                if ext is None:
+                    ext = sniff_image(chunk)
+                    if ext is None:
+                        raise HTTPException(400, "Only PNG or JPEG files are allowed")
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(413, "File too large (max 2MB)")
+                digest.update(chunk)
+                await out.write(chunk)
+        if ext is None:
+            raise HTTPException(400, "Only PNG or JPEG files are allowed")
+    except BaseException:
+        await anyio.to_thread.run_sync(delete_file_if_exists, tmp_path)
+        raise
+    return tmp_path, ext, digest.hexdigest()
+
+
+async def move_file(src: str, dst: str):
+    """Atomic rename, src and dst must be on the same filesystem"""
+    await anyio.to_thread.run_sync(os.replace, src, dst)
+
+
+def touch_files(paths: list[str]) -> bool:
+    """
+    Refresh the modification time of existing files, so media_gc keeps them
+    for another grace period. Returns False if any of the files is missing.
+    """
+    try:
+        for path in paths:
+            os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
 
 
 def delete_file_if_exists(path: str | None):
@@ -44,6 +105,16 @@ def delete_file_if_exists(path: str | None):
             pass
 
 
+def avatar_urls(
+    logo_url: str | None, logo_variants: Mapping[str, Mapping[str, str]] | None
+) -> list[str]:
+    """URLs of the avatar and all of its thumbnails"""
+    urls = [logo_url] if logo_url else []
+    for sizes in (logo_variants or {}).values():
+        urls.extend(sizes.values())
+    return urls
+
+
 def avatar_url_to_path(url: str | None, media_root: str) -> str | None:
     if not url:
         return None
@@ -0,0 +1,93 @@
+"""
+Pre-sized variants of uploaded avatars and logos.
+
+Decoding and resizing are CPU-bound and Pillow holds the GIL for part of the
+work, so thumbnails are made in a process pool instead of the request thread.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+# Square sizes in pixels, the image is center-cropped to fill them
+THUMBNAIL_SIZES = (64, 128, 256)
+# Extension of the variant -> Pillow format
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+THUMBNAIL_QUALITY = 80
+# A 2MB upload may still decode into a huge bitmap, refuse such images
+MAX_IMAGE_PIXELS = 40_000_000
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def thumbnail_names(stem: str) -> dict[str, dict[str, str]]:
+    """File names of the thumbnails of stem as {format: {size: name}}"""
+    return {
+        ext: {str(size): f"{stem}_{size}.{ext}" for size in THUMBNAIL_SIZES}
+        for ext in THUMBNAIL_FORMATS
+    }
+
+
+def make_thumbnails(src: str, directory: str, stem: str) -> dict[str, dict[str, str]]:
+    """
+    Save the thumbnails of the image src into directory.
+    Returns file names as in thumbnail_names(), raises ValueError for
+    files Pillow can not decode.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    variants = thumbnail_names(stem)
+    try:
+        with Image.open(src) as original:
+            image = ImageOps.exif_transpose(original).convert("RGBA")
+            for size in THUMBNAIL_SIZES:
+                thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                # JPEG has no alpha channel, transparent logos go on white
+                flat = Image.new("RGB", thumb.size, "white")
+                flat.paste(thumb, mask=thumb.getchannel("A"))
+                for ext, fmt in THUMBNAIL_FORMATS.items():
+                    out = thumb if fmt == "WEBP" else flat
+                    _save(out, os.path.join(directory, variants[ext][str(size)]), fmt)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Invalid image: {e}") from e
+    return variants
+
+
+def _save(image: Image.Image, path: str, fmt: str) -> None:
+    """
+    Write through a temporary file, so concurrent uploads of the same image
+    and nginx never see a partial file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".thumb-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            image.save(out, fmt, quality=THUMBNAIL_QUALITY)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process pool of the worker, started on the first upload"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            # Forking a process running the event loop and DB pools is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def make_thumbnails_async(
+    src: str, directory: str, stem: str
+) -> dict[str, dict[str, str]]:
+    return await asyncio.wrap_future(
+        get_executor().submit(make_thumbnails, src, directory, stem)
+    )
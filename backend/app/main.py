@@ -1,3 +1,6 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -6,7 +9,10 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core.catalog import service_catalog
 from app.core.config import settings
+from app.core.queries import QueryStatsMiddleware
+from app.utils import load_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -22,14 +28,27 @@ if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
 docs_url = "/docs" if settings.ENVIRONMENT == "local" else None
 redoc_url = "/redoc" if settings.ENVIRONMENT == "local" else None
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Loaded before serving, then reloaded when another worker changes it
+    service_catalog.reload()
+    service_catalog.start_listener()
+    yield
+    service_catalog.stop_listener()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=docs_url,
     redoc_url=redoc_url,
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+load_email_templates()
+
 app.mount(
     settings.STATIC_PATH,
     StaticFiles(directory=settings.STATIC_ROOT),
@@ -46,6 +65,11 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+# Query count and DB time per request, see app.core.queries
+app.add_middleware(
+    QueryStatsMiddleware, server_timing=settings.ENVIRONMENT != "production"
+)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 # Set up Prometheus metrics
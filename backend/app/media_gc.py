@@ -0,0 +1,115 @@
+"""
+Garbage collector of media files, run with `python -m app.media_gc`.
+
+Uploaded files are named by the hash of their content and shared by every
+user uploading the same image, so the API never deletes them. The collector
+periodically deletes files under MEDIA_ROOT that no user references, in
+batches. Files modified within MEDIA_GC_GRACE_SECONDS are kept: their upload
+may not be committed yet, and uploads reusing a file touch it.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.crud import users as users_crud
+from app.file_utils import avatar_url_to_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pause between two batches, to leave disk IO to nginx
+BATCH_PAUSE_SECONDS = 1.0
+
+
+def referenced_paths(*, session: Session, media_root: str) -> set[str]:
+    paths = set()
+    for url in users_crud.get_media_urls(session=session):
+        path = avatar_url_to_path(url, media_root)
+        if path:
+            paths.add(os.path.normpath(path))
+    return paths
+
+
+def find_orphans(
+    *, media_root: str, referenced: set[str], older_than: float
+) -> Iterator[str]:
+    """Unreferenced files under media_root last modified before older_than"""
+    for directory, _, filenames in os.walk(media_root):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename))
+            if path in referenced:
+                continue
+            try:
+                if os.stat(path).st_mtime < older_than:
+                    yield path
+            except FileNotFoundError:
+                pass
+
+
+def delete_orphans(paths: list[str], *, older_than: float) -> int:
+    deleted = 0
+    for path in paths:
+        try:
+            # Checked again, the file may have been reused since the scan
+            if os.stat(path).st_mtime < older_than:
+                os.remove(path)
+                deleted += 1
+        except FileNotFoundError:
+            pass
+    return deleted
+
+
+def collect(
+    *, session: Session, media_root: str, stop: threading.Event | None = None
+) -> int:
+    """Delete unreferenced media files, returns the number of deleted files"""
+    stop = stop or threading.Event()
+    older_than = time.time() - settings.MEDIA_GC_GRACE_SECONDS
+    # References are read before the scan, files uploaded after it are
+    # newer than older_than
+    referenced = referenced_paths(session=session, media_root=media_root)
+    session.commit()
+
+    deleted = 0
+    batch: list[str] = []
+    for path in find_orphans(
+        media_root=media_root, referenced=referenced, older_than=older_than
+    ):
+        batch.append(path)
+        if len(batch) >= settings.MEDIA_GC_BATCH_SIZE:
+            deleted += delete_orphans(batch, older_than=older_than)
+            batch = []
+            if stop.wait(BATCH_PAUSE_SECONDS):
+                return deleted
+    deleted += delete_orphans(batch, older_than=older_than)
+    return deleted
+
+
+def run(stop: threading.Event | None = None) -> None:
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                deleted = collect(
+                    session=session, media_root=settings.MEDIA_ROOT, stop=stop
+                )
+            logger.info("Deleted %s unreferenced media files", deleted)
+        except Exception:
+            logger.exception("Media garbage collection failed")
+        stop.wait(settings.MEDIA_GC_INTERVAL_SECONDS)
+
+
+def main() -> None:
+    logger.info("Starting media garbage collector")
+    run()
+
+
+if __name__ == "__main__":
+    main()
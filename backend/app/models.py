@@ -1,11 +1,11 @@
 import datetime as dt
 import enum
 import uuid
-from typing import Any, Optional
+from typing import Annotated, Any, Optional
 
 import sqlalchemy as sa
 from pydantic import EmailStr
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Column, Enum, Field, Relationship, SQLModel
 
 from .m2m_models import ProjectServiceLink, VendorServiceLink
@@ -28,14 +28,61 @@ class RequestStatus(str, enum.Enum):
     declined = "declined"
 
 
+class EmailStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+
 class RequestInitiator(str, enum.Enum):
     company = "company"
     vendor = "vendor"
 
 
+# Catalog and seed data are bilingual: every text is indexed with both configs
+SEARCH_CONFIGS = ("russian", "english")
+
+
+def search_vector_sql(*weighted_columns: tuple[str, str]) -> str:
+    """Expression for a generated tsvector column from (column, weight) pairs"""
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+        for config in SEARCH_CONFIGS
+    )
+
+
+def search_vector_column(*weighted_columns: tuple[str, str]) -> Column:  # type: ignore[type-arg]
+    return sa.Column(
+        TSVECTOR,
+        sa.Computed(search_vector_sql(*weighted_columns), persisted=True),
+    )
+
+
+def trigram_index(name: str, column: str) -> sa.Index:
+    """pg_trgm GIN index on lower(column), serves LIKE '%x%' and similarity"""
+    label = f"{column}_lower"
+    return sa.Index(
+        name,
+        sa.func.lower(sa.column(column)).label(label),
+        postgresql_using="gin",
+        postgresql_ops={label: "gin_trgm_ops"},
+    )
+
+
+# Emails of public models, read back from the database after EmailStr
+# validated them on write. Checking them again costs more than the rest of
+# the model, email_validator normalizes the domain on every call.
+StoredEmail = Annotated[
+    str, Field(schema_extra={"json_schema_extra": {"format": "email"}})
+]
+
+
 class PaginatedResponse(SQLModel):
     result: list[Any]
     total: int
+    # Opaque keyset cursor for the next page, None on the last page
+    next_cursor: str | None = None
 
 
 class UserBaseRequired(SQLModel):
@@ -85,8 +132,32 @@ class UpdatePassword(SQLModel):
 
 
 class User(UserBase, table=True):
+    __table_args__ = (
+        sa.Index("ix_user_created_at_id", "created_at", "id"),
+        sa.Index("ix_user_search_vector", "search_vector", postgresql_using="gin"),
+        trigram_index("ix_user_location_trgm", "location"),
+        trigram_index("ix_user_company_name_trgm", "company_name"),
+    )
+    # Generated column used only in SQL, not loaded with the entity
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.UTC))
+    # Bumped by every UPDATE of the row, a version for ETags (app.api.etag)
+    updated_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.UTC),
+        sa_column_kwargs={
+            "onupdate": lambda: dt.datetime.now(dt.UTC),
+        },
+    )
+    search_vector: str | None = Field(
+        default=None, sa_column=search_vector_column(("company_name", "A"))
+    )
+    # Thumbnail URLs of logo_url as {format: {size: url}}, see app.images
+    logo_variants: dict[str, dict[str, str]] | None = Field(
+        default=None, sa_column=sa.Column(JSONB, nullable=True)
+    )
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
     vendor_profile: Optional["VendorProfile"] = Relationship(
         back_populates="user"
@@ -96,6 +167,8 @@ class User(UserBase, table=True):
 
 class UserPublicShort(UserBasePublic):
     id: uuid.UUID
+    email: StoredEmail = Field(max_length=255)
+    logo_variants: dict[str, dict[str, str]] | None = None
 
 
 class UserPublic(UserPublicShort):
@@ -112,6 +185,7 @@ class UserMePublic(UserPublic):
 class UsersPublic(SQLModel):
     data: list[UserPublic]
     count: int
+    next_cursor: str | None = None
 
 
 class VendorProfileBase(SQLModel):
@@ -127,10 +201,29 @@ class VendorProfileCreate(VendorProfileBase):
 
 
 class VendorProfile(VendorProfileBase, table=True):
+    __table_args__ = (
+        sa.Index(
+            "ix_vendorprofile_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
+    # Generated column used only in SQL, not loaded with the entity
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    search_vector: str | None = Field(
+        default=None,
+        sa_column=search_vector_column(("main_goal", "A"), ("description", "B")),
+    )
     user_id: uuid.UUID = Field(
         foreign_key="user.id", unique=True, ondelete="SET NULL", nullable=True
     )
+    # Bumped by every UPDATE of the row, a version for ETags (app.api.etag)
+    updated_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.UTC),
+        sa_column_kwargs={
+            "onupdate": lambda: dt.datetime.now(dt.UTC),
+        },
+    )
     user: User | None = Relationship(back_populates="vendor_profile")
     services: list["Service"] = Relationship(
         back_populates="vendors", link_model=VendorServiceLink
@@ -141,6 +234,7 @@ class VendorProfile(VendorProfileBase, table=True):
 
 class VendorProfilePublic(VendorProfileBase):
     id: uuid.UUID
+    sales_email: StoredEmail
     user: UserPublicShort | None
     services: list["ServicePublic"]
     rating: float | None = None
@@ -275,11 +369,20 @@ class ProjectBase(SQLModel):
 
 
 class Project(ProjectBase, table=True):
+    __table_args__ = (sa.Index("ix_project_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", ondelete="SET NULL", nullable=True
     )
     is_archived: bool = Field(default=False)
+    # Bumped by every UPDATE of the row, a version for ETags (app.api.etag)
+    updated_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.UTC),
+        sa_column_kwargs={
+            "onupdate": lambda: dt.datetime.now(dt.UTC),
+        },
+    )
     owner: User | None = Relationship(back_populates="projects")
     services: list[Service] = Relationship(
         back_populates="projects", link_model=ProjectServiceLink
@@ -335,6 +438,22 @@ class ProjectRequestBase(SQLModel):
 
 
 class ProjectRequest(ProjectRequestBase, table=True):
+    # Keyset pagination of request lists, see app/crud/pagination.py
+    __table_args__ = (
+        sa.Index(
+            "ix_projectrequest_project_id_created_at_id",
+            "project_id",
+            "created_at",
+            "id",
+        ),
+        sa.Index(
+            "ix_projectrequest_vendor_profile_id_created_at_id",
+            "vendor_profile_id",
+            "created_at",
+            "id",
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     vendor_profile_id: uuid.UUID | None = Field(
         foreign_key="vendorprofile.id", ondelete="SET NULL", nullable=True
@@ -393,6 +512,10 @@ class PlatformFeedbackBase(SQLModel):
 
 
 class PlatformFeedback(PlatformFeedbackBase, table=True):
+    __table_args__ = (
+        sa.Index("ix_platformfeedback_created_at_id", "created_at", "id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(
         foreign_key="user.id", ondelete="CASCADE", nullable=False
@@ -418,6 +541,21 @@ class Token(SQLModel):
 
 class TokenPayload(SQLModel):
     sub: str | None = None
+    iat: int | None = None
+    role: UserRole | None = None
+    vendor_profile_id: uuid.UUID | None = None
+    is_active: bool | None = None
+    is_superuser: bool | None = None
+
+
+class Principal(SQLModel):
+    """Authorization facts about the current user, without the user row"""
+
+    id: uuid.UUID
+    role: UserRole
+    is_active: bool
+    is_superuser: bool = False
+    vendor_profile_id: uuid.UUID | None = None
 
 
 class NewPassword(SQLModel):
@@ -432,6 +570,16 @@ class ReviewBase(SQLModel):
 
 
 class Review(ReviewBase, table=True):
+    __table_args__ = (
+        sa.Index(
+            "ix_review_reviewed_user_id_created_at_id",
+            "reviewed_user_id",
+            "created_at",
+            "id",
+        ),
+        sa.Index("ix_review_author_id_created_at_id", "author_id", "created_at", "id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     reviewed_user_id: uuid.UUID = Field(
         foreign_key="user.id", ondelete="CASCADE", nullable=False
@@ -450,6 +598,19 @@ class Review(ReviewBase, table=True):
     )
 
 
+class UserRatingSummary(SQLModel, table=True):
+    """Denormalized review aggregates, maintained on review writes"""
+
+    __tablename__ = "user_rating_summary"
+
+    reviewed_user_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    rating_sum: int = Field(default=0)
+    rating_count: int = Field(default=0)
+    rating_avg: float | None = Field(default=None, index=True)
+
+
 class ReviewCreate(SQLModel):
     reviewed_user_id: uuid.UUID
     rating: int = Field(ge=1, le=5)
@@ -471,3 +632,30 @@ class PaginatedReviewsPublic(PaginatedResponse):
 
 class PaginatedPlatformFeedbackPublic(PaginatedResponse):
     result: list[PlatformFeedbackPublic]
+
+
+class EmailOutbox(SQLModel, table=True):
+    """Emails written in the request path and delivered by app.email_sender"""
+
+    __tablename__ = "email_outbox"
+    # Only pending rows are polled, delivered ones stay for the record
+    __table_args__ = (
+        sa.Index(
+            "ix_email_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=sa.text("status = 'pending'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str = Field(sa_type=sa.Text)
+    html_content: str = Field(sa_type=sa.Text)
+    status: EmailStatus = Field(default=EmailStatus.pending)
+    attempts: int = Field(default=0)
+    last_error: str | None = Field(default=None, sa_type=sa.Text)
+    created_at: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.UTC))
+    next_attempt_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.UTC)
+    )
+    sent_at: dt.datetime | None = None
@@ -10,6 +10,7 @@ import uuid
 from sqlmodel import Session, select
 
 from app.core.db import engine
+from app.crud import services as services_crud
 from app.models import Category, Service
 
 # Define all categories and their services
@@ -210,8 +211,8 @@ def add_services(*, yes: bool = False) -> None:
                 else:
                     print(f"    ℹ️  Service already exists: {service_name}")  # noqa: T201
 
-        # Commit all changes
-        session.commit()
+        # Commit all changes, running workers reload their catalog
+        services_crud.commit_catalog(session=session)
 
         print("\n" + "=" * 60)  # noqa: T201
         print("✨ Successfully added:")  # noqa: T201
@@ -0,0 +1,26 @@
+"""
+Script to rebuild the denormalized user_rating_summary table from reviews.
+Use it to repair summaries after manual data changes.
+Run with: uv run python -m app.scripts.rebuild_rating_summary
+"""
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.crud import reviews as reviews_crud
+
+
+def rebuild_rating_summary() -> None:
+    with Session(engine) as session:
+        rows = reviews_crud.rebuild_rating_summaries(session=session)
+    print(f"✨ Rebuilt rating summaries for {rows} users")  # noqa: T201
+
+
+def main() -> None:
+    """Main entry point."""
+    print("🔄 Rebuilding user rating summaries...")  # noqa: T201
+    rebuild_rating_summary()
+
+
+if __name__ == "__main__":
+    main()
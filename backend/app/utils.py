@@ -1,12 +1,12 @@
 import logging
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
@@ -22,37 +22,40 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+email_templates = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+    # Compiled templates are shared by worker processes and restarts
+    bytecode_cache=FileSystemBytecodeCache(),
+    # Built templates only change with a deploy, skip the mtime check
+    auto_reload=False,
+)
+
+
+def load_email_templates() -> None:
+    """Compile all email templates once, at startup"""
+    for name in email_templates.list_templates(extensions=["html"]):
+        email_templates.get_template(name)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
-    return html_content
+    return email_templates.get_template(template_name).render(context)
 
 
-def send_email(
+def render_email_templates(
     *,
-    email_to: str,
-    subject: str = "",
-    html_content: str = "",
-) -> None:
-    assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    template_name: str,
+    contexts: Iterable[Mapping[str, Any]],
+    common: Mapping[str, Any] | None = None,
+) -> Iterator[str]:
+    """
+    Render a template for each context, e.g. for digests to many users.
+    `common` holds the variables shared by all emails.
+    """
+    template = email_templates.get_template(template_name)
+    for context in contexts:
+        yield template.render(common or {}, **context)
 
 
 def generate_test_email(email_to: str) -> EmailData:
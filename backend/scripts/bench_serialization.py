@@ -0,0 +1,170 @@
+"""
+Micro-benchmark of project list responses, per item of a
+PaginatedProjectsPublic page. No database needed, the projects are built
+in memory:
+  python scripts/bench_serialization.py [--items 50] [--repeat 100]
+
+Building the page from rows:
+- before: set_owner_rating() validated the owner a second time
+- after: the rating is set on the owner validated with the project
+Before app.models.StoredEmail, the emails of every user and vendor profile
+were also checked by email_validator again, on a previous commit both
+numbers are about 5 times higher.
+
+Serializing the page:
+- fastapi: the handler returns a dict of models, FastAPI validates it
+  against response_model, dumps it to Python objects and encodes those
+  with the json module (the routes before app.api.serialization)
+- orjson: model_dump() of the page, then orjson
+- model_response: app.api.serialization, pydantic-core writes the JSON
+"""
+
+import argparse
+import datetime as dt
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from app.api.routes.vendors import set_owner_rating
+from app.api.serialization import model_response, page
+from app.models import (
+    Category,
+    PaginatedProjectsPublic,
+    Project,
+    ProjectPublic,
+    ProjectStart,
+    Service,
+    User,
+    UserPublic,
+    UserRole,
+    VendorProfile,
+)
+
+
+def make_user(role: UserRole) -> User:
+    return User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex}@example.com",
+        hashed_password="x",
+        company_name="Company",
+        location="Moscow, Russia",
+        role=role,
+        full_name="Full Name",
+        logo_url="https://media.example.com/media/avatar/logo.png",
+        logo_variants={
+            "webp": {"64": "https://media.example.com/media/avatar/logo_64.webp"}
+        },
+    )
+
+
+def make_projects(count: int) -> list[Project]:
+    category = Category(id=uuid.uuid4(), label="Development")
+    services = [
+        Service(id=uuid.uuid4(), label=f"Service {i}", category=category)
+        for i in range(10)
+    ]
+    vendor_user = make_user(UserRole.vendor)
+    vendor = VendorProfile(
+        id=uuid.uuid4(),
+        main_goal="Goal",
+        sales_email="sales@example.com",
+        description="Description " * 20,
+        min_project_size=1000.0,
+        user=vendor_user,
+        services=services[:5],
+    )
+    return [
+        Project(
+            id=uuid.uuid4(),
+            title=f"Project {i}",
+            description="Description " * 20,
+            start_date=ProjectStart.within_30_days,
+            budget=100000.0,
+            questions=["Question?"] * 3,
+            requirements=[{"group": "Team", "requirement": "Text", "priority": 3}],
+            created_at=dt.datetime.now(dt.UTC),
+            owner=make_user(UserRole.company),
+            services=services[i % 5 : i % 5 + 3],
+            vendor_profile=vendor,
+        )
+        for i in range(count)
+    ]
+
+
+def build_page(projects: list[Project]) -> list[ProjectPublic]:
+    stats = {p.owner.id: (4.5, 10) for p in projects if p.owner}
+    result = []
+    for project in projects:
+        project_public = ProjectPublic.model_validate(project)
+        set_owner_rating(project_public=project_public, project=project, stats=stats)
+        result.append(project_public)
+    return result
+
+
+def build_page_before(projects: list[Project]) -> list[ProjectPublic]:
+    """set_owner_rating() used to validate the owner a second time"""
+    result = []
+    for project in projects:
+        project_public = ProjectPublic.model_validate(project)
+        owner = UserPublic.model_validate(project.owner)
+        owner.rating, owner.ratingCount = 4.5, 10
+        project_public.owner = owner
+        result.append(project_public)
+    return result
+
+
+def bench(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    import orjson
+
+    projects = make_projects(args.items)
+    field = create_model_field(name="Response", type_=PaginatedProjectsPublic)
+    result = build_page(projects)
+    value = page(PaginatedProjectsPublic, result, total=len(result))
+
+    def fastapi() -> bytes:
+        content = {"result": result, "total": len(result)}
+        # What fastapi.routing.serialize_response() does with pydantic 2
+        validated, errors = field.validate(content, {}, loc=("response",))
+        assert not errors
+        return JSONResponse(field.serialize(validated, by_alias=True)).body
+
+    def with_orjson() -> bytes:
+        return orjson.dumps(value.model_dump(mode="json"))
+
+    def with_model_response() -> bytes:
+        return model_response(PaginatedProjectsPublic, value).body
+
+    assert orjson.loads(fastapi()) == orjson.loads(with_model_response())
+
+    def per_item(fn: Callable[[], Any]) -> str:
+        return f"{bench(fn, args.repeat) / args.items * 1e6:8.1f}"
+
+    print(f"{args.items} projects per page, microseconds per item")
+    print("build the page from rows")
+    print(f"{'before':>16}: {per_item(lambda: build_page_before(projects))}")
+    print(f"{'after':>16}: {per_item(lambda: build_page(projects))}")
+    print("serialize the page")
+    print(f"{'fastapi':>16}: {per_item(fastapi)}")
+    print(f"{'orjson':>16}: {per_item(with_orjson)}")
+    print(f"{'model_response':>16}: {per_item(with_model_response)}")
+
+
+if __name__ == "__main__":
+    main()
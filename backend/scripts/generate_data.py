@@ -0,0 +1,511 @@
+"""
+Synthetic data at production scale, bulk loaded with COPY.
+
+  python scripts/generate_data.py [--scale 1.0] [--seed 42]
+  python scripts/generate_data.py --users 20000 --vendors 5000 --projects 10000
+
+Defaults (--scale 1): 200k users, 50k of them vendors with a profile and 5-10
+services, 100k projects with JSONB questions and requirements, 1M project
+requests and 100k reviews, then the rating summaries. Rows are added to the
+existing data: emails are unique per run, every account has the password
+Password123!.
+
+The data is skewed like production:
+- services, vendors receiving requests and companies owning projects have
+  Zipf-like popularity, a few of each account for most of the rows
+- requests per project follow a Pareto distribution: many projects get none
+  or a few, some get hundreds
+- a handful of cities hold most accounts, activity grows towards today
+- a project gets an executor (its accepted request) once it has requests,
+  most executed projects are archived; reviews come from executed projects
+
+Rows are generated in Python and streamed to COPY ... FROM STDIN in a single
+transaction, then the tables are analyzed. --seed makes the distribution
+reproducible, ids and emails are new on every run. The service catalog comes
+from app.scripts.add_services when the database has none.
+"""
+
+import argparse
+import datetime as dt
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import psycopg
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.crud import reviews as reviews_crud
+from app.models import ProjectStart, RequestInitiator, RequestStatus, Service, UserRole
+from app.scripts.add_services import add_services
+
+PASSWORD = "Password123!"
+NOW = dt.datetime.now(dt.UTC)
+HISTORY = dt.timedelta(days=3 * 365)
+
+# Share of accounts per city
+CITIES = {
+    "Москва": 38,
+    "Санкт-Петербург": 17,
+    "Новосибирск": 6,
+    "Екатеринбург": 6,
+    "Казань": 5,
+    "Нижний Новгород": 4,
+    "Краснодар": 4,
+    "Самара": 3,
+    "Ростов-на-Дону": 3,
+    "Пермь": 2,
+    "Воронеж": 2,
+    "Remote": 10,
+}
+NAME_PARTS = (
+    "Tech Soft Data Cloud Digital Smart Pro Lab Group Systems Solutions Studio "
+    "Consulting Media Logic Vision Core Net Line Point Craft Stream Bridge Max"
+).split()
+FIRST_NAMES = (
+    "Алексей Мария Дмитрий Екатерина Игорь Анна Сергей Наталья Владимир Ольга "
+    "Павел Инна Роман Елена Андрей Татьяна"
+).split()
+LAST_NAMES = (
+    "Воронов Козлова Новиков Смирнова Петров Федорова Кузнецов Орлова Захаров "
+    "Морозова Соколов Белова Николаев Иванова"
+).split()
+WORDS = (
+    "разработка веб-платформа мобильное приложение интеграция аналитика дизайн "
+    "автоматизация e-commerce CRM ERP API облако безопасность маркетинг "
+    "поддержка MVP highload B2B SaaS финтех ритейл логистика медицина "
+    "микросервисы Python React Kubernetes 1С данные ML дашборды SEO UX"
+).split()
+REQUIREMENT_GROUPS = ("Команда", "Технологии", "Сроки", "Опыт", "Безопасность")
+RATINGS = {5: 50, 4: 28, 3: 10, 2: 5, 1: 7}
+
+
+@dataclass
+class Sizes:
+    users: int = 200_000
+    vendors: int = 50_000
+    projects: int = 100_000
+    requests: int = 1_000_000
+    reviews: int = 100_000
+
+    def scaled(self, scale: float) -> "Sizes":
+        return Sizes(
+            *(max(1, round(getattr(self, f) * scale)) for f in self.__annotations__)
+        )
+
+
+@dataclass
+class PlannedProject:
+    id: uuid.UUID
+    owner: int
+    created_at: dt.datetime
+    vendors: list[int]
+    # Index in vendors of the executor, its request is accepted
+    executor: int | None
+    archived: bool
+
+
+@dataclass
+class Generator:
+    sizes: Sizes
+    rng: random.Random
+    services: list[uuid.UUID]
+    hashed_password: str = field(default_factory=lambda: get_password_hash(PASSWORD))
+    run: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    company_ids: list[uuid.UUID] = field(default_factory=list)
+    company_created: list[dt.datetime] = field(default_factory=list)
+    vendor_user_ids: list[uuid.UUID] = field(default_factory=list)
+    vendor_ids: list[uuid.UUID] = field(default_factory=list)
+    projects: list[PlannedProject] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.companies = self.sizes.users - self.sizes.vendors
+        self.service_weights = zipf_cum_weights(len(self.services), 1.0)
+        self.vendor_weights = zipf_cum_weights(self.sizes.vendors, 0.8)
+        self.company_weights = zipf_cum_weights(self.companies, 0.7)
+        self.city_weights = list(itertools.accumulate(CITIES.values()))
+        self.rating_weights = list(itertools.accumulate(RATINGS.values()))
+
+    # Random values
+
+    def since(
+        self, start: dt.datetime, within: dt.timedelta | None = None
+    ) -> dt.datetime:
+        """Time after start, more likely recent"""
+        span = NOW - start if within is None else min(within, NOW - start)
+        return start + span * math.sqrt(self.rng.random())
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def distinct(self, cum_weights: list[float], count: int) -> list[int]:
+        """count distinct indexes drawn with the given weights"""
+        count = min(count, len(cum_weights) // 2)
+        chosen: dict[int, None] = {}
+        while len(chosen) < count:
+            for i in self.rng.choices(
+                range(len(cum_weights)), cum_weights=cum_weights, k=count - len(chosen)
+            ):
+                chosen[i] = None
+        return list(chosen)
+
+    # Rows, in the column order of the COPY statements below
+
+    def users(self, role: UserRole, count: int) -> Iterator[tuple[Any, ...]]:
+        cities = list(CITIES)
+        for n in range(count):
+            id = uuid.uuid4()
+            created_at = self.since(NOW - HISTORY)
+            if role == UserRole.company:
+                self.company_ids.append(id)
+                self.company_created.append(created_at)
+            else:
+                self.vendor_user_ids.append(id)
+            company = " ".join(self.rng.sample(NAME_PARTS, 2))
+            yield (
+                id,
+                f"gen-{self.run}-{role.value}-{n}@example.com",
+                self.hashed_password,
+                f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                f"{company} {n}",
+                self.rng.choices(cities, cum_weights=self.city_weights)[0],
+                role.value,
+                True,
+                False,
+                created_at,
+                created_at,
+            )
+
+    def vendor_profiles(self) -> Iterator[tuple[Any, ...]]:
+        for n, user_id in enumerate(self.vendor_user_ids):
+            id = uuid.uuid4()
+            self.vendor_ids.append(id)
+            yield (
+                id,
+                user_id,
+                self.text(12),
+                f"sales-{self.run}-{n}@example.com",
+                None,
+                self.text(self.rng.randint(20, 80)),
+                float(self.rng.choice((50, 100, 300, 500, 1000, 5000)) * 1000),
+                NOW,
+            )
+
+    def vendor_services(self) -> Iterator[tuple[Any, ...]]:
+        for vendor_id in self.vendor_ids:
+            for i in self.distinct(self.service_weights, self.rng.randint(5, 10)):
+                yield vendor_id, self.services[i]
+
+    def plan_projects(self) -> None:
+        """Owners, requesting vendors and executors of all projects"""
+        # Pareto weights scaled to the number of requests
+        weights = [self.rng.paretovariate(1.2) for _ in range(self.sizes.projects)]
+        scale = self.sizes.requests / sum(weights)
+        max_requests = min(500, self.sizes.vendors // 2)
+        for weight in weights:
+            owner = self.rng.choices(
+                range(self.companies), cum_weights=self.company_weights
+            )[0]
+            vendors = self.distinct(
+                self.vendor_weights, min(max_requests, round(weight * scale))
+            )
+            executor = None
+            if vendors and self.rng.random() < 0.4:
+                executor = self.rng.randrange(len(vendors))
+            self.projects.append(
+                PlannedProject(
+                    id=uuid.uuid4(),
+                    owner=owner,
+                    created_at=self.since(self.company_created[owner]),
+                    vendors=vendors,
+                    executor=executor,
+                    archived=self.rng.random() < (0.7 if executor is not None else 0.1),
+                )
+            )
+
+    def project_rows(self) -> Iterator[tuple[Any, ...]]:
+        starts = [s.value for s in ProjectStart]
+        for p in self.projects:
+            requirements = [
+                {
+                    "group": self.rng.choice(REQUIREMENT_GROUPS),
+                    "requirement": self.text(6),
+                    "priority": self.rng.randint(1, 5),
+                }
+                for _ in range(self.rng.randint(0, 6))
+            ]
+            questions = [f"{self.text(5)}?" for _ in range(self.rng.randint(0, 3))]
+            yield (
+                p.id,
+                self.company_ids[p.owner],
+                self.text(self.rng.randint(3, 8)),
+                self.text(self.rng.randint(30, 120)),
+                self.rng.choice(starts),
+                self.rng.choices(list(CITIES), cum_weights=self.city_weights)[0],
+                float(round(self.rng.lognormvariate(13, 1.2), -3)),
+                json.dumps(questions, ensure_ascii=False),
+                json.dumps(requirements, ensure_ascii=False),
+                p.created_at,
+                p.created_at,
+                p.archived,
+                None if p.executor is None else self.vendor_ids[p.vendors[p.executor]],
+            )
+
+    def project_services(self) -> Iterator[tuple[Any, ...]]:
+        for p in self.projects:
+            for i in self.distinct(self.service_weights, self.rng.randint(1, 5)):
+                yield p.id, self.services[i]
+
+    def requests(self) -> Iterator[tuple[Any, ...]]:
+        for p in self.projects:
+            for n, vendor in enumerate(p.vendors):
+                if n == p.executor:
+                    status = RequestStatus.accepted
+                elif p.executor is not None or p.archived:
+                    status = self.rng.choice(
+                        (RequestStatus.declined, RequestStatus.sent)
+                    )
+                else:
+                    status = RequestStatus.sent
+                by_vendor = self.rng.random() < 0.6
+                created_at = self.since(p.created_at, dt.timedelta(days=30))
+                yield (
+                    uuid.uuid4(),
+                    p.id,
+                    self.vendor_ids[vendor],
+                    (
+                        RequestInitiator.vendor
+                        if by_vendor
+                        else RequestInitiator.company
+                    ).value,
+                    status.value,
+                    created_at,
+                    created_at,
+                    *(self.proposal() if by_vendor else (None,) * 5),
+                )
+
+    def proposal(self) -> tuple[Any, ...]:
+        """question_answers ... proposed_cost of a request sent by the vendor"""
+        scores = [
+            {
+                "group": self.rng.choice(REQUIREMENT_GROUPS),
+                "requirement": self.text(6),
+                "feasibility": self.rng.randint(1, 10),
+            }
+            for _ in range(self.rng.randint(0, 4))
+        ]
+        return (
+            json.dumps([self.text(10) for _ in range(2)], ensure_ascii=False),
+            json.dumps(scores, ensure_ascii=False),
+            self.rng.randint(1, 60),
+            self.rng.randint(14, 365),
+            float(round(self.rng.lognormvariate(13, 1.0), -3)),
+        )
+
+    def reviews(self) -> Iterator[tuple[Any, ...]]:
+        """Company and executor reviewing each other, for executed projects"""
+        executed = [p for p in self.projects if p.executor is not None]
+        chance = min(1.0, self.sizes.reviews / max(1, 2 * len(executed)))
+        ratings = list(RATINGS)
+        for p in executed:
+            company = self.company_ids[p.owner]
+            vendor_user = self.vendor_user_ids[p.vendors[p.executor]]  # type: ignore[index]
+            for author, reviewed in ((company, vendor_user), (vendor_user, company)):
+                if self.rng.random() >= chance:
+                    continue
+                yield (
+                    uuid.uuid4(),
+                    author,
+                    reviewed,
+                    p.id,
+                    self.rng.choices(ratings, cum_weights=self.rating_weights)[0],
+                    self.text(self.rng.randint(10, 60)),
+                    self.since(p.created_at),
+                )
+
+    def shortlists(self) -> Iterator[tuple[Any, ...]]:
+        """Vendors shortlisted on a third of the open projects"""
+        for p in self.projects:
+            if p.executor is None and not p.archived and self.rng.random() < 0.3:
+                for i in self.distinct(self.vendor_weights, self.rng.randint(1, 5)):
+                    yield p.id, self.vendor_ids[i]
+
+
+def zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    return list(
+        itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count))
+    )
+
+
+def copy(
+    conn: psycopg.Connection[Any],
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[tuple[Any, ...]],
+) -> None:
+    start = time.perf_counter()
+    count = 0
+    names = ", ".join(columns)
+    with conn.cursor() as cur, cur.copy(f'COPY "{table}" ({names}) FROM STDIN') as c:
+        for row in rows:
+            c.write_row(row)
+            count += 1
+    print(f"  {table:<20} {count:>9} rows {time.perf_counter() - start:7.1f}s")
+
+
+def load_services() -> list[uuid.UUID]:
+    with Session(engine) as session:
+        services = list(session.exec(select(Service.id)).all())
+    if services:
+        return services
+    add_services(yes=True)
+    return load_services()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=1.0)
+    for name in Sizes.__annotations__:
+        parser.add_argument(f"--{name}", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = Sizes().scaled(args.scale)
+    for name in Sizes.__annotations__:
+        if getattr(args, name) is not None:
+            setattr(sizes, name, getattr(args, name))
+    if not 0 < sizes.vendors < sizes.users:
+        parser.error("--vendors must be between 0 and --users")
+
+    gen = Generator(sizes=sizes, rng=random.Random(args.seed), services=load_services())
+    print(f"Generating {sizes} (run {gen.run})")
+
+    user_columns = (
+        "id",
+        "email",
+        "hashed_password",
+        "full_name",
+        "company_name",
+        "location",
+        "role",
+        "is_active",
+        "is_superuser",
+        "created_at",
+        "updated_at",
+    )
+    start = time.perf_counter()
+    conninfo = engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+    with psycopg.connect(conninfo) as conn:
+        copy(conn, "user", user_columns, gen.users(UserRole.company, gen.companies))
+        copy(conn, "user", user_columns, gen.users(UserRole.vendor, sizes.vendors))
+        copy(
+            conn,
+            "vendorprofile",
+            (
+                "id",
+                "user_id",
+                "main_goal",
+                "sales_email",
+                "company_website",
+                "description",
+                "min_project_size",
+                "updated_at",
+            ),
+            gen.vendor_profiles(),
+        )
+        copy(
+            conn,
+            "vendorservicelink",
+            ("vendor_profile_id", "service_id"),
+            gen.vendor_services(),
+        )
+        gen.plan_projects()
+        copy(
+            conn,
+            "project",
+            (
+                "id",
+                "owner_id",
+                "title",
+                "description",
+                "start_date",
+                "location",
+                "budget",
+                "questions",
+                "requirements",
+                "created_at",
+                "updated_at",
+                "is_archived",
+                "vendor_profile_id",
+            ),
+            gen.project_rows(),
+        )
+        copy(
+            conn,
+            "projectservicelink",
+            ("project_id", "service_id"),
+            gen.project_services(),
+        )
+        copy(
+            conn,
+            "projectrequest",
+            (
+                "id",
+                "project_id",
+                "vendor_profile_id",
+                "initiator",
+                "status",
+                "created_at",
+                "updated_at",
+                "question_answers",
+                "feasibility_scores",
+                "days_to_start",
+                "duration_days",
+                "proposed_cost",
+            ),
+            gen.requests(),
+        )
+        copy(
+            conn,
+            "review",
+            (
+                "id",
+                "author_id",
+                "reviewed_user_id",
+                "project_id",
+                "rating",
+                "text",
+                "created_at",
+            ),
+            gen.reviews(),
+        )
+        copy(
+            conn,
+            "projectshortlist",
+            ("project_id", "vendor_profile_id"),
+            gen.shortlists(),
+        )
+        conn.commit()
+
+        with Session(engine) as session:
+            rows = reviews_crud.rebuild_rating_summaries(session=session)
+        print(f"  rating summaries for {rows} users")
+
+        # Fresh planner statistics for the benchmarks
+        conn.autocommit = True
+        conn.execute("ANALYZE")
+
+    print(f"Done in {time.perf_counter() - start:.1f}s, password {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
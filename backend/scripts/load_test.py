@@ -0,0 +1,388 @@
+"""
+Load test replaying the marketplace flows against a running stack.
+
+  python scripts/load_test.py [--base-url http://localhost:8000]
+      [--companies 10] [--vendors 40] [--duration 60] [--think 0.5]
+      [--output results.json] [--compare previous.json]
+
+Every virtual user signs up with a new account first, vendors also create
+their profile on the catalog services; this setup is not measured. Then,
+until --duration runs out:
+- companies create projects, browse the vendors matching the newest one,
+  shortlist the best of them and accept the first proposal received on each
+  project
+- vendors poll the available projects and send a proposal to one of them,
+  answering its questions and scoring its requirements
+
+Run it on a database filled by scripts/generate_data.py to get production
+sized pages. Latency p50/p95/p99, throughput and error rate are reported per
+route template, a response with status 400 or more is an error. With
+--output the report is written as JSON with the commit and the options, so
+runs on different commits can be compared: --compare prints the p95 and
+throughput changes against a previous report. The exit status is 1 when a
+route exceeds --slo-p95 or --slo-error-rate.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+API = "/api/v1"
+PASSWORD = "Password123!"
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class LoadClient:
+    """Times the requests per route template, see the module docstring"""
+
+    def __init__(self, http: httpx.AsyncClient, stats: dict[str, RouteStats]) -> None:
+        self.http = http
+        self.stats = stats
+        self.headers: dict[str, str] = {}
+
+    async def call(
+        self,
+        method: str,
+        route: str,
+        *,
+        measure: bool = True,
+        path: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        url = API + route.format(**(path or {}))
+        start = time.perf_counter()
+        try:
+            r: httpx.Response | None = await self.http.request(
+                method, url, headers=self.headers, **kwargs
+            )
+        except httpx.HTTPError:
+            r = None
+        if measure:
+            stats = self.stats[f"{method} {route}"]
+            stats.latencies.append(time.perf_counter() - start)
+            if r is None or r.is_error:
+                stats.errors += 1
+        return r
+
+    async def sign_up(self, role: str) -> None:
+        email = f"load-{uuid.uuid4().hex}@example.com"
+        user = {
+            "email": email,
+            "password": PASSWORD,
+            "role": role,
+            "company_name": f"Load {role} {email[5:13]}",
+            "full_name": "Load Test",
+            "location": "Москва",
+        }
+        r = await self.call("POST", "/users/signup", json=user, measure=False)
+        check(r)
+        r = await self.call(
+            "POST",
+            "/login/access-token",
+            data={"username": email, "password": PASSWORD},
+            measure=False,
+        )
+        self.headers = {"Authorization": f"Bearer {check(r)['access_token']}"}
+
+    async def create_vendor_profile(self, services: list[str]) -> None:
+        profile = {
+            "main_goal": "Новые клиенты",
+            "sales_email": f"sales-{uuid.uuid4().hex}@example.com",
+            "description": "Веб-разработка, интеграции и поддержка",
+            "min_project_size": 50_000,
+            "service_ids": random.sample(services, min(len(services), 8)),
+        }
+        check(await self.call("POST", "/vendors/me", json=profile, measure=False))
+
+
+def check(r: httpx.Response | None) -> Any:
+    """Body of a setup response, which must succeed"""
+    if r is None or r.is_error:
+        raise SystemExit(f"Setup failed: {r and r.request.url} {r and r.text}")
+    return r.json()
+
+
+def project_body(services: list[str]) -> dict[str, Any]:
+    return {
+        "title": f"Load test project {uuid.uuid4().hex[:8]}",
+        "description": "Разработка веб-платформы с интеграцией CRM и аналитикой",
+        "start_date": random.choice(
+            ("Within 30 days", "Within 60 days", "After 60+ days")
+        ),
+        "location": "Москва",
+        "budget": random.choice((100_000, 500_000, 2_000_000)),
+        "questions": [f"Вопрос {n}?" for n in range(random.randint(0, 3))],
+        "requirements": [
+            {"group": "Технологии", "requirement": f"Требование {n}", "priority": 3}
+            for n in range(random.randint(0, 4))
+        ],
+        "service_ids": random.sample(services, random.randint(1, 5)),
+    }
+
+
+def proposal_body(project: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "question_answers": ["Да, есть опыт"] * len(project["questions"] or []),
+        "feasibility_scores": [
+            {**item, "feasibility": random.randint(1, 10)}
+            for item in project["requirements"] or []
+        ],
+        "days_to_start": random.randint(1, 30),
+        "duration_days": random.randint(14, 180),
+        "proposed_cost": project["budget"],
+    }
+
+
+async def think(seconds: float) -> None:
+    await asyncio.sleep(random.expovariate(1 / seconds) if seconds else 0)
+
+
+async def company_flow(
+    client: LoadClient, services: list[str], deadline: float, think_time: float
+) -> None:
+    # Projects without an accepted proposal yet
+    open_projects: list[str] = []
+    while time.monotonic() < deadline:
+        if len(open_projects) < 5:
+            r = await client.call("POST", "/projects/", json=project_body(services))
+            if r is not None and r.is_success:
+                open_projects.append(r.json()["id"])
+            await think(think_time)
+        if not open_projects:
+            continue
+
+        r = await client.call(
+            "GET",
+            "/projects/{project_id}/vendors/matching",
+            path={"project_id": open_projects[-1]},
+            params={"limit": 20},
+        )
+        if r is not None and r.is_success:
+            for vendor in r.json()["result"][:3]:
+                await client.call(
+                    "POST",
+                    "/shortlist/projects/{project_id}/vendors/{vendor_profile_id}",
+                    path={
+                        "project_id": open_projects[-1],
+                        "vendor_profile_id": vendor["id"],
+                    },
+                )
+        await think(think_time)
+
+        project_id = random.choice(open_projects)
+        r = await client.call(
+            "GET",
+            "/projects/{project_id}/requests",
+            path={"project_id": project_id},
+            params={"initiator": "vendor", "request_status": "sent", "limit": 20},
+        )
+        if r is not None and r.is_success and r.json()["result"]:
+            await client.call(
+                "POST",
+                "/requests/{request_id}/accept",
+                path={"request_id": r.json()["result"][0]["id"]},
+            )
+            open_projects.remove(project_id)
+        await think(think_time)
+
+
+async def vendor_flow(client: LoadClient, deadline: float, think_time: float) -> None:
+    while time.monotonic() < deadline:
+        r = await client.call(
+            "GET", "/vendors/available-projects", params={"limit": 20}
+        )
+        # Projects with a request of this vendor are not available any more
+        projects = r.json()["result"] if r is not None and r.is_success else []
+        if projects:
+            project = random.choice(projects[:5])
+            await client.call(
+                "POST",
+                "/projects/{project_id}/request/vendor",
+                path={"project_id": project["id"]},
+                json=proposal_body(project),
+            )
+        await think(think_time)
+
+
+def report(stats: dict[str, RouteStats], elapsed: float) -> dict[str, Any]:
+    routes = {}
+    for route, s in sorted(stats.items()):
+        latencies = sorted(s.latencies)
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": s.errors,
+            "error_rate": s.errors / len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+    requests = sum(r["requests"] for r in routes.values())
+    errors = sum(r["errors"] for r in routes.values())
+    return {
+        "routes": routes,
+        "total": {
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "rps": requests / elapsed,
+        },
+    }
+
+
+def print_report(result: dict[str, Any], previous: dict[str, Any] | None) -> None:
+    print(
+        f"{'route':<64} {'reqs':>6} {'rps':>7} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for route, r in result["routes"].items():
+        line = (
+            f"{route:<64} {r['requests']:>6} {r['rps']:>7.1f} "
+            f"{r['error_rate'] * 100:>6.2f} {r['p50_ms']:>8.1f} "
+            f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+        before = (previous or {}).get("routes", {}).get(route)
+        if before:
+            line += (
+                f"  p95 {change(before['p95_ms'], r['p95_ms'])}"
+                f" rps {change(before['rps'], r['rps'])}"
+            )
+        print(line)
+    total = result["total"]
+    print(
+        f"total {total['requests']} requests, {total['rps']:.1f} rps, "
+        f"{total['error_rate'] * 100:.2f}% errors"
+    )
+    if previous:
+        print(f"compared with {previous['commit']} ({previous['started_at']})")
+
+
+def change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+def slo_violations(
+    result: dict[str, Any], p95_ms: float, error_rate: float
+) -> list[str]:
+    violations = []
+    for route, r in result["routes"].items():
+        if r["p95_ms"] > p95_ms:
+            violations.append(f"{route}: p95 {r['p95_ms']:.1f} ms > {p95_ms} ms")
+        if r["error_rate"] > error_rate:
+            violations.append(
+                f"{route}: error rate {r['error_rate']:.2%} > {error_rate:.2%}"
+            )
+    return violations
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    stats: dict[str, RouteStats] = defaultdict(RouteStats)
+    limits = httpx.Limits(max_connections=args.companies + args.vendors)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as http:
+        catalog = check(await http.get(f"{API}/catalog/categories"))
+        services = [s["id"] for category in catalog for s in category["services"]]
+        if len(services) < 5:
+            raise SystemExit("The catalog needs 5 services or more, run add_services")
+
+        companies = [LoadClient(http, stats) for _ in range(args.companies)]
+        vendors = [LoadClient(http, stats) for _ in range(args.vendors)]
+        await asyncio.gather(
+            *(c.sign_up("company") for c in companies),
+            *(v.sign_up("vendor") for v in vendors),
+        )
+        await asyncio.gather(*(v.create_vendor_profile(services) for v in vendors))
+
+        started_at = dt.datetime.now(dt.UTC)
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(company_flow(c, services, deadline, args.think) for c in companies),
+            *(vendor_flow(v, deadline, args.think) for v in vendors),
+        )
+        elapsed = time.monotonic() - start
+
+    return {
+        "commit": git_commit(),
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "options": {
+            name: getattr(args, name)
+            for name in ("base_url", "companies", "vendors", "duration", "think")
+        },
+        "elapsed": elapsed,
+        **report(stats, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--vendors", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="mean pause between steps, seconds"
+    )
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="JSON report of a previous run")
+    parser.add_argument("--slo-p95", type=float, default=500, help="milliseconds")
+    parser.add_argument("--slo-error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    result = asyncio.run(run(args))
+    print_report(result, previous)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    violations = slo_violations(result, args.slo_p95, args.slo_error_rate)
+    for violation in violations:
+        print(f"SLO violated, {violation}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
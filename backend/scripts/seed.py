@@ -10,6 +10,7 @@ from sqlmodel import Session
 
 from app.core.db import engine
 from app.core.security import get_password_hash
+from app.crud import reviews as reviews_crud
 from app.m2m_models import ProjectServiceLink, ProjectShortlist, VendorServiceLink
 from app.models import (
     Category,
@@ -583,6 +584,7 @@ def seed(session: Session) -> None:
         )
         session.add(review)
     session.commit()
+    reviews_crud.rebuild_rating_summaries(session=session)
     print(f"     {len(REVIEWS_DATA)} reviews created")
 
     print("\n✅ Seed complete!")
@@ -0,0 +1,309 @@
+"""
+SQL statements per request of the list routes, with full pages of data.
+
+A relationship loaded row by row shows up as PAGE more statements, far above
+the budgets: see tests.utils.queries.
+"""
+
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.principals import principal_cache
+from app.crud import reviews as reviews_crud
+from app.m2m_models import ProjectShortlist
+from app.models import (
+    Project,
+    ProjectRequest,
+    ProjectStart,
+    RequestInitiator,
+    RequestStatus,
+    Review,
+    Service,
+    User,
+    UserRole,
+    VendorProfile,
+)
+from tests.utils.queries import query_budget
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
+from tests.utils.vendor import (
+    create_random_account,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+API = settings.API_V1_STR
+PAGE = 100
+PASSWORD = random_lower_string()
+
+
+@dataclass
+class Seed:
+    company_headers: dict[str, str]
+    vendor_headers: dict[str, str]
+    service_ids: list[uuid.UUID]
+    vendor_profile_id: uuid.UUID
+    vendor_user_id: uuid.UUID
+    # Project of the company with PAGE requests and shortlisted vendors
+    requested_project_id: uuid.UUID
+    # Project of the company without requests, all vendors match it
+    open_project_id: uuid.UUID
+
+
+def make_users(role: UserRole) -> list[User]:
+    return [
+        User(
+            email=random_email(),
+            hashed_password="-",
+            company_name=random_lower_string(),
+            location="Moscow, Russia",
+            role=role,
+            full_name=random_lower_string(),
+        )
+        for _ in range(PAGE)
+    ]
+
+
+def make_projects(
+    owners: Sequence[User], services: list[Service], **fields: object
+) -> list[Project]:
+    return [
+        Project(
+            title=random_lower_string(),
+            description=random_lower_string(),
+            start_date=ProjectStart.within_30_days,
+            budget=100000.0,
+            questions=["Question?"],
+            owner_id=owner.id,
+            services=services,
+            **fields,
+        )
+        for owner in owners
+    ]
+
+
+@pytest.fixture(scope="module")
+def seed(client: TestClient, db: Session) -> Seed:
+    """
+    A company and a vendor, each with a full page in every list: PAGE other
+    companies and vendors, their projects, requests, reviews and shortlist
+    """
+    services = create_random_services(db, 5)
+    company = create_random_account(db, role=UserRole.company, password=PASSWORD)
+    vendor = create_random_vendor_profile(db, services, password=PASSWORD)
+    assert vendor.user_id and vendor.user
+
+    companies = make_users(UserRole.company)
+    vendor_users = make_users(UserRole.vendor)
+    vendors = [
+        VendorProfile(
+            main_goal=random_lower_string(),
+            sales_email=random_email(),
+            description=random_lower_string(),
+            min_project_size=1000.0,
+            user_id=user.id,
+            services=services[:3],
+        )
+        for user in vendor_users
+    ]
+    incoming = make_projects(companies, services)
+    accepted = make_projects(companies, services)
+    archived = make_projects(companies, services, is_archived=True)
+    own = make_projects([company] * PAGE, services[:3])
+    # Executors of the company projects, half of them not reviewed yet. The
+    # projects match the vendor best, so they fill its available projects
+    for project, executor in zip(own, vendors, strict=True):
+        project.vendor_profile_id = executor.id
+
+    requested, open_project = own[0], own[1]
+    db.add_all([*companies, *vendor_users, *vendors])
+    db.add_all([*incoming, *accepted, *archived, *own])
+    # Shortlist rows have no relationship ordering them after the projects
+    db.flush()
+    db.add_all(
+        [
+            *(
+                ProjectRequest(
+                    project_id=p.id,
+                    vendor_profile_id=vendor.id,
+                    initiator=RequestInitiator.company,
+                )
+                for p in incoming
+            ),
+            *(
+                ProjectRequest(
+                    project_id=p.id,
+                    vendor_profile_id=vendor.id,
+                    initiator=RequestInitiator.vendor,
+                    status=RequestStatus.accepted,
+                )
+                for p in accepted
+            ),
+            *(
+                ProjectRequest(
+                    project_id=p.id,
+                    vendor_profile_id=vendor.id,
+                    initiator=RequestInitiator.vendor,
+                )
+                for p in archived
+            ),
+            *(
+                ProjectRequest(
+                    project_id=requested.id,
+                    vendor_profile_id=v.id,
+                    initiator=RequestInitiator.vendor,
+                )
+                for v in vendors
+            ),
+            *(
+                ProjectShortlist(project_id=requested.id, vendor_profile_id=v.id)
+                for v in vendors
+            ),
+            *(
+                Review(
+                    rating=5,
+                    text="Good job",
+                    author_id=c.id,
+                    reviewed_user_id=vendor.user_id,
+                )
+                for c in companies
+            ),
+            *(
+                Review(
+                    rating=4,
+                    text="Good job",
+                    author_id=company.id,
+                    reviewed_user_id=u.id,
+                )
+                for u in vendor_users[: PAGE // 2]
+            ),
+        ]
+    )
+    db.commit()
+    reviews_crud.rebuild_rating_summaries(
+        session=db, user_ids=[vendor.user_id, *(u.id for u in vendor_users)]
+    )
+    # Creating the profile invalidated claims issued within the same second,
+    # the first vendor request would look the principal up
+    principal_cache.clear()
+
+    return Seed(
+        company_headers=user_authentication_headers(
+            client=client, email=company.email, password=PASSWORD
+        ),
+        vendor_headers=user_authentication_headers(
+            client=client, email=vendor.user.email, password=PASSWORD
+        ),
+        service_ids=[s.id for s in services],
+        vendor_profile_id=vendor.id,
+        vendor_user_id=vendor.user_id,
+        requested_project_id=requested.id,
+        open_project_id=open_project.id,
+    )
+
+
+def get_page(
+    client: TestClient,
+    url: str,
+    headers: dict[str, str] | None = None,
+    size: int = PAGE,
+    **params: Any,
+) -> list[dict[str, Any]]:
+    r = client.get(f"{API}{url}", headers=headers, params={"limit": PAGE, **params})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    items: list[dict[str, Any]] = body if isinstance(body, list) else body["result"]
+    assert len(items) == size
+    return items
+
+
+@query_budget(6)
+def test_search_vendors(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/vendors/", service_ids=seed.service_ids[:3])
+
+
+# With the seeded executors: their profiles, users and services
+@query_budget(9)
+def test_available_projects(client: TestClient, seed: Seed) -> None:
+    items = get_page(client, "/vendors/available-projects", seed.vendor_headers)
+    assert all(item["vendor_profile"] for item in items)
+
+
+@query_budget(6)
+def test_incoming_requests(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/vendors/me/requests/incoming", seed.vendor_headers)
+
+
+@query_budget(6)
+def test_my_proposals(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/vendors/me/proposals", seed.vendor_headers)
+
+
+@query_budget(5)
+def test_accepted_projects(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/vendors/me/accepted-projects", seed.vendor_headers)
+
+
+@query_budget(5)
+def test_archived_projects(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/vendors/me/archived-projects", seed.vendor_headers)
+
+
+@query_budget(9)
+def test_my_projects(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/projects/", seed.company_headers)
+
+
+@query_budget(7)
+def test_matching_vendors(client: TestClient, seed: Seed) -> None:
+    get_page(client, f"/projects/{seed.open_project_id}/vendors/matching")
+
+
+@query_budget(6)
+def test_project_requests(client: TestClient, seed: Seed) -> None:
+    get_page(
+        client, f"/projects/{seed.requested_project_id}/requests", seed.company_headers
+    )
+
+
+@query_budget(8)
+def test_reviews_for_user(client: TestClient, seed: Seed) -> None:
+    get_page(client, f"/reviews/user/{seed.vendor_user_id}")
+
+
+@query_budget(9)
+def test_reviews_for_vendor(client: TestClient, seed: Seed) -> None:
+    get_page(client, f"/reviews/vendor/{seed.vendor_profile_id}")
+
+
+@query_budget(8)
+def test_my_reviews(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/reviews/me", seed.company_headers, size=PAGE // 2)
+
+
+@query_budget(8)
+def test_reviews_received(client: TestClient, seed: Seed) -> None:
+    get_page(client, "/reviews/me/received", seed.vendor_headers)
+
+
+@query_budget(7)
+def test_users_to_review(client: TestClient, seed: Seed) -> None:
+    get_page(
+        client, "/reviews/me/users-to-review", seed.company_headers, size=PAGE // 2
+    )
+
+
+@query_budget(8)
+def test_shortlisted_vendors(client: TestClient, seed: Seed) -> None:
+    get_page(
+        client,
+        f"/shortlist/projects/{seed.requested_project_id}/vendors",
+        seed.company_headers,
+    )
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.catalog import service_catalog
+from app.core.config import settings
+from app.models import UserRole
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
+from tests.utils.vendor import (
+    create_random_account,
+    create_random_project,
+    create_random_services,
+)
+
+PASSWORD = random_lower_string()
+
+
+def test_async_routes_without_catalog(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # In a category the catalog does not know
+    services = create_random_services(db, 5)
+    service_ids = [str(s.id) for s in services]
+    project = create_random_project(db, services)
+    user = create_random_account(db, role=UserRole.vendor, password=PASSWORD)
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=PASSWORD
+    )
+    # A worker before its first reload
+    monkeypatch.setattr(service_catalog, "_snapshot", None)
+
+    r = client.post(
+        f"{settings.API_V1_STR}/vendors/me",
+        headers=headers,
+        json={
+            "main_goal": random_lower_string(),
+            "sales_email": random_email(),
+            "description": random_lower_string(),
+            "min_project_size": 1000.0,
+            "service_ids": service_ids,
+        },
+    )
+    assert r.status_code == 200, r.text
+    vendor = r.json()
+    category_id = str(services[0].category_id)
+    assert vendor["services"][0]["category"]["id"] == category_id
+
+    for url, params in [
+        ("/vendors/", {"service_ids": service_ids}),
+        (f"/projects/{project.id}/vendors/matching", {}),
+    ]:
+        r = client.get(f"{settings.API_V1_STR}{url}", params=params)
+        assert r.status_code == 200, r.text
+        listed = {v["id"]: v for v in r.json()["result"]}
+        assert listed[vendor["id"]]["services"][0]["category"]["id"] == category_id
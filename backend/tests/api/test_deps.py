@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import Mock
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.api.deps import get_current_principal
+from app.core import security
+from app.core.config import settings
+from app.core.principals import principal_cache, principal_claims
+from app.crud import users as users_crud
+from app.models import UserRole, UserUpdate
+from tests.utils.vendor import create_random_account, create_random_vendor_profile
+
+
+def token_for(user_id: uuid.UUID, claims: dict[str, Any] | None = None) -> str:
+    return security.create_access_token(
+        user_id, expires_delta=timedelta(minutes=5), claims=claims
+    )
+
+
+def test_get_principal(db: Session) -> None:
+    vendor = create_random_vendor_profile(db, [])
+    assert vendor.user
+
+    principal = users_crud.get_principal(session=db, user_id=vendor.user_id)
+    assert principal
+    assert principal.id == vendor.user_id
+    assert principal.role == UserRole.vendor
+    assert principal.vendor_profile_id == vendor.id
+
+    company = create_random_account(db, role=UserRole.company)
+    principal = users_crud.get_principal(session=db, user_id=company.id)
+    assert principal
+    assert principal.vendor_profile_id is None
+
+
+def test_current_principal_from_claims(db: Session) -> None:
+    vendor = create_random_vendor_profile(db, [])
+    assert vendor.user
+    # Creating the profile invalidated claims issued within the same second
+    principal_cache.clear()
+    token = token_for(vendor.user_id, principal_claims(vendor.user))
+
+    # A fresh token is trusted without a user query
+    session = Mock(spec=Session)
+    principal = get_current_principal(session=session, token=token)
+    assert not session.method_calls
+    assert principal.id == vendor.user_id
+    assert principal.vendor_profile_id == vendor.id
+
+
+def test_current_principal_cache_invalidation(db: Session) -> None:
+    principal_cache.clear()
+    user = create_random_account(db, role=UserRole.company)
+    # Without claims the principal is loaded once, then cached
+    token = token_for(user.id)
+    assert get_current_principal(session=db, token=token).role == UserRole.company
+    assert principal_cache.get(user.id)
+
+    user_in = UserUpdate.model_validate(user, update={"role": UserRole.vendor})
+    users_crud.update_user(session=db, db_user=user, user_in=user_in)
+    assert principal_cache.get(user.id) is None
+    assert get_current_principal(session=db, token=token).role == UserRole.vendor
+
+    # Claims issued before a change are no longer trusted
+    stale_token = token_for(user.id, {"role": "vendor", "is_active": True})
+    user.is_active = False
+    db.add(user)
+    db.commit()
+    principal_cache.invalidate(user.id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_principal(session=db, token=stale_token)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.parametrize("claims", [{}, {"sub": "not-a-uuid"}])
+def test_current_principal_bad_subject(db: Session, claims: dict[str, str]) -> None:
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+    token = jwt.encode(
+        {"exp": exp, **claims}, settings.SECRET_KEY, algorithm=security.ALGORITHM
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_principal(session=db, token=token)
+    assert exc_info.value.status_code == 403
@@ -4,13 +4,34 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app.core import queries
 from app.core.config import settings
 from app.core.db import engine, init_db
+from app.core.security import BCRYPT_MIN_ROUNDS, password_hasher
 from app.main import app
 from app.models import Item, User
 from tests.utils.user import authentication_token_from_email
 from tests.utils.utils import get_superuser_token_headers
 
+# Low-cost bcrypt profile for tests, existing hashes are upgraded on login
+password_hasher.configure(rounds=BCRYPT_MIN_ROUNDS)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "query_budget(n): fail when a request of the test runs more than n SQL "
+        "statements, see tests.utils.queries",
+    )
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    for item in items:
+        if isinstance(item, pytest.Function) and item.get_closest_marker(
+            "query_budget"
+        ):
+            item.fixturenames.append("query_budget")
+
 
 @pytest.fixture(scope="session", autouse=True)
 def db() -> Generator[Session, None, None]:
@@ -40,3 +61,34 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def query_budget(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> Generator[list[tuple[str, queries.QueryStats]], None, None]:
+    """
+    Statements of every request made by the test, as recorded by
+    app.core.queries.QueryStatsMiddleware. Checked against the budget of the
+    query_budget marker when the test has one.
+    """
+    recorded: list[tuple[str, queries.QueryStats]] = []
+    record = queries.record
+
+    def record_request(stats: queries.QueryStats, *, method: str, route: str) -> None:
+        recorded.append((f"{method} {route}", stats))
+        record(stats, method=method, route=route)
+
+    monkeypatch.setattr(queries, "record", record_request)
+    yield recorded
+
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        return
+    (budget,) = marker.args
+    assert recorded, "The test made no request"
+    for route, stats in recorded:
+        assert stats.count <= budget, (
+            f"{route} ran {stats.count} SQL statements, budget is {budget}:\n"
+            + "\n".join(f"{n} x {s}" for s, n in stats.statements.most_common())
+        )
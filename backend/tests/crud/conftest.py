@@ -0,0 +1,21 @@
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+
+from app.core.db import engine
+
+
+@pytest.fixture
+def statements() -> Generator[list[str], None, None]:
+    executed: list[str] = []
+
+    def before_cursor_execute(
+        _conn: Any, _cursor: Any, statement: str, *_args: Any
+    ) -> None:
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,124 @@
+import datetime as dt
+from collections.abc import Generator
+
+import pytest
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.crud import emails as emails_crud
+from app.crud import users as users_crud
+from app.email_sender import send_batch
+from app.models import EmailOutbox, EmailStatus, User, UserCreate, UserRole
+from tests.utils.smtp import SMTPSink
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture
+def smtp_sink(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> Generator[SMTPSink, None, None]:
+    db.exec(delete(EmailOutbox))
+    db.commit()
+    with SMTPSink(rejected={"bounce@example.com"}) as sink:
+        monkeypatch.setattr(settings, "SMTP_HOST", sink.host)
+        monkeypatch.setattr(settings, "SMTP_PORT", sink.port)
+        monkeypatch.setattr(settings, "SMTP_TLS", False)
+        monkeypatch.setattr(settings, "SMTP_SSL", False)
+        monkeypatch.setattr(settings, "SMTP_USER", None)
+        monkeypatch.setattr(settings, "EMAILS_FROM_EMAIL", "noreply@example.com")
+        yield sink
+
+
+def test_send_batch(db: Session, smtp_sink: SMTPSink) -> None:
+    delivered = emails_crud.create_email(
+        session=db,
+        email_to="user@example.com",
+        subject="Welcome",
+        html_content="<p>Hello</p>",
+    )
+    bounced = emails_crud.create_email(
+        session=db,
+        email_to="bounce@example.com",
+        subject="Welcome",
+        html_content="<p>Hello</p>",
+    )
+    db.commit()
+
+    assert send_batch(session=db) == 2
+    # One connection for the whole batch
+    assert smtp_sink.connections == 1
+    assert [m["To"] for m in smtp_sink.messages] == ["user@example.com"]
+    assert smtp_sink.messages[0]["Subject"] == "Welcome"
+
+    db.refresh(delivered)
+    assert delivered.status == EmailStatus.sent
+    assert delivered.attempts == 1
+    assert delivered.sent_at
+
+    db.refresh(bounced)
+    assert bounced.status == EmailStatus.pending
+    assert bounced.attempts == 1
+    assert bounced.last_error and "550" in bounced.last_error
+    assert bounced.next_attempt_at > dt.datetime.now(dt.UTC).replace(tzinfo=None)
+
+    # The retry is not due yet
+    assert send_batch(session=db) == 0
+    assert smtp_sink.connections == 1
+
+
+def test_mark_failed_backoff(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    email = emails_crud.create_email(
+        session=db, email_to="user@example.com", subject="Hi", html_content="Hi"
+    )
+    db.commit()
+
+    delays = []
+    for _ in range(2):
+        before = dt.datetime.now(dt.UTC)
+        emails_crud.mark_failed(session=db, email=email, error="timeout")
+        delays.append(email.next_attempt_at - before)
+        assert email.status == EmailStatus.pending
+
+    assert delays[1] > delays[0] * 1.5
+    emails_crud.mark_failed(session=db, email=email, error="timeout")
+    assert email.status == EmailStatus.failed
+    db.commit()
+
+
+def test_send_batch_quit_error(
+    db: Session, smtp_sink: SMTPSink, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(smtp_sink, "quit_reply", "421 Closing")
+    email = emails_crud.create_email(
+        session=db, email_to="user@example.com", subject="Hi", html_content="Hi"
+    )
+    db.commit()
+
+    assert send_batch(session=db) == 1
+
+    # Delivered emails stay sent whatever the server answers to QUIT
+    db.refresh(email)
+    assert email.status == EmailStatus.sent
+    assert len(smtp_sink.messages) == 1
+
+
+def test_email_queued_with_the_user(db: Session) -> None:
+    user_in = UserCreate(
+        email=random_email(),
+        password=random_lower_string(),
+        company_name="Company",
+        location="Moscow",
+        role=UserRole.company,
+        full_name="Full Name",
+    )
+    user = users_crud.add_user(session=db, user_create=user_in)
+    emails_crud.create_email(
+        session=db, email_to=user.email, subject="Welcome", html_content="Hi"
+    )
+    # Nothing is committed before the caller does, both rows go together
+    db.rollback()
+
+    assert db.get(User, user.id) is None
+    outbox = select(EmailOutbox).where(col(EmailOutbox.email_to) == user_in.email)
+    assert db.exec(outbox).first() is None
@@ -0,0 +1,77 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.crud import requests as requests_crud
+from app.crud.loaders import USER_PUBLIC_OPTIONS, loader_plan
+from app.models import (
+    ProjectRequest,
+    ProjectRequestPublicProjectFull,
+    RequestInitiator,
+    Service,
+    User,
+    UserPublic,
+    VendorProfile,
+)
+from tests.utils.vendor import (
+    create_random_project,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+
+def test_loader_plan_follows_nested_models() -> None:
+    assert loader_plan(UserPublic) is USER_PUBLIC_OPTIONS
+    (vendor_profile,) = USER_PUBLIC_OPTIONS
+    paths = [
+        tuple(str(p) for p in context.path.path[1::2])
+        for context in vendor_profile.context
+    ]
+    assert paths == [
+        (str(User.vendor_profile),),
+        (str(User.vendor_profile), str(VendorProfile.user)),
+        (str(User.vendor_profile), str(VendorProfile.services)),
+        (
+            str(User.vendor_profile),
+            str(VendorProfile.services),
+            str(Service.category),
+        ),
+    ]
+
+
+def render_incoming_requests(
+    vendor_profile_id: uuid.UUID, statements: list[str]
+) -> int:
+    """Number of queries listing and rendering the incoming requests page"""
+    start = len(statements)
+    with Session(engine) as session:
+        requests, total = requests_crud.get_incoming_requests_for_vendor(
+            session=session, vendor_profile_id=vendor_profile_id, skip=0, limit=50
+        )
+        for request in requests:
+            ProjectRequestPublicProjectFull.model_validate(request)
+        assert total == len(requests)
+    return len(statements) - start
+
+
+def test_page_query_count_independent_of_size(
+    db: Session, statements: list[str]
+) -> None:
+    services = create_random_services(db, 3)
+    counts = []
+    for size in (1, 4):
+        vendor_profile = create_random_vendor_profile(db, services)
+        for _ in range(size):
+            project = create_random_project(db, services)
+            db.add(
+                ProjectRequest(
+                    vendor_profile_id=vendor_profile.id,
+                    project_id=project.id,
+                    initiator=RequestInitiator.company,
+                )
+            )
+        db.commit()
+        counts.append(render_incoming_requests(vendor_profile.id, statements))
+
+    assert counts[0] == counts[1]
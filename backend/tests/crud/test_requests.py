@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, func, select
+
+from app.crud import requests as requests_crud
+from app.crud.pagination import estimated_total, next_cursor
+from app.models import ProjectRequest, RequestInitiator
+from tests.utils.vendor import (
+    create_random_project,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+
+def test_get_requests_for_project_cursor_pagination(
+    db: Session, statements: list[str]
+) -> None:
+    services = create_random_services(db, 1)
+    project = create_random_project(db, services)
+    for _ in range(5):
+        vendor = create_random_vendor_profile(db, services)
+        requests_crud.create_request(
+            session=db,
+            project_id=project.id,
+            vendor_profile_id=vendor.id,
+            initiator=RequestInitiator.company,
+        )
+
+    all_requests, total = requests_crud.get_requests_for_project(
+        session=db, project_id=project.id, skip=0, limit=100
+    )
+    assert total == 5
+
+    paged: list[ProjectRequest] = []
+    cursor = None
+    while True:
+        statements.clear()
+        page, page_total = requests_crud.get_requests_for_project(
+            session=db, project_id=project.id, limit=2, cursor=cursor
+        )
+        assert page_total == total
+        # Cursor pages are counted by COUNT alone, without a window total
+        assert any("OVER" in s for s in statements) == (cursor is None)
+        paged.extend(page)
+        cursor = next_cursor(page, limit=2)
+        if cursor is None:
+            break
+
+    assert [r.id for r in paged] == [r.id for r in all_requests]
+
+    # Past the last page the window total is unavailable, COUNT is used instead
+    empty_page, empty_total = requests_crud.get_requests_for_project(
+        session=db, project_id=project.id, skip=10, limit=2
+    )
+    assert empty_page == []
+    assert empty_total == total
+
+
+def test_get_requests_for_project_invalid_cursor(db: Session) -> None:
+    services = create_random_services(db, 1)
+    project = create_random_project(db, services)
+
+    with pytest.raises(HTTPException) as exc_info:
+        requests_crud.get_requests_for_project(
+            session=db, project_id=project.id, cursor="not-a-cursor"
+        )
+    assert exc_info.value.status_code == 400
+
+
+def test_estimated_total_falls_back_to_exact_count(db: Session) -> None:
+    total_stmt = select(func.count()).select_from(ProjectRequest)
+    exact = db.exec(total_stmt).one()
+
+    assert (
+        estimated_total(session=db, model=ProjectRequest, total_stmt=total_stmt)
+        == exact
+    )
+    # Planner estimate is used above the threshold, -1 if never analyzed
+    estimate = estimated_total(
+        session=db, model=ProjectRequest, total_stmt=total_stmt, min_rows=-1
+    )
+    assert isinstance(estimate, int)
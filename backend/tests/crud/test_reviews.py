@@ -0,0 +1,72 @@
+from sqlmodel import Session
+
+from app.crud import reviews as reviews_crud
+from app.models import Review, ReviewCreate, UserRatingSummary, UserRole
+from tests.utils.vendor import (
+    create_random_account,
+    create_random_project,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+
+def test_get_rating_stats_for_users(db: Session) -> None:
+    author = create_random_account(db, role=UserRole.company)
+    reviewed = create_random_account(db, role=UserRole.vendor)
+    not_reviewed = create_random_account(db, role=UserRole.vendor)
+
+    for rating in (4, 5):
+        db.add(
+            Review(
+                rating=rating,
+                text="Good job",
+                author_id=author.id,
+                reviewed_user_id=reviewed.id,
+            )
+        )
+    db.commit()
+    reviews_crud.rebuild_rating_summaries(session=db, user_ids=[reviewed.id])
+
+    stats = reviews_crud.get_rating_stats_for_users(
+        session=db, user_ids=[reviewed.id, not_reviewed.id]
+    )
+
+    assert stats[reviewed.id] == (4.5, 2)
+    assert stats[not_reviewed.id] == (None, 0)
+    assert stats[reviewed.id] == reviews_crud.get_user_rating_stats(
+        session=db, user_id=reviewed.id
+    )
+
+
+def test_create_review_updates_rating_summary(db: Session) -> None:
+    services = create_random_services(db, 1)
+    project = create_random_project(db, services)
+    vendor_profile = create_random_vendor_profile(db, services)
+    project.vendor_profile_id = vendor_profile.id
+    db.add(project)
+    db.commit()
+
+    for rating in (3, 4):
+        reviews_crud.create_review(
+            session=db,
+            author_id=project.owner_id,
+            data=ReviewCreate(
+                reviewed_user_id=vendor_profile.user_id,
+                rating=rating,
+                text="Worked together",
+                project_id=project.id,
+            ),
+        )
+
+    summary = db.get(UserRatingSummary, vendor_profile.user_id)
+    assert summary
+    assert summary.rating_sum == 7
+    assert summary.rating_count == 2
+    assert summary.rating_avg == 3.5
+
+    summary.rating_count = 100
+    db.add(summary)
+    db.commit()
+    reviews_crud.rebuild_rating_summaries(session=db, user_ids=[vendor_profile.user_id])
+    db.refresh(summary)
+    assert summary.rating_count == 2
@@ -0,0 +1,103 @@
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from app.core.catalog import ServiceCatalog, service_catalog
+from app.core.db import engine
+from app.crud import services as services_crud
+from app.models import Category, Service, ServiceUpdate, VendorProfile
+from tests.utils.utils import random_lower_string
+from tests.utils.vendor import create_random_vendor_profile
+
+
+def test_catalog_reloads_on_change(db: Session) -> None:
+    category = services_crud.create_category(session=db, label=random_lower_string())
+    service = services_crud.create_service(
+        session=db, label=random_lower_string(), category_id=category.id
+    )
+
+    listed = {c.id: c for c in services_crud.get_categories_with_services()}
+    assert [s.id for s in listed[category.id].services] == [service.id]
+
+    services_crud.update_service(
+        session=db,
+        service=service,
+        data=ServiceUpdate(
+            label="renamed " + random_lower_string(), category_id=category.id
+        ),
+    )
+    listed = {c.id: c for c in services_crud.get_categories_with_services()}
+    assert listed[category.id].services[0].label.startswith("renamed")
+
+    services_crud.delete_service(session=db, service=service)
+    listed = {c.id: c for c in services_crud.get_categories_with_services()}
+    assert listed[category.id].services == []
+
+
+def test_service_category_from_catalog(statements: list[str]) -> None:
+    with Session(engine) as session:
+        category = services_crud.create_category(
+            session=session, label=random_lower_string()
+        )
+        service = services_crud.create_service(
+            session=session, label=random_lower_string(), category_id=category.id
+        )
+        vendor_id = create_random_vendor_profile(session, [service]).id
+        category_label = category.label
+
+    statements.clear()
+    services_attribute = (
+        inspect(VendorProfile).relationships["services"].class_attribute
+    )
+    with Session(engine) as session:
+        stmt = (
+            select(VendorProfile)
+            .where(VendorProfile.id == vendor_id)
+            .options(selectinload(services_attribute))
+        )
+        loaded = session.exec(stmt).one()
+        assert loaded.services[0].category.label == category_label
+    # Vendor profiles and services, no category query
+    assert len(statements) == 2
+
+
+def test_service_category_missing_from_catalog(statements: list[str]) -> None:
+    with Session(engine) as session:
+        services_crud.create_category(session=session, label=random_lower_string())
+        # Without app.crud.services, the catalog does not know the category
+        category = Category(label=random_lower_string())
+        service = Service(label=random_lower_string(), category=category)
+        session.add(service)
+        session.commit()
+        service_id = service.id
+        category_label = category.label
+
+    statements.clear()
+    with Session(engine) as session:
+        loaded = session.get_one(Service, service_id)
+        # The load emits only the service query, the listener reloads later
+        assert len(statements) == 1
+        assert service_catalog._stale
+        assert loaded.category.label == category_label
+    assert len(statements) == 2
+    assert category.id in service_catalog.reload().by_id
+    assert not service_catalog._stale
+
+
+def test_catalog_listener(db: Session) -> None:
+    # The catalog of another worker
+    other = ServiceCatalog()
+    other.start_listener()
+    try:
+        other.get()
+        category = services_crud.create_category(
+            session=db, label=random_lower_string()
+        )
+        deadline = time.monotonic() + 5
+        while category.id not in other.get().by_id:
+            assert time.monotonic() < deadline, "catalog was not reloaded"
+            time.sleep(0.05)
+    finally:
+        other.stop_listener()
@@ -1,9 +1,9 @@
 from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session
 
-from app.core.security import verify_password
+from app.core.security import BCRYPT_MIN_ROUNDS, password_hasher, verify_password
 from app.crud import users
-from app.models import User, UserCreate, UserUpdate
+from app.models import User, UserCreate, UserRole, UserUpdate
 from tests.utils.utils import random_email, random_lower_string
 
 
@@ -89,3 +89,28 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_authenticate_user_rehashes_password(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(
+        email=email,
+        password=password,
+        company_name=random_lower_string(),
+        location="Moscow, Russia",
+        role=UserRole.company,
+        full_name=random_lower_string(),
+    )
+    user = users.create_user(session=db, user_create=user_in)
+    assert user.hashed_password.startswith(f"$2b${BCRYPT_MIN_ROUNDS:02}$")
+
+    password_hasher.configure(rounds=BCRYPT_MIN_ROUNDS + 1)
+    try:
+        authenticated = users.authenticate(session=db, email=email, password=password)
+    finally:
+        password_hasher.configure(rounds=BCRYPT_MIN_ROUNDS)
+
+    assert authenticated
+    assert authenticated.hashed_password.startswith(f"$2b${BCRYPT_MIN_ROUNDS + 1:02}$")
+    assert verify_password(password, authenticated.hashed_password)
@@ -0,0 +1,152 @@
+import pytest
+from sqlmodel import Session, text
+
+from app.crud import requests as requests_crud
+from app.crud import shortlist as shortlist_crud
+from app.crud import vendors as vendors_crud
+from app.models import RequestInitiator
+from tests.utils.utils import random_lower_string
+from tests.utils.vendor import (
+    create_random_project,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+
+def test_get_ranked_vendors_for_project(db: Session) -> None:
+    services = create_random_services(db, 4)
+    project = create_random_project(db, services[:2])
+
+    full_match = create_random_vendor_profile(db, services[:2])
+    half_match = create_random_vendor_profile(db, [services[0], *services[2:]])
+    shortlisted = create_random_vendor_profile(db, services[3:])
+    requested = create_random_vendor_profile(db, services[:2])
+
+    shortlist_crud.add_to_shortlist(
+        session=db, project_id=project.id, vendor_profile_id=shortlisted.id
+    )
+    requests_crud.create_request(
+        session=db,
+        project_id=project.id,
+        vendor_profile_id=requested.id,
+        initiator=RequestInitiator.company,
+    )
+
+    ranked, total = vendors_crud.get_ranked_vendors_for_project(
+        session=db, project=project, skip=0, limit=1000
+    )
+    ranked_ids = [vendor.id for vendor, _ in ranked]
+    scores = {vendor.id: score for vendor, score in ranked}
+
+    assert total == len(ranked)
+    assert requested.id not in ranked_ids
+    assert ranked_ids[0] == shortlisted.id
+    assert ranked_ids.index(full_match.id) < ranked_ids.index(half_match.id)
+    assert scores[full_match.id] == 1.0
+    assert scores[half_match.id] == 0.5
+    assert scores[shortlisted.id] == 0.0
+
+
+def test_get_ranked_vendors_for_project_pagination(db: Session) -> None:
+    services = create_random_services(db, 2)
+    project = create_random_project(db, services)
+    create_random_vendor_profile(db, services)
+
+    _, total = vendors_crud.get_ranked_vendors_for_project(
+        session=db, project=project, skip=0, limit=1
+    )
+    page, page_total = vendors_crud.get_ranked_vendors_for_project(
+        session=db, project=project, skip=total, limit=1
+    )
+
+    assert page == []
+    assert page_total == total
+
+
+def test_search_vendors_full_text(db: Session) -> None:
+    services = create_random_services(db, 2)
+    tag = random_lower_string()
+
+    described = create_random_vendor_profile(db, services[:1])
+    described.description = f"{tag} облачные решения для бизнеса"
+    goal = create_random_vendor_profile(db, services)
+    goal.main_goal = f"{tag} cloud migrations"
+    company = create_random_vendor_profile(db, [])
+    assert company.user
+    company.user.company_name = f"{tag} Studio"
+    db.add_all([described, goal, company.user])
+    db.commit()
+
+    vendors, total = vendors_crud.search_vendors(session=db, q=tag)
+    assert total == 3
+    assert {v.id for v in vendors} == {described.id, goal.id, company.id}
+
+    # Stemming in both languages
+    vendors, total = vendors_crud.search_vendors(session=db, q=f"{tag} облачный")
+    assert [v.id for v in vendors] == [described.id]
+    vendors, total = vendors_crud.search_vendors(session=db, q=f"{tag} migration")
+    assert [v.id for v in vendors] == [goal.id]
+
+    # Combined with the service-match score
+    vendors, total = vendors_crud.search_vendors(
+        session=db, q=tag, service_ids=[s.id for s in services]
+    )
+    assert total == 2
+    assert [v.id for v in vendors] == [goal.id, described.id]
+
+
+def test_search_vendors_pages_without_filters(db: Session) -> None:
+    create_random_vendor_profile(db, [])
+    create_random_vendor_profile(db, [])
+
+    first, total = vendors_crud.search_vendors(session=db, limit=1)
+    rest, _ = vendors_crud.search_vendors(session=db, skip=1, limit=total)
+    ids = [v.id for v in [*first, *rest]]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == total
+
+
+def test_search_vendors_location_and_company_name(db: Session) -> None:
+    tag = random_lower_string()
+    percent = create_random_vendor_profile(db, [])
+    other = create_random_vendor_profile(db, [])
+    assert percent.user and other.user
+    percent.user.company_name = f"{tag} 100% Studio"
+    percent.user.location = f"Kazan, {tag}"
+    other.user.company_name = f"{tag} 1000 Studio"
+    other.user.location = f"Kazan, {tag}"
+    db.add_all([percent.user, other.user])
+    db.commit()
+
+    vendors, total = vendors_crud.search_vendors(session=db, location=tag.upper())
+    assert total == 2
+    assert {v.id for v in vendors} == {percent.id, other.id}
+
+    # % and _ are matched literally
+    vendors, total = vendors_crud.search_vendors(
+        session=db, location=tag, company_name=f"{tag} 100%"
+    )
+    assert total == 1
+    assert [v.id for v in vendors] == [percent.id]
+
+
+def test_search_vendors_fuzzy_location(db: Session) -> None:
+    if not db.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).first():
+        pytest.skip("pg_trgm is not installed")
+
+    tag = random_lower_string()
+    exact = create_random_vendor_profile(db, [])
+    typo = create_random_vendor_profile(db, [])
+    assert exact.user and typo.user
+    exact.user.location = f"Novosibirsk, {tag}"
+    typo.user.location = f"Novosibirsk, {tag[:-2]}xx"
+    db.add_all([exact.user, typo.user])
+    db.commit()
+
+    vendors, total = vendors_crud.search_vendors(
+        session=db, location=tag, location_fuzzy=True
+    )
+    assert total == 2
+    assert [v.id for v in vendors] == [exact.id, typo.id]
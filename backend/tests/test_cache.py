@@ -0,0 +1,129 @@
+import time
+import uuid
+from collections.abc import Generator
+from typing import Any
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from redis.client import Pipeline
+from sqlmodel import Session
+
+from app.api.cache import normalize_params
+from app.core.cache import LocalCache, RedisCache, response_cache
+from app.core.config import settings
+from app.models import User
+
+
+@pytest.fixture
+def redis_cache() -> Generator[RedisCache, None, None]:
+    cache = RedisCache("redis://localhost:6379/0")
+    cache.redis = fakeredis.FakeRedis()
+    yield cache
+    cache.redis.flushall()
+
+
+def test_normalize_params() -> None:
+    a = normalize_params({"services": ["b", "a"], "q": None, "approved": True})
+    b = normalize_params({"approved": True, "services": ["a", "b"]})
+    assert a == b == "approved=true&services=a&services=b"
+
+
+def test_local_cache_lru() -> None:
+    cache = LocalCache(maxsize=2)
+    cache.set("a", b"1", ttl=30, tags=["x"], since=time.time())
+    cache.set("b", b"2", ttl=30, tags=["x"], since=time.time())
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3", ttl=30, tags=["y"], since=time.time())
+    # b was used least recently
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_local_cache_ttl() -> None:
+    cache = LocalCache(maxsize=2)
+    cache.set("a", b"1", ttl=0, tags=[], since=time.time())
+    assert cache.get("a") is None
+
+
+def test_local_cache_invalidate() -> None:
+    cache = LocalCache(maxsize=10)
+    since = time.time()
+    cache.set("a", b"1", ttl=30, tags=["x", "y"], since=since)
+    cache.set("b", b"2", ttl=30, tags=["y"], since=since)
+    cache.set("c", b"3", ttl=30, tags=["z"], since=since)
+    assert cache.invalidate(["x", "y"], ttl=30) == 2
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+    # Rendered before the invalidation, the response may be stale
+    cache.set("a", b"1", ttl=30, tags=["x"], since=since)
+    assert cache.get("a") is None
+    cache.set("a", b"1", ttl=30, tags=["x"], since=time.time())
+    assert cache.get("a") == b"1"
+
+
+def test_redis_cache_invalidate(redis_cache: RedisCache) -> None:
+    since = time.time()
+    redis_cache.set("a", b"1", ttl=30, tags=["x", "y"], since=since)
+    redis_cache.set("b", b"2", ttl=30, tags=["y"], since=since)
+    redis_cache.set("c", b"3", ttl=30, tags=["z"], since=since)
+    assert redis_cache.get("a") == b"1"
+    assert redis_cache.invalidate(["y"], ttl=30) == 2
+    assert redis_cache.get("a") is None
+    assert redis_cache.get("b") is None
+    assert redis_cache.get("c") == b"3"
+
+    redis_cache.set("a", b"1", ttl=30, tags=["y"], since=since)
+    assert redis_cache.get("a") is None
+
+    redis_cache.clear()
+    assert redis_cache.get("c") is None
+
+
+def test_redis_cache_set_races_invalidation(
+    redis_cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mget = Pipeline.mget
+
+    def mget_then_invalidate(pipe: Pipeline, *args: Any, **kwargs: Any) -> Any:
+        result = mget(pipe, *args, **kwargs)
+        # After the check, before the entry is written, on another connection
+        if not redis_cache.redis.exists(redis_cache._invalidated("x")):
+            redis_cache.invalidate(["x"], ttl=30)
+        return result
+
+    monkeypatch.setattr(Pipeline, "mget", mget_then_invalidate)
+    redis_cache.set("a", b"1", ttl=30, tags=["x"], since=time.time())
+    assert redis_cache.get("a") is None
+
+
+def test_read_user_by_id_cached(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    me = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    user = db.get(User, uuid.UUID(me.json()["id"]))
+    assert user
+    url = f"{settings.API_V1_STR}/users/{user.id}"
+    r = client.get(url)
+    assert r.status_code == 200
+    old_name = r.json()["full_name"]
+
+    # Changed behind the API, the cached response is served
+    user.full_name = "Changed directly"
+    db.add(user)
+    db.commit()
+    r = client.get(url)
+    assert r.json()["full_name"] == old_name
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me",
+        headers=superuser_token_headers,
+        json={"full_name": "Changed by API"},
+    )
+    assert r.status_code == 200
+    r = client.get(url)
+    assert r.json()["full_name"] == "Changed by API"
+    response_cache.clear()
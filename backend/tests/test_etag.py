@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.etag import etag_matches, make_etag
+from app.core.config import settings
+from app.crud import projects as projects_crud
+from app.crud import services as services_crud
+from app.crud import vendors as vendors_crud
+from tests.utils.utils import random_lower_string
+from tests.utils.vendor import (
+    create_random_project,
+    create_random_services,
+    create_random_vendor_profile,
+)
+
+
+def test_etag_matches() -> None:
+    etag = make_etag("a", 1)
+    assert etag.startswith('W/"')
+    assert make_etag("a", 1) == etag
+    assert make_etag("a", 2) != etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def assert_not_modified(client: TestClient, url: str) -> str:
+    r = client.get(url)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert not r.content
+    return etag
+
+
+def test_vendor_profile_etag(client: TestClient, db: Session) -> None:
+    services = create_random_services(db, 6)
+    profile = create_random_vendor_profile(db, services[:5])
+    url = f"{settings.API_V1_STR}/vendors/{profile.id}"
+    etag = assert_not_modified(client, url)
+
+    vendors_crud.set_services(session=db, profile=profile, service_ids=[services[5].id])
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert len(r.json()["services"]) == 6
+
+    r = client.get(f"{settings.API_V1_STR}/vendors/{profile.user_id}")
+    assert r.status_code == 404
+    assert "etag" not in r.headers
+
+
+def test_project_etag(client: TestClient, db: Session) -> None:
+    project = create_random_project(db, create_random_services(db, 2))
+    url = f"{settings.API_V1_STR}/projects/{project.id}"
+    etag = assert_not_modified(client, url)
+
+    projects_crud.archive_project(session=db, project=project)
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["is_archived"] is True
+
+
+def test_catalog_etag(client: TestClient, db: Session) -> None:
+    url = f"{settings.API_V1_STR}/catalog/categories"
+    etag = assert_not_modified(client, url)
+
+    services_crud.create_category(session=db, label=random_lower_string())
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
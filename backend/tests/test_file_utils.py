@@ -0,0 +1,54 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.file_utils import CHUNK_SIZE, MAX_FILE_SIZE, receive_image
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="avatar.jpg")
+
+
+@pytest.mark.anyio
+async def test_receive_image(tmp_path: Path) -> None:
+    content = PNG_HEADER + b"x" * (CHUNK_SIZE * 2)
+
+    path, ext, digest = await receive_image(upload(content), str(tmp_path))
+
+    # The real type wins over the client file name
+    assert ext == "png"
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert Path(path).read_bytes() == content
+    assert os.path.dirname(path) == str(tmp_path)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "content,status_code",
+    [
+        (b"GIF89a" + b"x" * 100, 400),
+        (b"", 400),
+        (PNG_HEADER + b"x" * MAX_FILE_SIZE, 413),
+    ],
+    ids=["gif", "empty", "too-large"],
+)
+async def test_receive_image_rejected(
+    tmp_path: Path, content: bytes, status_code: int
+) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        await receive_image(upload(content), str(tmp_path))
+
+    assert exc_info.value.status_code == status_code
+    # The partial upload is removed
+    assert list(tmp_path.iterdir()) == []
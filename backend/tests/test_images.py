@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.images import THUMBNAIL_SIZES, make_thumbnails, make_thumbnails_async
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def logo(tmp_path: Path) -> Path:
+    path = tmp_path / "logo.png"
+    # Wide transparent logo with an opaque red center
+    image = Image.new("RGBA", (600, 300), (0, 0, 0, 0))
+    image.paste((255, 0, 0, 255), (250, 100, 350, 200))
+    image.save(path)
+    return path
+
+
+def test_make_thumbnails(logo: Path, tmp_path: Path) -> None:
+    variants = make_thumbnails(str(logo), str(tmp_path), "logo")
+
+    assert set(variants) == {"webp", "jpeg"}
+    for ext, names in variants.items():
+        assert list(names) == [str(size) for size in THUMBNAIL_SIZES]
+        for size, name in names.items():
+            assert name == f"logo_{size}.{ext}"
+            with Image.open(tmp_path / name) as thumb:
+                assert thumb.size == (int(size), int(size))
+
+    with Image.open(tmp_path / variants["jpeg"]["64"]) as thumb:
+        # Transparency is flattened on white, the center is kept
+        assert thumb.getpixel((0, 0)) == pytest.approx((255, 255, 255), abs=8)
+        assert thumb.getpixel((32, 32)) == pytest.approx((255, 0, 0), abs=8)
+
+
+def test_make_thumbnails_invalid(tmp_path: Path) -> None:
+    src = tmp_path / "broken.png"
+    src.write_bytes(b"\x89PNG\r\n\x1a\n" + b"x" * 100)
+
+    with pytest.raises(ValueError):
+        make_thumbnails(str(src), str(tmp_path), "broken")
+    assert [p.name for p in tmp_path.iterdir()] == ["broken.png"]
+
+
+@pytest.mark.anyio
+async def test_make_thumbnails_async(logo: Path, tmp_path: Path) -> None:
+    # Runs in a spawned worker process
+    variants = await make_thumbnails_async(str(logo), str(tmp_path), "logo")
+    assert (tmp_path / variants["webp"]["256"]).exists()
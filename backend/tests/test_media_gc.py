@@ -0,0 +1,44 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.media_gc import collect
+from app.models import UserRole
+from tests.utils.vendor import create_random_account
+
+
+def media_file(root: Path, name: str, age: float) -> Path:
+    path = root / "avatar" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(b"x")
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_collect(db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MEDIA_GC_GRACE_SECONDS", 60)
+    monkeypatch.setattr(settings, "MEDIA_GC_BATCH_SIZE", 2)
+    monkeypatch.setattr("app.media_gc.BATCH_PAUSE_SECONDS", 0)
+
+    logo = media_file(tmp_path, "logo.png", age=600)
+    thumb = media_file(tmp_path, "logo_64.webp", age=600)
+    orphans = [media_file(tmp_path, f"old{i}.png", age=600) for i in range(3)]
+    fresh = media_file(tmp_path, "fresh.png", age=0)
+
+    user = create_random_account(db, role=UserRole.company)
+    user.logo_url = f"{settings.MEDIA_HOST}/media/avatar/logo.png"
+    user.logo_variants = {
+        "webp": {"64": f"{settings.MEDIA_HOST}/media/avatar/logo_64.webp"}
+    }
+    db.add(user)
+    db.commit()
+
+    assert collect(session=db, media_root=str(tmp_path)) == 3
+    assert not any(path.exists() for path in orphans)
+    # Referenced files and files within the grace period are kept
+    assert logo.exists() and thumb.exists() and fresh.exists()
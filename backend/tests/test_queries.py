@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.pool import WORKER
+from app.core.queries import QueryStats, record, track_queries
+from app.models import Category
+
+
+def test_track_queries() -> None:
+    with track_queries() as stats, Session(engine) as session:
+        for _ in range(3):
+            session.exec(select(Category).limit(1)).all()
+        session.exec(select(Category.id).limit(1)).all()
+
+    assert stats.count == 4
+    assert stats.duration >= stats.slowest > 0
+    assert stats.slowest_statement in stats.statements
+    assert stats.repeated(3) == [(next(iter(stats.statements)), 3)]
+    assert stats.repeated(4) == []
+
+    with Session(engine) as session:
+        session.exec(select(Category).limit(1)).all()
+    assert stats.count == 4
+
+
+def test_suspected_n_plus_one(caplog: pytest.LogCaptureFixture) -> None:
+    stats = QueryStats()
+    for _ in range(settings.DB_N_PLUS_ONE_THRESHOLD):
+        stats.add("SELECT * FROM user WHERE id = %(id)s", 0.001)
+    labels = {"method": "GET", "route": "/test", "worker": WORKER}
+    before = REGISTRY.get_sample_value("db_n_plus_one_suspected_total", labels) or 0
+
+    with caplog.at_level(logging.WARNING, logger="app.core.queries"):
+        record(stats, method="GET", route="/test")
+
+    assert REGISTRY.get_sample_value("db_n_plus_one_suspected_total", labels) == (
+        before + 1
+    )
+    assert "Suspected N+1 in GET /test" in caplog.text
+
+
+def test_request_query_metrics(client: TestClient) -> None:
+    route = f"{settings.API_V1_STR}/catalog/categories"
+    labels = {"method": "GET", "route": route, "worker": WORKER}
+    before = REGISTRY.get_sample_value("http_request_db_queries_count", labels) or 0
+
+    r = client.get(route)
+    assert r.status_code == 200
+    db_timing, slowest_timing = r.headers["server-timing"].split(", ")
+    assert db_timing.startswith("db;dur=")
+    assert slowest_timing.startswith("db-slowest;dur=")
+
+    assert REGISTRY.get_sample_value("http_request_db_queries_count", labels) == (
+        before + 1
+    )
@@ -0,0 +1,62 @@
+import json
+import uuid
+
+from app.api.serialization import model_response, page, type_adapter
+from app.main import app
+from app.models import (
+    PaginatedVendorProfilesPublic,
+    UserPublicShort,
+    UserRole,
+    VendorProfilePublic,
+)
+
+
+def make_vendor() -> VendorProfilePublic:
+    user = UserPublicShort(
+        id=uuid.uuid4(),
+        email="vendor@example.com",
+        company_name="Company",
+        location="Moscow, Russia",
+        role=UserRole.vendor,
+        full_name="Full Name",
+    )
+    return VendorProfilePublic(
+        id=uuid.uuid4(),
+        main_goal="Goal",
+        sales_email="sales@example.com",
+        description="Description",
+        min_project_size=1000.0,
+        user=user,
+        services=[],
+        rating=4.5,
+        reviewsCount=2,
+    )
+
+
+def test_model_response() -> None:
+    vendor = make_vendor()
+    value = page(PaginatedVendorProfilesPublic, [vendor], total=1)
+    response = model_response(PaginatedVendorProfilesPublic, value)
+    assert response.media_type == "application/json"
+    body = json.loads(response.body)
+    assert body == {
+        "result": [json.loads(vendor.model_dump_json())],
+        "total": 1,
+        "next_cursor": None,
+    }
+    assert type_adapter(PaginatedVendorProfilesPublic) is type_adapter(
+        PaginatedVendorProfilesPublic
+    )
+
+
+def test_stored_email_schema() -> None:
+    schemas = app.openapi()["components"]["schemas"]
+    email = schemas["UserPublicShort"]["properties"]["email"]
+    assert email == {
+        "type": "string",
+        "format": "email",
+        "maxLength": 255,
+        "title": "Email",
+    }
+    sales_email = schemas["VendorProfilePublic"]["properties"]["sales_email"]
+    assert sales_email["format"] == "email"
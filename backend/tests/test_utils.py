@@ -0,0 +1,24 @@
+from app.utils import email_templates, render_email_template, render_email_templates
+
+
+def test_render_email_templates() -> None:
+    contexts = [{"email": f"user{i}@example.com"} for i in range(3)]
+    rendered = list(
+        render_email_templates(
+            template_name="test_email.html",
+            contexts=contexts,
+            common={"project_name": "Digest"},
+        )
+    )
+
+    assert len(rendered) == 3
+    for context, html in zip(contexts, rendered, strict=True):
+        assert context["email"] in html
+        assert "Digest" in html
+        assert html == render_email_template(
+            template_name="test_email.html",
+            context={"project_name": "Digest", **context},
+        )
+    # Compiled once, then served from the environment cache
+    assert email_templates.cache is not None
+    assert any(name == "test_email.html" for _, name in email_templates.cache)
@@ -0,0 +1,6 @@
+import pytest
+
+# @query_budget(n): no request of the test may run more than n SQL statements.
+# Budgets count every statement of the request, authentication included, and
+# are set with pages of realistic size: an N+1 query goes far above them.
+query_budget = pytest.mark.query_budget
@@ -0,0 +1,88 @@
+import socketserver
+import threading
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+from types import TracebackType
+
+
+class SMTPSink:
+    """
+    Local SMTP server keeping received messages in memory, a stand-in for
+    aiosmtpd's Sink handler. Recipients in `rejected` are refused with 550,
+    QUIT is answered with `quit_reply`.
+    """
+
+    def __init__(
+        self, *, rejected: set[str] | None = None, quit_reply: str = "221 Bye"
+    ) -> None:
+        self.rejected = rejected or set()
+        self.quit_reply = quit_reply
+        self.messages: list[EmailMessage] = []
+        self.connections = 0
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address[:2]
+
+    def __enter__(self) -> "SMTPSink":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    sink: SMTPSink
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        sink = self.server.sink
+        sink.connections += 1
+        self.reply("220 sink ready")
+
+        data: list[bytes] | None = None
+        for raw in self.rfile:
+            line = raw.rstrip(b"\r\n")
+            if data is not None:
+                if line == b".":
+                    message = BytesParser(
+                        EmailMessage, policy=policy.default
+                    ).parsebytes(b"\r\n".join(data))
+                    sink.messages.append(message)
+                    data = None
+                    self.reply("250 OK")
+                else:
+                    data.append(line[1:] if line.startswith(b".") else line)
+                continue
+
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self.reply("250 sink")
+            elif command == b"RCPT":
+                address = line.decode().split(":", 1)[1].strip(" <>")
+                if address in sink.rejected:
+                    self.reply("550 Mailbox unavailable")
+                else:
+                    self.reply("250 OK")
+            elif command == b"DATA":
+                data = []
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self.reply(sink.quit_reply)
+                return
+            else:
+                self.reply("250 OK")
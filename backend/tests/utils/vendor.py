@@ -0,0 +1,84 @@
+from sqlmodel import Session
+
+from app.crud import projects as projects_crud
+from app.crud import users
+from app.crud import vendors as vendors_crud
+from app.models import (
+    Category,
+    Project,
+    ProjectCreate,
+    ProjectStart,
+    Service,
+    User,
+    UserCreate,
+    UserRole,
+    VendorProfile,
+    VendorProfileCreate,
+)
+from tests.utils.utils import random_email, random_lower_string
+
+
+def create_random_account(
+    db: Session,
+    *,
+    role: UserRole,
+    location: str = "Moscow, Russia",
+    password: str | None = None,
+) -> User:
+    user_in = UserCreate(
+        email=random_email(),
+        password=password or random_lower_string(),
+        company_name=random_lower_string(),
+        location=location,
+        role=role,
+        full_name=random_lower_string(),
+    )
+    return users.create_user(session=db, user_create=user_in)
+
+
+def create_random_services(db: Session, count: int) -> list[Service]:
+    category = Category(label=random_lower_string())
+    db.add(category)
+    db.commit()
+    db.refresh(category)
+
+    services = [
+        Service(label=random_lower_string(), category_id=category.id)
+        for _ in range(count)
+    ]
+    db.add_all(services)
+    db.commit()
+    for service in services:
+        db.refresh(service)
+    return services
+
+
+def create_random_vendor_profile(
+    db: Session,
+    services: list[Service],
+    location: str = "Moscow, Russia",
+    password: str | None = None,
+) -> VendorProfile:
+    user = create_random_account(
+        db, role=UserRole.vendor, location=location, password=password
+    )
+    data = VendorProfileCreate.model_construct(
+        main_goal=random_lower_string(),
+        sales_email=random_email(),
+        description=random_lower_string(),
+        min_project_size=1000.0,
+        service_ids=[s.id for s in services],
+    )
+    return vendors_crud.create_vendor_profile(session=db, user_id=user.id, data=data)
+
+
+def create_random_project(db: Session, services: list[Service]) -> Project:
+    owner = create_random_account(db, role=UserRole.company)
+    data = ProjectCreate(
+        title=random_lower_string(),
+        description=random_lower_string(),
+        start_date=ProjectStart.within_30_days,
+        budget=100000.0,
+        service_ids=[s.id for s in services],
+    )
+    return projects_crud.create_project(session=db, owner_id=owner.id, data=data)